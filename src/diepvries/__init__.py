@@ -49,6 +49,21 @@ class TableType(Enum):
     SATELLITE = "satellite"
 
 
+class StagingTableKind(Enum):
+    """Possible kinds of staging table (values are the Snowflake table kinds).
+
+    - PERMANENT: table with Time Travel and Fail-safe storage;
+    - TRANSIENT: table without Fail-safe storage (cheaper, as staging tables can be
+      recreated from the extraction table);
+    - TEMPORARY: table without Fail-safe storage, only visible to the session that
+      created it and dropped when the session ends.
+    """
+
+    PERMANENT = "TABLE"
+    TRANSIENT = "TRANSIENT TABLE"
+    TEMPORARY = "TEMPORARY TABLE"
+
+
 class FixedPrefixLoggerAdapter(logging.LoggerAdapter):
     """Logger with a prefix.
 
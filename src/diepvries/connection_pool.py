@@ -0,0 +1,488 @@
+"""Pool of Snowflake connections, shared by deserializers and executors."""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection, Deque, Dict, Iterator, List, Optional
+
+from snowflake.connector import SnowflakeConnection
+from snowflake.connector.errors import Error
+
+from . import FixedPrefixLoggerAdapter
+from .template_sql.sql_formulas import (
+    HEALTH_CHECK_SQL,
+    UNSET_SESSION_PARAMETERS_SQL_TEMPLATE,
+    USE_WAREHOUSE_SQL_TEMPLATE,
+    format_session_parameters,
+)
+
+
+@dataclass
+class _Session:
+    """Snowflake connection held by a `ConnectionPool`."""
+
+    #: Snowflake connection.
+    connection: SnowflakeConnection
+    #: Warehouse of the session (None for the default warehouse of new connections).
+    warehouse: Optional[str]
+    #: Moment (a `time.monotonic` value) when the session was last returned.
+    last_used: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _Waiter:
+    """Caller waiting for a session of a full `ConnectionPool`."""
+
+    #: Event set when the waiter is served.
+    event: threading.Event = field(default_factory=threading.Event)
+    #: Session handed to the waiter (None when it should open a new session).
+    session: Optional[_Session] = None
+    #: Whether the pool was closed while waiting.
+    cancelled: bool = False
+
+
+class ConnectionPool:
+    """Pool of Snowflake sessions, reused by deserializers and load executors.
+
+    Opening a connection (login and session setup) takes seconds, so the pool keeps
+    sessions open between checkouts:
+
+    - `min_size` sessions are opened when the pool is created (warm sessions);
+    - at most `max_size` sessions are open at any time. When the pool is full,
+      callers wait for a session to be returned, in order of arrival (fair
+      checkout);
+    - each new session is set up with the pool's warehouse and session parameters
+      (e.g. `{"QUERY_TAG": "dv_loads", "TIMEZONE": "UTC"}`);
+    - sessions idle for longer than `health_check_interval` are checked before
+      being handed out, and replaced when they no longer work.
+
+    Sessions are checked out for a warehouse: idle sessions already using it are
+    preferred, and sessions are only switched to another warehouse when the pool is
+    full, so that each warehouse keeps its own warm sessions.
+
+    Callers changing session parameters (e.g. the query tag set by
+    `DataVaultLoadExecutor(tag_queries=True)`) declare them when returning the
+    session: they are set back to the pool's value (or unset, when the pool does not
+    set them), so that the next caller gets a session as set up by the pool.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], SnowflakeConnection],
+        max_size: Optional[int] = None,
+        min_size: int = 0,
+        warehouse: str = None,
+        session_parameters: Dict[str, Any] = None,
+        health_check_interval: Optional[float] = 60.0,
+    ):
+        """Instantiate a ConnectionPool, opening its warm sessions.
+
+        Args:
+            connection_factory: Function that creates a new Snowflake connection (e.g.
+                `functools.partial(snowflake.connector.connect, **configuration)`).
+            max_size: Maximum number of open sessions (None for no limit).
+            min_size: Number of sessions opened when the pool is created.
+            warehouse: Warehouse of new sessions (None for the default warehouse of
+                new connections).
+            session_parameters: Parameters set in each new session, indexed by name.
+            health_check_interval: Time (in seconds) that a session can be idle before
+                being checked when it is checked out (None to never check).
+
+        Raises:
+            ValueError: If max_size is lower than 1, if min_size is negative or
+                greater than max_size, or if health_check_interval is negative.
+        """
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size should be at least 1")
+        if min_size < 0 or (max_size is not None and min_size > max_size):
+            raise ValueError("min_size should be between 0 and max_size")
+        if health_check_interval is not None and health_check_interval < 0:
+            raise ValueError("health_check_interval should not be negative")
+
+        self.connection_factory = connection_factory
+        self.max_size = max_size
+        self.min_size = min_size
+        self.warehouse = warehouse
+        self.session_parameters = session_parameters or {}
+        self.health_check_interval = health_check_interval
+        # Idle sessions, the most recently used last.
+        self._idle: List[_Session] = []
+        # Checked out sessions.
+        self._checked_out: List[_Session] = []
+        self._waiters: Deque[_Waiter] = deque()
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+        self.warm()
+
+        self._logger.info("Instance of (%s) created.", type(self))
+
+    def __str__(self) -> str:
+        """Representation of a ConnectionPool object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return (
+            f"{type(self).__name__}: max_size={self.max_size}, "
+            f"warehouse={self.warehouse}"
+        )
+
+    def __enter__(self) -> "ConnectionPool":
+        """Enter the pool context.
+
+        Returns:
+            This pool.
+        """
+        return self
+
+    def __exit__(self, *_args):
+        """Exit the pool context, closing all sessions.
+
+        Args:
+            _args: Unused, exception details.
+        """
+        self.close()
+
+    @property
+    def size(self) -> int:
+        """Get the number of open sessions (idle or checked out).
+
+        Returns:
+            Number of sessions.
+        """
+        return self._size
+
+    @property
+    def idle_size(self) -> int:
+        """Get the number of idle sessions.
+
+        Returns:
+            Number of sessions.
+        """
+        return len(self._idle)
+
+    def warm(self):
+        """Open idle sessions until the pool holds `min_size` sessions."""
+        while True:
+            with self._lock:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            session = None
+            try:
+                session = self._open_session(self.warehouse)
+            finally:
+                if session is None:
+                    self._discard()
+            self._return(session)
+
+    def close(self):
+        """Close all idle sessions, and checked out sessions once returned."""
+        with self._lock:
+            self._closed = True
+            idle_sessions, self._idle = self._idle, []
+            self._size -= len(idle_sessions)
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.cancelled = True
+                waiter.event.set()
+        for session in idle_sessions:
+            session.connection.close()
+
+        self._logger.info("Pool closed (%s sessions still checked out).", self._size)
+
+    def acquire(
+        self, warehouse: str = None, timeout: Optional[float] = None
+    ) -> SnowflakeConnection:
+        """Check out a session, waiting for one to be returned if the pool is full.
+
+        Args:
+            warehouse: Warehouse of the session (None for the pool's warehouse).
+            timeout: Maximum time (in seconds) to wait for a session (None to wait
+                indefinitely).
+
+        Returns:
+            Snowflake connection, to be returned with `release`.
+
+        Raises:
+            RuntimeError: If the pool is closed.
+            TimeoutError: If no session was returned in time.
+        """
+        warehouse = warehouse or self.warehouse
+        waiter = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            session = None if self._waiters else self._take_idle(warehouse)
+            if session is None:
+                if not self._waiters and self._has_room():
+                    self._size += 1
+                else:
+                    waiter = _Waiter()
+                    self._waiters.append(waiter)
+
+        if waiter is not None:
+            if not waiter.event.wait(timeout):
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                        raise TimeoutError(
+                            f"No session was returned to the pool in {timeout}s"
+                        )
+            if waiter.cancelled:
+                raise RuntimeError("Connection pool is closed")
+            session = waiter.session
+
+        prepared_session = None
+        try:
+            prepared_session = self._prepare_session(session, warehouse)
+        finally:
+            if prepared_session is None:
+                if session is not None:
+                    session.connection.close()
+                self._discard()
+        with self._lock:
+            self._checked_out.append(prepared_session)
+
+        return prepared_session.connection
+
+    def release(
+        self, connection: SnowflakeConnection, changed_parameters: Collection[str] = ()
+    ):
+        """Return a checked out session to the pool.
+
+        Closed connections are discarded, making room for a new session, as are
+        sessions whose parameters could not be reset.
+
+        Args:
+            connection: Snowflake connection, as returned by `acquire`.
+            changed_parameters: Names of the session parameters changed by the caller
+                (e.g. `QUERY_TAG`), reset before the session is reused.
+        """
+        with self._lock:
+            session = next(
+                session
+                for session in self._checked_out
+                if session.connection is connection
+            )
+            self._checked_out.remove(session)
+        if not connection.is_closed() and changed_parameters:
+            try:
+                self._reset_session_parameters(connection, changed_parameters)
+            except Error as e:
+                self._logger.warning("Session parameters could not be reset: %s", e)
+                connection.close()
+        if connection.is_closed():
+            self._logger.warning("Closed session discarded.")
+            self._discard()
+            return
+        session.last_used = time.monotonic()
+        self._return(session)
+
+    @contextmanager
+    def connection(
+        self,
+        warehouse: str = None,
+        timeout: Optional[float] = None,
+        changed_parameters: Collection[str] = (),
+    ) -> Iterator[SnowflakeConnection]:
+        """Check out a session for the duration of a context.
+
+        Args:
+            warehouse: Warehouse of the session (None for the pool's warehouse).
+            timeout: Maximum time (in seconds) to wait for a session (None to wait
+                indefinitely).
+            changed_parameters: Names of the session parameters changed in the
+                context (check `release`).
+
+        Yields:
+            Snowflake connection, returned to the pool afterwards.
+        """
+        connection = self.acquire(warehouse, timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection, changed_parameters)
+
+    def _reset_session_parameters(
+        self, connection: SnowflakeConnection, parameter_names: Collection[str]
+    ):
+        """Set session parameters back to the pool's values (or unset them).
+
+        Args:
+            connection: Snowflake connection.
+            parameter_names: Names of the session parameters.
+        """
+        parameters = {
+            name: self.session_parameters[name]
+            for name in parameter_names
+            if name in self.session_parameters
+        }
+        unset_names = [
+            name for name in parameter_names if name not in self.session_parameters
+        ]
+        with connection.cursor() as cursor:
+            if parameters:
+                cursor.execute(format_session_parameters(parameters))
+            if unset_names:
+                cursor.execute(
+                    UNSET_SESSION_PARAMETERS_SQL_TEMPLATE.format(
+                        parameters=", ".join(unset_names)
+                    )
+                )
+
+    def _has_room(self) -> bool:
+        """Check whether a new session can be opened (called with the lock held).
+
+        Returns:
+            True if the pool is not full.
+        """
+        return self.max_size is None or self._size < self.max_size
+
+    def _take_idle(self, warehouse: Optional[str]) -> Optional[_Session]:
+        """Take an idle session for a warehouse (called with the lock held).
+
+        Sessions of other warehouses are only taken when the pool is full.
+
+        Args:
+            warehouse: Warehouse of the session.
+
+        Returns:
+            Idle session, or None if a new session should be opened (or the caller
+            should wait).
+        """
+        for index in reversed(range(len(self._idle))):
+            if self._idle[index].warehouse == warehouse:
+                return self._idle.pop(index)
+        if self._idle and not self._has_room():
+            return self._idle.pop()
+        return None
+
+    def _return(self, session: _Session):
+        """Hand a session to the first waiter, or keep it idle.
+
+        Args:
+            session: Session that is no longer used.
+        """
+        with self._lock:
+            if self._closed:
+                self._size -= 1
+            elif self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.session = session
+                waiter.event.set()
+                return
+            else:
+                self._idle.append(session)
+                return
+        session.connection.close()
+
+    def _discard(self):
+        """Forget a session that could not be opened or was closed.
+
+        The first waiter (if any) is allowed to open a new session instead.
+        """
+        with self._lock:
+            if self._waiters and not self._closed:
+                waiter = self._waiters.popleft()
+                waiter.session = None
+                waiter.event.set()
+            else:
+                self._size -= 1
+
+    def _open_session(self, warehouse: Optional[str]) -> _Session:
+        """Open a new session and set it up.
+
+        Args:
+            warehouse: Warehouse of the session.
+
+        Returns:
+            Session.
+        """
+        start = time.perf_counter()
+        connection = self.connection_factory()
+        statements = []
+        if warehouse is not None:
+            statements.append(USE_WAREHOUSE_SQL_TEMPLATE.format(warehouse=warehouse))
+        if self.session_parameters:
+            statements.append(format_session_parameters(self.session_parameters))
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+        self._logger.info(
+            "Session opened in %.2fs (warehouse=%s).",
+            time.perf_counter() - start,
+            warehouse,
+        )
+
+        return _Session(connection=connection, warehouse=warehouse)
+
+    def _prepare_session(
+        self, session: Optional[_Session], warehouse: Optional[str]
+    ) -> _Session:
+        """Get a checked out session ready for a warehouse.
+
+        Sessions idle for too long are checked first, and replaced if they no longer
+        work. Sessions of another warehouse are switched to the requested one (or
+        replaced, when the default warehouse of new connections is requested).
+
+        Args:
+            session: Checked out session (None to open a new one).
+            warehouse: Warehouse of the session.
+
+        Returns:
+            Session ready to use.
+        """
+        if session is not None and not self._is_healthy(session):
+            session.connection.close()
+            session = None
+        if session is not None and session.warehouse != warehouse:
+            if warehouse is None:
+                session.connection.close()
+                session = None
+            else:
+                with session.connection.cursor() as cursor:
+                    cursor.execute(
+                        USE_WAREHOUSE_SQL_TEMPLATE.format(warehouse=warehouse)
+                    )
+                session.warehouse = warehouse
+        return session or self._open_session(warehouse)
+
+    def _is_healthy(self, session: _Session) -> bool:
+        """Check whether an idle session still works.
+
+        Sessions used recently are assumed to work.
+
+        Args:
+            session: Session.
+
+        Returns:
+            True if the session works.
+        """
+        if session.connection.is_closed():
+            return False
+        if (
+            self.health_check_interval is None
+            or time.monotonic() - session.last_used < self.health_check_interval
+        ):
+            return True
+        try:
+            with session.connection.cursor() as cursor:
+                cursor.execute(HEALTH_CHECK_SQL)
+                cursor.fetchall()
+        except Error as e:
+            self._logger.warning("Session failed its health check: %s", e)
+            return False
+        return True
@@ -1,25 +1,61 @@
 """Module for a Data Vault load."""
 
+import copy
+import hashlib
 import itertools
 import logging
+import re
 from datetime import datetime
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pytz import timezone
 
-from . import METADATA_FIELDS, TEMPLATES_DIR, FieldRole, FixedPrefixLoggerAdapter
+from . import (
+    METADATA_FIELDS,
+    TEMPLATES_DIR,
+    FieldRole,
+    FixedPrefixLoggerAdapter,
+    StagingTableKind,
+)
 from .field import Field
 from .hub import Hub
 from .link import Link
+from .role_playing_hub import RolePlayingHub
 from .satellite import Satellite
 from .table import DataVaultTable, StagingTable
 from .template_sql.sql_formulas import (
     ALIASED_BUSINESS_KEY_SQL_TEMPLATE,
+    ASYNC_STATEMENT_SQL_TEMPLATE,
+    AWAIT_ALL_SQL_TEMPLATE,
+    CALL_PROCEDURE_SQL_TEMPLATE,
+    DROP_TABLE_SQL_TEMPLATE,
+    RECORD_START_TIMESTAMP_ARGUMENT_SQL_TEMPLATE,
     RECORD_START_TIMESTAMP_SQL_TEMPLATE,
+    SOURCE_ARGUMENT_SQL_TEMPLATE,
     SOURCE_SQL_TEMPLATE,
+    STAGING_TABLE_ARGUMENT_SQL_TEMPLATE,
+    rename_session_variables,
+    split_sql_script,
 )
 
+# Format of the extraction start timestamp in the SQL statements of a load.
+EXTRACT_START_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+# Prefix of the stored procedures generated for each load (check
+# `DataVaultLoad.procedure_name`).
+PROCEDURE_NAME_PREFIX = "dv_load_"
+
+# Number of characters of the model fingerprint used in procedure names.
+PROCEDURE_FINGERPRINT_LENGTH = 16
+
+# Names of the arguments of the stored procedures generated for each load.
+PROCEDURE_ARGUMENTS = {
+    "extract_start_timestamp": "extract_start_timestamp",
+    "staging_table": "staging_table",
+    "source": "source",
+}
+
 
 class DataVaultLoad:
     """Load data in a Data Vault."""
@@ -35,6 +71,7 @@ class DataVaultLoad:
         extract_start_timestamp: datetime,
         target_tables: List[DataVaultTable],
         source: Optional[str] = None,
+        staging_table_kind: StagingTableKind = StagingTableKind.PERMANENT,
     ):
         """Instantiate a DataVaultLoad object and calculate additional fields.
 
@@ -49,18 +86,13 @@ class DataVaultLoad:
             source: Source system/API/database. If source is not passed as argument, the
                 process will assume that a source (field named according to
                 METADATA_FIELDS naming conventions) will exist in target table.
+            staging_table_kind: Kind of staging table. Temporary staging tables are
+                only visible to the session that creates them: the whole load must
+                run in a single session (e.g. `sql_load_script` or `sql_load_block`).
 
         Raises:
             ValueError: When the extract_start_timestamp is not linked to a timezone.
         """
-        self.extract_schema = extract_schema
-        self.extract_table = extract_table
-        self.staging_table = StagingTable(
-            schema=staging_schema,
-            name=staging_table,
-            extract_start_timestamp=extract_start_timestamp,
-        )
-
         # Check if extract_start_timestamp is timezone-aware.
         if extract_start_timestamp.tzinfo is None:
             raise ValueError(
@@ -71,6 +103,17 @@ class DataVaultLoad:
         self.extract_start_timestamp = extract_start_timestamp.astimezone(
             timezone("UTC")
         )
+
+        self.extract_schema = extract_schema
+        self.extract_table = extract_table
+        # The staging table suffix is in UTC, as expected by the staging table
+        # sweeper.
+        self.staging_table = StagingTable(
+            schema=staging_schema,
+            name=staging_table,
+            extract_start_timestamp=self.extract_start_timestamp,
+            kind=staging_table_kind,
+        )
         self.target_tables = target_tables
         self.source = source
         self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
@@ -101,7 +144,10 @@ class DataVaultLoad:
         """Set target tables.
 
         Perform the following actions:
-            1. Sort target_tables by loading order and name.
+            1. Sort target_tables by loading order and name. Tables that are already
+                bound to the staging table of another load are replaced by a shallow
+                copy, so that the same (deserialized) table instance can be shared by
+                several loads.
             2. Define staging_table and staging schema for all target_tables: physical
                 name of the staging table, including extract_start_timestamp as suffix.
             3. Build relationship between each Satellite and its parent table.
@@ -116,7 +162,8 @@ class DataVaultLoad:
                 in self.target_tables.
         """
         self._target_tables = sorted(
-            target_tables, key=lambda x: (x.loading_order, x.name)
+            (self._bind_target_table(target_table) for target_table in target_tables),
+            key=lambda x: (x.loading_order, x.name),
         )
         for target_table in self._target_tables:
             target_table.staging_table = self.staging_table
@@ -141,6 +188,21 @@ class DataVaultLoad:
                             f"target_tables configuration."
                         ) from e
 
+    def _bind_target_table(self, target_table: DataVaultTable) -> DataVaultTable:
+        """Get the instance of a target table that should be bound to this load.
+
+        Args:
+            target_table: Table to be populated.
+
+        Returns:
+            The table itself, or a shallow copy of it, if it is already bound to the
+            staging table of another load.
+        """
+        staging_table = getattr(target_table, "staging_table", None)
+        if staging_table is not None and staging_table is not self.staging_table:
+            return copy.copy(target_table)
+        return target_table
+
     @property
     def staging_create_sql_statement(self) -> str:
         """Generate the SQL query to create the staging table.
@@ -184,6 +246,7 @@ class DataVaultLoad:
             fields_ddl.append(field.ddl_in_staging)
 
         query_args = {
+            "staging_table_kind": self.staging_table.kind.value,
             "staging_schema": self.staging_table.schema,
             "staging_table": self.staging_table.name,
             "fields_dml": ", ".join(fields_dml),
@@ -204,6 +267,17 @@ class DataVaultLoad:
 
         return staging_table_create_sql
 
+    @property
+    def staging_drop_sql_statement(self) -> str:
+        """Generate the SQL statement to drop the staging table.
+
+        Returns:
+            SQL statement to drop the staging table, once the load finished.
+        """
+        return DROP_TABLE_SQL_TEMPLATE.format(
+            table=f"{self.staging_table.schema}.{self.staging_table.name}"
+        )
+
     @property
     def sql_load_script(self) -> List[str]:
         """Generate the SQL script to load current Data Vault model.
@@ -224,12 +298,248 @@ class DataVaultLoad:
         in parallel.
         """
         result = [[self.staging_create_sql_statement]]
-        for _, group in itertools.groupby(
-            self.target_tables, key=lambda x: x.loading_order
-        ):
+        for group in self.target_tables_by_group:
             result.append([table.sql_load_statement for table in group])
         return result
 
+    @property
+    def sql_load_block(self) -> str:
+        """Generate a single Snowflake Scripting block to load current Data Vault model.
+
+        The block creates the staging table and loads each group of
+        `sql_load_scripts_by_group`. Within a group, the MERGE statements run
+        concurrently (`ASYNC`), and the block waits for all of them (`AWAIT ALL`)
+        before loading the next group. As all statements run in the same session, the
+        session variables of each table's script are renamed (suffixed with the table
+        name), while they are set before the MERGE statements of the group start.
+
+        This makes it possible to run a whole load server side, in a single call.
+
+        Returns:
+            SQL script with a single `EXECUTE IMMEDIATE` statement.
+        """
+        sql_load_block = (
+            (TEMPLATES_DIR / "scripting_block.sql")
+            .read_text()
+            .format(statements="\n".join(self._sql_load_block_statements))
+        )
+
+        self._logger.info("Loading SQL block generated.")
+        self._logger.debug("\n(%s)", sql_load_block)
+
+        return sql_load_block
+
+    @property
+    def _sql_load_block_statements(self) -> List[str]:
+        """Generate the statements of the Snowflake Scripting block of this load.
+
+        Check `sql_load_block`.
+
+        Returns:
+            SQL statements to be run in a Snowflake Scripting block.
+        """
+        statements = [self.staging_create_sql_statement]
+        for group in self.target_tables_by_group:
+            for target_table in group:
+                *variable_statements, merge_statement = split_sql_script(
+                    rename_session_variables(
+                        target_table.sql_load_statement, target_table.name
+                    )
+                )
+                statements.extend(variable_statements)
+                statements.append(
+                    ASYNC_STATEMENT_SQL_TEMPLATE.format(
+                        statement=merge_statement.rstrip(";")
+                    )
+                )
+            statements.append(AWAIT_ALL_SQL_TEMPLATE)
+
+        return statements
+
+    @property
+    def _procedure_arguments(self) -> List[str]:
+        """Get the names of the arguments of the stored procedure of this load.
+
+        The source is only an argument if it is defined in this load.
+
+        Returns:
+            Names of the procedure arguments.
+        """
+        arguments = [
+            PROCEDURE_ARGUMENTS["extract_start_timestamp"],
+            PROCEDURE_ARGUMENTS["staging_table"],
+        ]
+        if self.source is not None:
+            arguments.append(PROCEDURE_ARGUMENTS["source"])
+        return arguments
+
+    @property
+    def _procedure_statements(self) -> List[str]:
+        """Generate the statements of the stored procedure of this load.
+
+        They are the statements of `sql_load_block`, where the extraction start
+        timestamp, the staging table and the source are replaced by procedure
+        arguments. They are the same for all loads with the same shape (target
+        tables, extraction table and staging schema).
+
+        Returns:
+            SQL statements to be run in the stored procedure.
+        """
+        replacements = {
+            RECORD_START_TIMESTAMP_SQL_TEMPLATE.format(
+                extract_start_timestamp=self.extract_start_timestamp.strftime(
+                    EXTRACT_START_TIMESTAMP_FORMAT
+                )
+            ): RECORD_START_TIMESTAMP_ARGUMENT_SQL_TEMPLATE.format(
+                argument=PROCEDURE_ARGUMENTS["extract_start_timestamp"]
+            ),
+            f"{self.staging_table.schema}.{self.staging_table.name}": (
+                STAGING_TABLE_ARGUMENT_SQL_TEMPLATE.format(
+                    argument=PROCEDURE_ARGUMENTS["staging_table"]
+                )
+            ),
+        }
+        if self.source is not None:
+            replacements[SOURCE_SQL_TEMPLATE.format(source=self.source)] = (
+                SOURCE_ARGUMENT_SQL_TEMPLATE.format(
+                    argument=PROCEDURE_ARGUMENTS["source"]
+                )
+            )
+        pattern = re.compile(
+            "|".join(rf"{re.escape(value)}\b" for value in replacements)
+        )
+
+        return [
+            pattern.sub(lambda match: replacements[match.group(0)], statement)
+            for statement in self._sql_load_block_statements
+        ]
+
+    @property
+    def procedure_name(self) -> str:
+        """Get the name of the stored procedure of this load.
+
+        The name holds a fingerprint of the procedure (target tables, extraction
+        table and staging schema), so it only changes when the model changes.
+
+        Returns:
+            Stored procedure name.
+        """
+        fingerprint = hashlib.sha256(
+            "\n".join(self._procedure_arguments + self._procedure_statements).encode()
+        ).hexdigest()[:PROCEDURE_FINGERPRINT_LENGTH]
+
+        return f"{PROCEDURE_NAME_PREFIX}{self.extract_table}_{fingerprint}"
+
+    @property
+    def sql_create_procedure_statement(self) -> str:
+        """Generate the SQL statement to create the stored procedure of this load.
+
+        The procedure runs the same statements as `sql_load_block`, taking the
+        extraction start timestamp, the staging table (schema and name) and the source
+        (if defined in this load) as arguments. It is created in the staging schema
+        and only if it does not exist yet: as its name holds a fingerprint of the
+        procedure (check `procedure_name`), it only needs to be created when the model
+        changes.
+
+        Returns:
+            SQL statement to create the stored procedure.
+        """
+        sql_create_procedure_statement = (
+            (TEMPLATES_DIR / "load_procedure_ddl.sql")
+            .read_text()
+            .format(
+                procedure_schema=self.staging_table.schema,
+                procedure_name=self.procedure_name,
+                arguments=", ".join(
+                    f"{argument} VARCHAR" for argument in self._procedure_arguments
+                ),
+                staging_table_argument=PROCEDURE_ARGUMENTS["staging_table"],
+                statements="\n".join(self._procedure_statements),
+            )
+        )
+
+        self._logger.info("Procedure (%s) SQL generated.", self.procedure_name)
+        self._logger.debug("\n(%s)", sql_create_procedure_statement)
+
+        return sql_create_procedure_statement
+
+    @property
+    def sql_call_procedure_statement(self) -> str:
+        """Generate the SQL statement to call the stored procedure of this load.
+
+        Returns:
+            SQL statement that loads current Data Vault model through the stored
+            procedure created by `sql_create_procedure_statement`.
+        """
+        arguments = [
+            self.extract_start_timestamp.strftime(EXTRACT_START_TIMESTAMP_FORMAT),
+            f"{self.staging_table.schema}.{self.staging_table.name}",
+        ]
+        if self.source is not None:
+            arguments.append(self.source)
+
+        return CALL_PROCEDURE_SQL_TEMPLATE.format(
+            procedure_schema=self.staging_table.schema,
+            procedure_name=self.procedure_name,
+            arguments=", ".join(f"'{argument}'" for argument in arguments),
+        )
+
+    @property
+    def target_tables_by_group(self) -> List[List[DataVaultTable]]:
+        """Get target tables grouped by their loading order.
+
+        Groups follow the same order as `sql_load_scripts_by_group` (without the
+        staging table group).
+
+        Returns:
+            Target tables, one list per loading order.
+        """
+        return [
+            list(group)
+            for _, group in itertools.groupby(
+                self.target_tables, key=lambda x: x.loading_order
+            )
+        ]
+
+    @property
+    def dependencies(self) -> Dict[str, List[str]]:
+        """Get the dependencies between target tables.
+
+        The dependencies form a directed acyclic graph, where each table depends on:
+            - Satellite: its parent table (hub or link);
+            - Link: its parent hubs;
+            - RolePlayingHub: its parent hub (both are loaded into the same table).
+
+        Only dependencies that are part of target_tables are considered. All tables
+        depend on the staging table as well, which is not part of the result. A table
+        can be loaded as soon as all its dependencies are loaded, which is less strict
+        than the loading order used in `sql_load_scripts_by_group`.
+
+        Returns:
+            Names of the tables each target table depends on, indexed by table name.
+        """
+        target_table_names = {target_table.name for target_table in self.target_tables}
+        dependencies = {}
+        for target_table in self.target_tables:
+            if isinstance(target_table, Satellite):
+                parent_table_names = [target_table.parent_table_name]
+            elif isinstance(target_table, Link):
+                parent_table_names = target_table.parent_hub_names
+            elif (
+                isinstance(target_table, RolePlayingHub)
+                and target_table.parent_table is not None
+            ):
+                parent_table_names = [target_table.parent_table.name]
+            else:
+                parent_table_names = []
+            dependencies[target_table.name] = [
+                parent_table_name
+                for parent_table_name in parent_table_names
+                if parent_table_name in target_table_names
+            ]
+
+        return dependencies
+
     def _get_staging_dml_expression(self, field: Field, table: DataVaultTable) -> str:
         """Get the SQL expression to represent a field in the staging table.
 
@@ -243,7 +553,7 @@ class DataVaultLoad:
         if field.name_in_staging == METADATA_FIELDS["record_start_timestamp"]:
             return RECORD_START_TIMESTAMP_SQL_TEMPLATE.format(
                 extract_start_timestamp=self.extract_start_timestamp.strftime(
-                    "%Y-%m-%dT%H:%M:%S.%fZ"
+                    EXTRACT_START_TIMESTAMP_FORMAT
                 )
             )
         if (
@@ -0,0 +1,403 @@
+"""Base deserializer."""
+
+import gzip
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from functools import cached_property
+from pathlib import Path
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .. import TABLE_PREFIXES, FieldDataType, FixedPrefixLoggerAdapter, TableType
+from ..driving_key_field import DrivingKeyField
+from ..effectivity_satellite import EffectivitySatellite
+from ..field import Field
+from ..hub import Hub
+from ..link import Link
+from ..role_playing_hub import RolePlayingHub
+from ..satellite import Satellite
+from ..table import DataVaultTable
+
+# Suffix of metadata dumps that are stored gzip compressed.
+COMPRESSED_METADATA_SUFFIX = ".gz"
+
+
+class Deserializer(ABC):
+    """Deserialize a Data Vault model, based on column metadata.
+
+    The deserialization process will consist in converting the list of target table
+    names to a list of Table instances.
+
+    Each Table will have a list of Field instances (representing database table
+    columns). The column metadata is expected to follow the structure of the rows
+    returned by Snowflake's `SHOW COLUMNS` command. Subclasses define where this
+    metadata comes from (check `_fetch_metadata`).
+    """
+
+    def __init__(
+        self,
+        target_schema: str,
+        target_tables: List[str],
+        driving_keys: List[DrivingKeyField] = None,
+        role_playing_hubs: Dict[str, str] = None,
+    ):
+        """Instantiate a Deserializer.
+
+        Args:
+            target_schema: Schema where the Data Vault model is stored.
+            target_tables: Names of the tables that should be deserialized.
+            driving_keys: List of fields that should be used as driving keys in
+                current model's effectivity satellites (if applicable).
+            role_playing_hubs: List of tables that should be created as
+                RolePlayingHub objects. Each dictionary has the role playing hub as key
+                and the parent table as value.
+        """
+        self.target_schema = target_schema
+        self.target_tables = [table.lower() for table in target_tables]
+        self.driving_keys = driving_keys or []
+        self.role_playing_hubs = role_playing_hubs or {}
+
+        # Deserialized tables, indexed by name. Kept in memory to avoid
+        # instantiating (and validating) the same table more than once.
+        self._deserialized_tables: Dict[str, DataVaultTable] = {}
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+    def __str__(self) -> str:
+        """Representation of a Deserializer object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return (
+            f"{type(self).__name__}: schema={self.target_schema}, "
+            f"target_tables={';'.join(self.target_tables)}"
+        )
+
+    @property
+    def _model_tables(self) -> List[str]:
+        """Get the names of all tables of the deserialized model.
+
+        Returns:
+            Names of the target tables and of the role playing hubs' parent tables.
+        """
+        return list(
+            dict.fromkeys(self.target_tables + list(self.role_playing_hubs.values()))
+        )
+
+    @abstractmethod
+    def _fetch_metadata(self) -> Iterable[Dict[str, Any]]:
+        """Fetch the column metadata of the target schema.
+
+        Each entry represents one column and must hold, at least, `table_name`,
+        `column_name` and `data_type` (JSON string with the data type properties), as
+        returned by Snowflake's `SHOW COLUMNS` command. Columns must be grouped by
+        table and sorted by their position within the table.
+
+        Returns:
+            Column metadata, one entry per column.
+        """
+
+    def dump_metadata(self, file_path: Union[str, Path]):
+        """Dump the column metadata of the target schema to a file.
+
+        The dump holds the metadata of all tables in the target schema (not only
+        `self.target_tables`) and can be used to instantiate a `FileDeserializer`. If
+        the file name ends with `.gz`, the dump is stored gzip compressed.
+
+        Args:
+            file_path: Path of the file where the metadata should be stored.
+        """
+        file_path = Path(file_path)
+        metadata = json.dumps(list(self._fetch_metadata()), default=str)
+        if file_path.suffix == COMPRESSED_METADATA_SUFFIX:
+            file_path.write_bytes(gzip.compress(metadata.encode()))
+        else:
+            file_path.write_text(metadata, encoding="utf-8")
+
+        self._logger.info("Metadata dumped to (%s).", file_path)
+
+    def _deserialize_table(
+        self, target_table_name: str, fields: Optional[List[Field]] = None
+    ) -> DataVaultTable:
+        """Instantiate a DataVault table.
+
+        Args:
+            target_table_name: Name of the table to be instantiated.
+            fields: Fields of the table. If not provided, they are taken from
+                `self._fields`.
+
+        Returns:
+            Deserialized table.
+        """
+        table_args = {
+            "schema": self.target_schema,
+            "name": target_table_name,
+            "fields": fields if fields is not None else self._fields[target_table_name],
+        }
+        if self._get_table_type(target_table_name) == EffectivitySatellite:
+            table_args["driving_keys"] = self._driving_keys_by_table.get(
+                target_table_name
+            )
+
+        return self._get_table_type(target_table_name)(**table_args)
+
+    def _get_deserialized_table(self, target_table_name: str) -> DataVaultTable:
+        """Get a deserialized table, instantiating it only if it was not done before.
+
+        Args:
+            target_table_name: Name of the table to be returned.
+
+        Returns:
+            Deserialized table.
+        """
+        if target_table_name not in self._deserialized_tables:
+            self._deserialized_tables[target_table_name] = self._deserialize_table(
+                target_table_name
+            )
+
+        return self._deserialized_tables[target_table_name]
+
+    @cached_property
+    def _driving_keys_by_table(self) -> Dict[str, List[DrivingKeyField]]:
+        """Get mapping between a satellite and its driving keys.
+
+         The table must exist in self.driving_keys.
+
+        Returns:
+            List of driving keys, indexed by table name.
+        """
+        driving_keys_by_table = {}
+        effectivity_satellites = {
+            driving_key.satellite_name for driving_key in self.driving_keys
+        }
+        for table in effectivity_satellites:
+            driving_keys_by_table[table] = [
+                driving_key
+                for driving_key in self.driving_keys
+                if driving_key.satellite_name == table
+            ]
+
+        return driving_keys_by_table
+
+    @cached_property
+    def _fields(self) -> Dict[str, List[Field]]:
+        """Deserialize all fields present in `self.target_tables`.
+
+        Returns:
+            Mapping between each table and its fields list.
+        """
+        return self._deserialize_fields(self._fetch_metadata(), set(self._model_tables))
+
+    @classmethod
+    def _deserialize_fields(
+        cls, metadata: Iterable[Dict[str, Any]], tables: Collection[str]
+    ) -> Dict[str, List[Field]]:
+        """Deserialize the fields of the given tables from column metadata.
+
+        Args:
+            metadata: Column metadata, one entry per column (check `_fetch_metadata`).
+            tables: Names of the tables whose fields should be deserialized.
+
+        Returns:
+            Mapping between each table and its fields list.
+        """
+        fields = defaultdict(list)
+        for table_name, table_fields in cls._iter_fields(metadata, tables):
+            fields[table_name].extend(table_fields)
+
+        return fields
+
+    @staticmethod
+    def _iter_fields(
+        metadata: Iterable[Dict[str, Any]], tables: Collection[str]
+    ) -> Iterator[Tuple[str, List[Field]]]:
+        """Deserialize the fields of the given tables, one table at a time.
+
+        As column metadata is grouped by table, the fields of a table are yielded as
+        soon as the metadata of its last column is read.
+
+        Args:
+            metadata: Column metadata, one entry per column (check `_fetch_metadata`).
+            tables: Names of the tables whose fields should be deserialized.
+
+        Yields:
+            Table name and its fields list.
+        """
+        # Variables used to calculate the position of each field within its table.
+        # Snowflake's `SHOW COLUMNS` command returns the columns' metadata in the
+        # correct order, but does not return a pre-calculated field with the
+        # position of the field.
+        previous_table = None
+        position = 1
+        fields = []
+
+        for field in metadata:
+            table_name = field["table_name"].lower()
+
+            if table_name not in tables:
+                continue
+
+            if previous_table != table_name:
+                if previous_table is not None:
+                    yield previous_table, fields
+                position = 1
+                fields = []
+
+            data_type_properties = json.loads(field["data_type"])
+
+            fields.append(
+                Field(
+                    parent_table_name=table_name,
+                    name=field["column_name"].lower(),
+                    data_type=FieldDataType(
+                        data_type_properties["type"]
+                        if data_type_properties["type"] != "FIXED"
+                        else "NUMBER"
+                    ),
+                    position=position,
+                    is_mandatory=not (data_type_properties["nullable"]),
+                    precision=data_type_properties.get("precision"),
+                    scale=data_type_properties.get("scale"),
+                    length=data_type_properties.get("length"),
+                )
+            )
+
+            position += 1
+            previous_table = table_name
+
+        if previous_table is not None:
+            yield previous_table, fields
+
+    def _get_table_type(self, target_table_name: str) -> Type[DataVaultTable]:
+        """Get the type (class) that should be used to instantiate a given target table.
+
+        The type is calculated based on the table prefix.
+
+        Args:
+            target_table_name: Name of the table.
+
+        Returns:
+            Mapping between the table name and table type.
+
+        Raises:
+            RuntimeError: When the table name is not valid (does not have a valid
+                prefix).
+        """
+        table_prefix = next(split_part for split_part in target_table_name.split("_"))
+        if (
+            table_prefix in TABLE_PREFIXES[TableType.HUB]
+            and target_table_name in self.role_playing_hubs.keys()
+        ):
+            return RolePlayingHub
+        if table_prefix in TABLE_PREFIXES[TableType.HUB]:
+            return Hub
+        if table_prefix in TABLE_PREFIXES[TableType.LINK]:
+            return Link
+        if table_prefix in TABLE_PREFIXES[
+            TableType.SATELLITE
+        ] and self._driving_keys_by_table.get(target_table_name):
+            return EffectivitySatellite
+        if table_prefix in TABLE_PREFIXES[TableType.SATELLITE]:
+            return Satellite
+
+        raise RuntimeError(
+            f"'{target_table_name}' is not a valid name for a Table "
+            f"(check allowed prefixes in TABLE_PREFIXES enum)"
+        )
+
+    @cached_property
+    def deserialized_target_tables(self) -> List[DataVaultTable]:
+        """Deserialize all target tables passed as argument during instance creation.
+
+        The result is memoized. Parent tables of role playing hubs are resolved to the
+        same instances as target tables (when the parent is also a target table).
+
+        Returns:
+            List of deserialized target tables.
+        """
+        deserialized_target_tables = [
+            self._get_deserialized_table(table) for table in self.target_tables
+        ]
+
+        # Set RolePlayingHubs parent tables.
+        role_playing_hubs = filter(
+            lambda x: isinstance(x, RolePlayingHub), deserialized_target_tables
+        )
+        for rph in role_playing_hubs:
+            rph.parent_table = self._get_deserialized_table(
+                self.role_playing_hubs[rph.name]
+            )
+
+        return deserialized_target_tables
+
+    def iter_deserialized_target_tables(self) -> Iterator[DataVaultTable]:
+        """Deserialize target tables, yielding each of them as soon as it is complete.
+
+        Unlike `deserialized_target_tables`, each table is yielded as soon as the
+        metadata of its last column is read, so that consumers can start working on it
+        while the remaining metadata is fetched. Tables are yielded in the order of the
+        metadata (not in the order of `self.target_tables`). Role playing hubs are
+        yielded once their parent table is complete.
+
+        Once all tables are yielded, the result is memoized (check
+        `deserialized_target_tables`).
+
+        Yields:
+            Deserialized target tables.
+        """
+        if "deserialized_target_tables" in self.__dict__:
+            yield from self.deserialized_target_tables
+            return
+
+        target_tables = set(self.target_tables)
+        fields = defaultdict(list)
+        # Role playing hubs waiting for their parent table, indexed by parent name.
+        pending_role_playing_hubs: Dict[str, List[RolePlayingHub]] = defaultdict(list)
+
+        for table_name, table_fields in self._iter_fields(
+            self._fetch_metadata(), set(self._model_tables)
+        ):
+            fields[table_name].extend(table_fields)
+            table = self._deserialize_table(table_name, fields[table_name])
+            self._deserialized_tables[table_name] = table
+
+            for rph in pending_role_playing_hubs.pop(table_name, []):
+                rph.parent_table = table
+                yield rph
+
+            if isinstance(table, RolePlayingHub):
+                parent_table_name = self.role_playing_hubs[table_name]
+                if parent_table_name not in self._deserialized_tables:
+                    pending_role_playing_hubs[parent_table_name].append(table)
+                    continue
+                table.parent_table = self._deserialized_tables[parent_table_name]
+
+            if table_name in target_tables:
+                yield table
+
+        self.__dict__["_fields"] = fields
+
+        # Tables missing in the metadata fail here, as in `deserialized_target_tables`.
+        for parent_table_name, rphs in pending_role_playing_hubs.items():
+            for rph in rphs:
+                rph.parent_table = self._get_deserialized_table(parent_table_name)
+                yield rph
+
+        self.__dict__["deserialized_target_tables"] = [
+            self._get_deserialized_table(table) for table in self.target_tables
+        ]
@@ -0,0 +1,86 @@
+"""Deserializer for metadata dumps."""
+
+import gzip
+import json
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from ..driving_key_field import DrivingKeyField
+from .deserializer import COMPRESSED_METADATA_SUFFIX, Deserializer
+
+
+class FileDeserializer(Deserializer):
+    """Deserialize a Data Vault model, based on a metadata dump.
+
+    The metadata dump is a JSON list with the rows returned by Snowflake's
+    `SHOW COLUMNS` command (check `Deserializer.dump_metadata`), optionally gzip
+    compressed (files ending with `.gz`). No database connection is needed, which
+    makes it possible to bundle a model snapshot with a deployment.
+    """
+
+    def __init__(
+        self,
+        target_schema: str,
+        target_tables: List[str],
+        file_path: Union[str, Path],
+        driving_keys: List[DrivingKeyField] = None,
+        role_playing_hubs: Dict[str, str] = None,
+    ):
+        """Instantiate a FileDeserializer.
+
+        Args:
+            target_schema: Schema where the Data Vault model is stored.
+            target_tables: Names of the tables that should be deserialized.
+            file_path: Path of the metadata dump.
+            driving_keys: List of fields that should be used as driving keys in
+                current model's effectivity satellites (if applicable).
+            role_playing_hubs: List of tables that should be created as
+                RolePlayingHub objects. Each dictionary has the role playing hub as key
+                and the parent table as value.
+        """
+        self.file_path = Path(file_path)
+
+        super().__init__(
+            target_schema=target_schema,
+            target_tables=target_tables,
+            driving_keys=driving_keys,
+            role_playing_hubs=role_playing_hubs,
+        )
+
+        self._logger.info("Instance of (%s) created.", type(self))
+
+    def __str__(self) -> str:
+        """Representation of a FileDeserializer object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return (
+            f"{type(self).__name__}: file={self.file_path.name}, "
+            f"target_tables={';'.join(self.target_tables)}"
+        )
+
+    @cached_property
+    def _metadata(self) -> List[Dict[str, Any]]:
+        """Read the metadata dump.
+
+        Returns:
+            Column metadata, one entry per column.
+        """
+        if self.file_path.suffix == COMPRESSED_METADATA_SUFFIX:
+            metadata = gzip.decompress(self.file_path.read_bytes()).decode()
+        else:
+            metadata = self.file_path.read_text(encoding="utf-8")
+
+        return json.loads(metadata)
+
+    def _fetch_metadata(self) -> List[Dict[str, Any]]:
+        """Fetch the column metadata stored in the metadata dump.
+
+        Returns:
+            Column metadata, one entry per column.
+        """
+        return self._metadata
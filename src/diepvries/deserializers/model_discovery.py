@@ -0,0 +1,231 @@
+"""Automatic discovery of a whole Data Vault model."""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List
+
+from snowflake.connector import DictCursor
+
+from .. import FIELD_SUFFIX, TABLE_PREFIXES, FieldRole, TableType
+from ..driving_key_field import DrivingKeyField
+from ..hub import Hub
+from ..link import Link
+from ..satellite import Satellite
+from ..table import DataVaultTable
+from . import DESERIALIZERS_DIR
+from .model_session import ModelSession
+
+DISCOVERY_SQL_FILE_PATH = DESERIALIZERS_DIR / "snowflake_model_discovery.sql"
+
+# Pattern of the directives that configure a table in its comment
+# (e.g. "Supplier accounts. diepvries.parent_hub=h_account").
+COMMENT_DIRECTIVE_PATTERN = re.compile(r"diepvries\.(\w+)\s*=\s*([\w,]+)")
+
+# Directive that marks a hub as a role playing hub, with its parent hub as value.
+PARENT_HUB_DIRECTIVE = "parent_hub"
+
+# Directive that marks a satellite as an effectivity satellite, with a
+# comma-separated list of driving keys (fields of its parent link) as value.
+DRIVING_KEYS_DIRECTIVE = "driving_keys"
+
+
+@dataclass
+class DataVaultModel:
+    """Indexed Data Vault model, as discovered by `ModelDiscovery`."""
+
+    #: All tables in the model, indexed by name.
+    tables_by_name: Dict[str, DataVaultTable]
+    #: Satellites, indexed by the name of their parent table (hub or link).
+    satellites_by_parent: Dict[str, List[Satellite]] = field(default_factory=dict)
+    #: Links, indexed by the name of each of their parent hubs.
+    links_by_hub: Dict[str, List[Link]] = field(default_factory=dict)
+    #: Parent hubs, indexed by the name of the link.
+    hubs_by_link: Dict[str, List[Hub]] = field(default_factory=dict)
+
+    @property
+    def hubs(self) -> List[Hub]:
+        """Get all hubs in the model, including role playing hubs.
+
+        Returns:
+            Hubs in the model.
+        """
+        return [
+            table for table in self.tables_by_name.values() if isinstance(table, Hub)
+        ]
+
+    @property
+    def links(self) -> List[Link]:
+        """Get all links in the model.
+
+        Returns:
+            Links in the model.
+        """
+        return [
+            table for table in self.tables_by_name.values() if isinstance(table, Link)
+        ]
+
+    @property
+    def satellites(self) -> List[Satellite]:
+        """Get all satellites in the model, including effectivity satellites.
+
+        Returns:
+            Satellites in the model.
+        """
+        return [
+            table
+            for table in self.tables_by_name.values()
+            if isinstance(table, Satellite)
+        ]
+
+
+class ModelDiscovery(ModelSession):
+    """Discover all Data Vault tables in a schema, in a single metadata query.
+
+    Tables are classified by their prefix (check `TABLE_PREFIXES`); tables without a
+    Data Vault prefix are ignored. Role playing hubs and effectivity satellites are
+    configured through directives in table comments:
+
+    - `diepvries.parent_hub=<hub name>`: the hub is a role playing hub of the given
+      hub;
+    - `diepvries.driving_keys=<field name>[,<field name>]`: the satellite is an
+      effectivity satellite, with the given fields of its parent link as driving
+      keys.
+
+    The column metadata and table comments are fetched in one query, which is shared
+    with all deserializations done through this object (check `ModelSession`).
+    """
+
+    @cached_property
+    def _metadata(self) -> List[Dict[str, Any]]:
+        """Fetch the column metadata and table comments of the target schema.
+
+        Returns:
+            Column metadata, one entry per column (with the table comment as
+            `table_comment`).
+        """
+        discovery_sql = DISCOVERY_SQL_FILE_PATH.read_text(encoding="utf-8").format(
+            target_database=self.target_database, target_schema=self.target_schema
+        )
+        with (
+            self._metadata_deserializer.connection() as connection,
+            connection.cursor(DictCursor) as cursor,
+        ):
+            cursor.execute(discovery_sql)
+            metadata = list(cursor)
+
+        self._logger.info("Metadata fetched (%s columns).", len(metadata))
+
+        return metadata
+
+    @cached_property
+    def _directives_by_table(self) -> Dict[str, Dict[str, str]]:
+        """Get the comment directives of all Data Vault tables in the target schema.
+
+        Returns:
+            Directives (name and value), indexed by table name.
+        """
+        data_vault_prefixes = {
+            prefix for prefixes in TABLE_PREFIXES.values() for prefix in prefixes
+        }
+        directives_by_table = {}
+        for column in self._metadata:
+            table_name = column["table_name"].lower()
+            if (
+                table_name in directives_by_table
+                or table_name.split("_")[0] not in data_vault_prefixes
+            ):
+                continue
+            directives_by_table[table_name] = dict(
+                COMMENT_DIRECTIVE_PATTERN.findall(column.get("table_comment") or "")
+            )
+
+        return directives_by_table
+
+    def _get_driving_keys(
+        self, satellite_name: str, value: str
+    ) -> List[DrivingKeyField]:
+        """Build the driving keys of an effectivity satellite from a directive value.
+
+        Args:
+            satellite_name: Name of the effectivity satellite.
+            value: Value of the driving keys directive.
+
+        Returns:
+            Driving keys of the satellite.
+        """
+        parent_table_name = next(
+            satellite_field.name
+            for satellite_field in self._fields[satellite_name]
+            if satellite_field.role == FieldRole.HASHKEY_PARENT
+        ).replace(f"_{FIELD_SUFFIX[FieldRole.HASHKEY]}", "")
+
+        return [
+            DrivingKeyField(
+                parent_table_name=parent_table_name,
+                name=driving_key.lower(),
+                satellite_name=satellite_name,
+            )
+            for driving_key in value.split(",")
+            if driving_key
+        ]
+
+    @cached_property
+    def model(self) -> DataVaultModel:
+        """Discover the Data Vault model of the target schema.
+
+        Satellites have their parent table set and links are indexed by their parent
+        hubs (when those tables exist in the schema).
+
+        Returns:
+            Indexed Data Vault model.
+        """
+        role_playing_hubs = {}
+        driving_keys = []
+        for table_name, directives in self._directives_by_table.items():
+            table_prefix = table_name.split("_")[0]
+            if (
+                table_prefix in TABLE_PREFIXES[TableType.HUB]
+                and PARENT_HUB_DIRECTIVE in directives
+            ):
+                role_playing_hubs[table_name] = directives[PARENT_HUB_DIRECTIVE].lower()
+            if (
+                table_prefix in TABLE_PREFIXES[TableType.SATELLITE]
+                and DRIVING_KEYS_DIRECTIVE in directives
+            ):
+                driving_keys.extend(
+                    self._get_driving_keys(
+                        table_name, directives[DRIVING_KEYS_DIRECTIVE]
+                    )
+                )
+
+        tables_by_name = {
+            table.name: table
+            for table in self.deserialize(
+                target_tables=list(self._directives_by_table),
+                driving_keys=driving_keys,
+                role_playing_hubs=role_playing_hubs,
+            )
+        }
+
+        model = DataVaultModel(tables_by_name=tables_by_name)
+        satellites_by_parent = defaultdict(list)
+        for satellite in model.satellites:
+            satellite.parent_table = tables_by_name.get(satellite.parent_table_name)
+            satellites_by_parent[satellite.parent_table_name].append(satellite)
+        links_by_hub = defaultdict(list)
+        for link in model.links:
+            model.hubs_by_link[link.name] = [
+                tables_by_name[hub_name]
+                for hub_name in link.parent_hub_names
+                if hub_name in tables_by_name
+            ]
+            for hub_name in link.parent_hub_names:
+                links_by_hub[hub_name].append(link)
+        model.satellites_by_parent = dict(satellites_by_parent)
+        model.links_by_hub = dict(links_by_hub)
+
+        self._logger.info("Model discovered (%s tables).", len(tables_by_name))
+
+        return model
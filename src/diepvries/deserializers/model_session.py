@@ -0,0 +1,241 @@
+"""Shared metadata session for several deserializations."""
+
+import logging
+import threading
+from functools import cached_property
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from snowflake.connector import SnowflakeConnection
+
+from .. import FixedPrefixLoggerAdapter
+from ..connection_pool import ConnectionPool
+from ..driving_key_field import DrivingKeyField
+from ..effectivity_satellite import EffectivitySatellite
+from ..field import Field
+from ..role_playing_hub import RolePlayingHub
+from ..table import DataVaultTable
+from .deserializer import Deserializer
+from .snowflake_deserializer import DatabaseConfiguration, SnowflakeDeserializer
+
+
+class ModelSession:
+    """Share the metadata of a Data Vault schema between several deserializations.
+
+    The metadata of the whole schema is fetched from Snowflake once (on the first
+    deserialization) and used by all subsequent deserializations. Tables are shared
+    between deserializations whenever their configuration is the same (same type,
+    driving keys and role playing hub parent).
+    """
+
+    def __init__(
+        self,
+        target_schema: str,
+        database_configuration: DatabaseConfiguration,
+        database_connection: Optional[SnowflakeConnection] = None,
+        connection_pool: Optional[ConnectionPool] = None,
+    ):
+        """Instantiate a ModelSession.
+
+        Args:
+            target_schema: Schema where the Data Vault model is stored.
+            database_configuration: Holds all properties needed to create a Snowflake
+                database connection.
+            database_connection: Existing connection to be used instead of creating a
+                new one.
+            connection_pool: Pool of Snowflake sessions, used instead of a
+                connection (check `SnowflakeDeserializer`).
+        """
+        self.target_schema = target_schema
+        self.target_database = database_configuration.database
+        self._metadata_deserializer = SnowflakeDeserializer(
+            target_schema=target_schema,
+            target_tables=[],
+            database_configuration=database_configuration,
+            database_connection=database_connection,
+            connection_pool=connection_pool,
+        )
+        self.database_connection = self._metadata_deserializer.database_connection
+        # Deserialized tables, indexed by their configuration (check
+        # `_SessionDeserializer._table_key`).
+        self._tables: Dict[Tuple[Hashable, ...], DataVaultTable] = {}
+        self._lock = threading.RLock()
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+        self._logger.info("Instance of (%s) created.", type(self))
+
+    def __str__(self) -> str:
+        """Representation of a ModelSession object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return (
+            f"{type(self).__name__}: database={self.target_database}, "
+            f"schema={self.target_schema}"
+        )
+
+    @cached_property
+    def _metadata(self) -> List[Dict[str, Any]]:
+        """Fetch the column metadata of the target schema (once per session).
+
+        Returns:
+            Column metadata, one entry per column.
+        """
+        # pylint: disable=protected-access
+        metadata = list(self._metadata_deserializer._fetch_metadata())
+        self._logger.info("Metadata fetched (%s columns).", len(metadata))
+
+        return metadata
+
+    @cached_property
+    def _fields(self) -> Dict[str, List[Field]]:
+        """Deserialize the fields of all tables in the target schema.
+
+        Returns:
+            Mapping between each table and its fields list.
+        """
+        # pylint: disable=protected-access
+        return Deserializer._deserialize_fields(
+            self._metadata, {field["table_name"].lower() for field in self._metadata}
+        )
+
+    def _get_table(
+        self,
+        table_key: Tuple[Hashable, ...],
+        deserialize_table: Callable[[], DataVaultTable],
+    ) -> DataVaultTable:
+        """Get a table shared in this session, deserializing it if needed.
+
+        Args:
+            table_key: Configuration of the table.
+            deserialize_table: Function that deserializes the table.
+
+        Returns:
+            Deserialized table.
+        """
+        with self._lock:
+            if table_key not in self._tables:
+                self._tables[table_key] = deserialize_table()
+            return self._tables[table_key]
+
+    def deserialize(
+        self,
+        target_tables: List[str],
+        driving_keys: List[DrivingKeyField] = None,
+        role_playing_hubs: Dict[str, str] = None,
+    ) -> List[DataVaultTable]:
+        """Deserialize a set of target tables, using the metadata of this session.
+
+        Args:
+            target_tables: Names of the tables that should be deserialized.
+            driving_keys: List of fields that should be used as driving keys in
+                effectivity satellites (if applicable).
+            role_playing_hubs: List of tables that should be created as
+                RolePlayingHub objects. Each dictionary has the role playing hub as key
+                and the parent table as value.
+
+        Returns:
+            List of deserialized target tables.
+        """
+        with self._lock:
+            return _SessionDeserializer(
+                session=self,
+                target_tables=target_tables,
+                driving_keys=driving_keys,
+                role_playing_hubs=role_playing_hubs,
+            ).deserialized_target_tables
+
+
+class _SessionDeserializer(Deserializer):
+    """Deserializer that uses the metadata and tables shared by a `ModelSession`."""
+
+    def __init__(
+        self,
+        session: ModelSession,
+        target_tables: List[str],
+        driving_keys: List[DrivingKeyField] = None,
+        role_playing_hubs: Dict[str, str] = None,
+    ):
+        """Instantiate a _SessionDeserializer.
+
+        Args:
+            session: Session holding the metadata of the target schema.
+            target_tables: Names of the tables that should be deserialized.
+            driving_keys: List of fields that should be used as driving keys in
+                effectivity satellites (if applicable).
+            role_playing_hubs: List of tables that should be created as
+                RolePlayingHub objects. Each dictionary has the role playing hub as key
+                and the parent table as value.
+        """
+        self.session = session
+        super().__init__(
+            target_schema=session.target_schema,
+            target_tables=target_tables,
+            driving_keys=driving_keys,
+            role_playing_hubs=role_playing_hubs,
+        )
+
+    def _fetch_metadata(self) -> List[Dict[str, Any]]:
+        """Fetch the column metadata shared by the session.
+
+        Returns:
+            Column metadata, one entry per column.
+        """
+        # pylint: disable=protected-access
+        return self.session._metadata
+
+    @property
+    def _fields(self) -> Dict[str, List[Field]]:
+        """Get the fields deserialized by the session.
+
+        Returns:
+            Mapping between each table and its fields list.
+        """
+        # pylint: disable=protected-access
+        return self.session._fields
+
+    def _table_key(self, target_table_name: str) -> Tuple[Hashable, ...]:
+        """Get the configuration of a table, used to share it in the session.
+
+        Args:
+            target_table_name: Name of the table.
+
+        Returns:
+            Table name and type, plus driving keys (effectivity satellites) or parent
+            table name (role playing hubs).
+        """
+        table_type = self._get_table_type(target_table_name)
+        if table_type == EffectivitySatellite:
+            return (
+                target_table_name,
+                table_type.__name__,
+                tuple(
+                    (driving_key.parent_table_name, driving_key.name)
+                    for driving_key in self._driving_keys_by_table[target_table_name]
+                ),
+            )
+        if table_type == RolePlayingHub:
+            return (
+                target_table_name,
+                table_type.__name__,
+                self.role_playing_hubs[target_table_name],
+            )
+        return target_table_name, table_type.__name__
+
+    def _get_deserialized_table(self, target_table_name: str) -> DataVaultTable:
+        """Get a deserialized table, shared with other deserializations of the session.
+
+        Args:
+            target_table_name: Name of the table to be returned.
+
+        Returns:
+            Deserialized table.
+        """
+        # pylint: disable=protected-access
+        return self.session._get_table(
+            self._table_key(target_table_name),
+            lambda: self._deserialize_table(target_table_name),
+        )
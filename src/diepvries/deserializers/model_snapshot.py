@@ -0,0 +1,263 @@
+"""Binary snapshots of a deserialized Data Vault model."""
+
+import json
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type, Union
+
+from .. import FieldDataType
+from ..driving_key_field import DrivingKeyField
+from ..effectivity_satellite import EffectivitySatellite
+from ..field import Field
+from ..hub import Hub
+from ..link import Link
+from ..role_playing_hub import RolePlayingHub
+from ..satellite import Satellite
+from ..table import DataVaultTable, Table
+
+# Bytes that identify a model snapshot file.
+SNAPSHOT_MAGIC = b"DVSNAP"
+
+# Version of the snapshot format. It must be incremented whenever the structure of
+# the snapshot changes, as snapshots written with another version cannot be loaded.
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Snapshot header: magic bytes followed by the format version (unsigned short).
+_SNAPSHOT_HEADER = struct.Struct(f">{len(SNAPSHOT_MAGIC)}sH")
+
+# Table types that can be stored in a snapshot, indexed by their name.
+SNAPSHOT_TABLE_TYPES: Dict[str, Type[DataVaultTable]] = {
+    table_type.__name__: table_type
+    for table_type in (Hub, RolePlayingHub, Link, Satellite, EffectivitySatellite)
+}
+
+
+def dump_model_snapshot(
+    target_tables: List[DataVaultTable], file_path: Union[str, Path]
+):
+    """Dump a deserialized Data Vault model to a binary snapshot file.
+
+    The snapshot holds the tables, their fields, driving keys (for effectivity
+    satellites), parent tables (for role playing hubs) and table types. Parent tables
+    of role playing hubs that are not part of `target_tables` are stored as well.
+
+    The snapshot consists of a header (`SNAPSHOT_MAGIC` and
+    `SNAPSHOT_FORMAT_VERSION`), followed by the zlib compressed model.
+
+    Args:
+        target_tables: Deserialized tables (e.g. `deserialized_target_tables` from a
+            deserializer).
+        file_path: Path of the file where the snapshot should be stored.
+
+    Raises:
+        TypeError: If one of the tables has a type that is not supported in snapshots.
+    """
+    tables_by_name: Dict[str, DataVaultTable] = {
+        table.name: table for table in target_tables
+    }
+    for table in target_tables:
+        if isinstance(table, RolePlayingHub) and table.parent_table is not None:
+            tables_by_name.setdefault(table.parent_table.name, table.parent_table)
+
+    tables = []
+    for table in tables_by_name.values():
+        table_type = type(table).__name__
+        if table_type not in SNAPSHOT_TABLE_TYPES:
+            raise TypeError(
+                f"{table}: Table type '{table_type}' not supported in model snapshots"
+            )
+        parent_table: Optional[Hub] = getattr(table, "parent_table", None)
+        tables.append(
+            [
+                table_type,
+                table.schema,
+                table.name,
+                [
+                    [
+                        field.name,
+                        field.data_type.value,
+                        field.position,
+                        field.is_mandatory,
+                        field.precision,
+                        field.scale,
+                        field.length,
+                    ]
+                    for field in table.fields
+                ],
+                [
+                    [driving_key.parent_table_name, driving_key.name]
+                    for driving_key in getattr(table, "driving_keys", None) or []
+                ],
+                (
+                    parent_table.name
+                    if isinstance(table, RolePlayingHub) and parent_table is not None
+                    else None
+                ),
+            ]
+        )
+
+    model = {
+        "target_tables": [table.name for table in target_tables],
+        "tables": tables,
+    }
+    header = _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION)
+    body = zlib.compress(json.dumps(model, separators=(",", ":")).encode())
+
+    Path(file_path).write_bytes(header + body)
+
+
+def load_model_snapshot(file_path: Union[str, Path]) -> List[DataVaultTable]:
+    """Load a deserialized Data Vault model from a binary snapshot file.
+
+    Tables are not validated, as they were already valid when the snapshot was
+    written (check `dump_model_snapshot`). Role playing hubs' parent tables are
+    resolved to the same instances returned as target tables, when applicable.
+
+    Args:
+        file_path: Path of the snapshot file.
+
+    Returns:
+        Deserialized target tables, in the order used when the snapshot was dumped.
+    """
+    model = _read_snapshot(file_path)
+
+    tables_by_name: Dict[str, DataVaultTable] = {}
+    parent_table_names: Dict[str, str] = {}
+    for table_type, schema, name, fields, driving_keys, parent_table in model["tables"]:
+        attributes: Dict[str, Any] = {}
+        if SNAPSHOT_TABLE_TYPES[table_type] == EffectivitySatellite:
+            attributes["driving_keys"] = [
+                _restore_driving_key(
+                    parent_table_name=parent_table_name,
+                    name=driving_key_name,
+                    satellite_name=name,
+                )
+                for parent_table_name, driving_key_name in driving_keys
+            ]
+        tables_by_name[name] = _restore_table(
+            table_type=SNAPSHOT_TABLE_TYPES[table_type],
+            schema=schema,
+            name=name,
+            fields=_restore_fields(name, fields),
+            **attributes,
+        )
+        if parent_table is not None:
+            parent_table_names[name] = parent_table
+
+    for name, parent_table_name in parent_table_names.items():
+        tables_by_name[name].parent_table = tables_by_name[parent_table_name]
+
+    return [tables_by_name[name] for name in model["target_tables"]]
+
+
+def _read_snapshot(file_path: Union[str, Path]) -> Dict[str, Any]:
+    """Read a snapshot file, checking its header before decompressing the model.
+
+    Args:
+        file_path: Path of the snapshot file.
+
+    Returns:
+        Snapshot representation of the model (check `dump_model_snapshot`).
+
+    Raises:
+        ValueError: If the file is not a model snapshot or if it was written with a
+            different snapshot format version.
+    """
+    snapshot = Path(file_path).read_bytes()
+    try:
+        magic, version = _SNAPSHOT_HEADER.unpack_from(snapshot)
+    except struct.error as e:
+        raise ValueError(f"'{file_path}': Not a model snapshot") from e
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"'{file_path}': Not a model snapshot")
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"'{file_path}': Snapshot format version {version} is not supported "
+            f"(expected version {SNAPSHOT_FORMAT_VERSION})"
+        )
+
+    return json.loads(zlib.decompress(snapshot[_SNAPSHOT_HEADER.size :]))
+
+
+def _restore_table(
+    table_type: Type[DataVaultTable],
+    schema: str,
+    name: str,
+    fields: List[Field],
+    **attributes: Any,
+) -> DataVaultTable:
+    """Instantiate a table without validating it.
+
+    `DataVaultTable.__init__` is bypassed (it validates the table), while the
+    attributes set by the constructors of each table type are set directly.
+
+    Args:
+        table_type: Type of the table.
+        schema: Data Vault schema name.
+        name: Data Vault table name.
+        fields: List of fields that the table holds.
+        attributes: Type specific attributes (e.g. `driving_keys`).
+
+    Returns:
+        Table instance.
+    """
+    table = table_type.__new__(table_type)
+    Table.__init__(table, schema=schema, name=name)
+    table.fields = fields
+    if issubclass(table_type, RolePlayingHub):
+        table.parent_table = None
+    for attribute, value in attributes.items():
+        setattr(table, attribute, value)
+
+    return table
+
+
+def _restore_fields(table_name: str, fields: List[List[Any]]) -> List[Field]:
+    """Instantiate the fields of a table stored in a snapshot, without validating them.
+
+    `Field.__init__` is bypassed, as names were already normalized when the snapshot
+    was written.
+
+    Args:
+        table_name: Name of the table the fields belong to.
+        fields: Snapshot representation of the fields (check `dump_model_snapshot`).
+
+    Returns:
+        Field instances.
+    """
+    restored_fields = []
+    for name, data_type, position, is_mandatory, precision, scale, length in fields:
+        field = Field.__new__(Field)
+        field.parent_table_name = table_name
+        field.name = name
+        field.data_type = FieldDataType(data_type)
+        field.position = position
+        field.is_mandatory = is_mandatory
+        field.precision = precision
+        field.scale = scale
+        field.length = length
+        restored_fields.append(field)
+
+    return restored_fields
+
+
+def _restore_driving_key(
+    parent_table_name: str, name: str, satellite_name: str
+) -> DrivingKeyField:
+    """Instantiate a driving key without validating it.
+
+    Args:
+        parent_table_name: Name of parent table in the database (always a Link).
+        name: Column name in the database.
+        satellite_name: Name of the satellite where this field is a driving key.
+
+    Returns:
+        Driving key instance.
+    """
+    driving_key = DrivingKeyField.__new__(DrivingKeyField)
+    driving_key.parent_table_name = parent_table_name
+    driving_key.name = name
+    driving_key.satellite_name = satellite_name
+
+    return driving_key
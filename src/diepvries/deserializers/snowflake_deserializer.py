@@ -1,27 +1,23 @@
 """Deserializer for Snowflake."""
 
-import json
-import logging
-from collections import defaultdict
+from contextlib import nullcontext
 from dataclasses import asdict, dataclass
-from functools import cached_property
-from typing import Dict, List, Optional, Type
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
 
-from snowflake.connector import DictCursor, connect
+from snowflake.connector import DictCursor, SnowflakeConnection, connect
+from snowflake.connector.errors import Error
 from snowflake.connector.network import DEFAULT_AUTHENTICATOR
 
-from .. import TABLE_PREFIXES, FieldDataType, FixedPrefixLoggerAdapter, TableType
+from ..connection_pool import ConnectionPool
 from ..driving_key_field import DrivingKeyField
-from ..effectivity_satellite import EffectivitySatellite
-from ..field import Field
-from ..hub import Hub
-from ..link import Link
-from ..role_playing_hub import RolePlayingHub
-from ..satellite import Satellite
-from ..table import DataVaultTable
 from . import DESERIALIZERS_DIR
+from .deserializer import Deserializer
 
 METADATA_SQL_FILE_PATH = DESERIALIZERS_DIR / "snowflake_model_metadata.sql"
+TABLE_METADATA_SQL_FILE_PATH = DESERIALIZERS_DIR / "snowflake_table_metadata.sql"
+TABLES_LAST_ALTERED_SQL_FILE_PATH = (
+    DESERIALIZERS_DIR / "snowflake_tables_last_altered.sql"
+)
 
 
 @dataclass
@@ -45,7 +41,7 @@ class DatabaseConfiguration:
             )
 
 
-class SnowflakeDeserializer:
+class SnowflakeDeserializer(Deserializer):
     """Deserialize a Data Vault model, based on Snowflake system metadata tables.
 
     The deserialization process will consist in converting the list of target table
@@ -62,11 +58,14 @@ class SnowflakeDeserializer:
         database_configuration: DatabaseConfiguration,
         driving_keys: List[DrivingKeyField] = None,
         role_playing_hubs: Dict[str, str] = None,
+        database_connection: Optional[SnowflakeConnection] = None,
+        connection_pool: Optional[ConnectionPool] = None,
     ):
         """Instantiate a SnowflakeDeserializer.
 
         Besides setting __init__ arguments as class attributes, it also creates a
-        Snowflake database connection.
+        Snowflake database connection (unless an existing one or a connection pool is
+        provided).
 
         Both target_tables and fields have their own setters (check
         @target_tables.setter and @fields.setter for more detail).
@@ -81,17 +80,33 @@ class SnowflakeDeserializer:
             role_playing_hubs: List of tables that should be created as
                 RolePlayingHub objects. Each dictionary has the role playing hub as key
                 and the parent table as value.
+            database_connection: Existing connection to be used instead of creating a
+                new one (e.g. a `ReplayConnection`).
+            connection_pool: Pool of Snowflake sessions (e.g. shared with load
+                executors), where a session is checked out for each metadata query
+                instead of holding a connection.
         """
-        self.target_schema = target_schema
-        self.target_tables = [table.lower() for table in target_tables]
         self.target_database = database_configuration.database
-        self.driving_keys = driving_keys or []
-        self.role_playing_hubs = role_playing_hubs or {}
-
-        # Create Snowflake database connection.
-        self.database_connection = connect(**asdict(database_configuration))
-
-        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+        self.connection_pool = connection_pool
+
+        # Create Snowflake database connection (unless sessions come from a pool).
+        self.database_connection = database_connection
+        if database_connection is None and connection_pool is None:
+            self.database_connection = connect(**asdict(database_configuration))
+
+        # Version of the deserialized model, incremented every time a refresh
+        # rebuilds at least one table (check `refresh`).
+        self.model_version = 0
+        # Moment when each table of the model was last altered, as of the last
+        # metadata fetch (or refresh).
+        self._last_altered: Optional[Dict[str, Any]] = None
+
+        super().__init__(
+            target_schema=target_schema,
+            target_tables=target_tables,
+            driving_keys=driving_keys,
+            role_playing_hubs=role_playing_hubs,
+        )
 
         self._logger.info("Instance of (%s) created.", type(self))
 
@@ -108,165 +123,134 @@ class SnowflakeDeserializer:
             f"target_tables={';'.join(self.target_tables)}"
         )
 
-    def _deserialize_table(self, target_table_name: str) -> DataVaultTable:
-        """Instantiate a DataVault table.
-
-        Args:
-            target_table_name: Name of the table to be instantiated.
+    def connection(self) -> ContextManager[SnowflakeConnection]:
+        """Get the connection used for metadata queries.
 
         Returns:
-            Deserialized table.
+            Context manager yielding the connection of this deserializer, or a
+            session checked out from its connection pool.
         """
-        table_args = {
-            "schema": self.target_schema,
-            "name": target_table_name,
-            "fields": self._fields[target_table_name],
-        }
-        if self._get_table_type(target_table_name) == EffectivitySatellite:
-            table_args["driving_keys"] = self._driving_keys_by_table.get(
-                target_table_name
-            )
-
-        return self._get_table_type(target_table_name)(**table_args)
+        if self.connection_pool is not None:
+            return self.connection_pool.connection()
+        return nullcontext(self.database_connection)
 
-    @cached_property
-    def _driving_keys_by_table(self) -> Dict[str, List[DrivingKeyField]]:
-        """Get mapping between a satellite and its driving keys.
+    def _fetch_metadata(self) -> Iterator[Dict[str, Any]]:
+        """Fetch the column metadata of the target schema from Snowflake.
 
-         The table must exist in self.driving_keys.
+        This metadata is fetched using Snowflake's `SHOW COLUMNS` command. The first
+        time, the moment when each table of the model was last altered is fetched
+        beforehand, as the baseline of `refresh`: tables altered while (or after) the
+        metadata is read are rebuilt by the next refresh.
 
-        Returns:
-            List of driving keys, indexed by table name.
+        Yields:
+            Column metadata, one entry per column.
         """
-        driving_keys_by_table = {}
-        effectivity_satellites = {
-            driving_key.satellite_name for driving_key in self.driving_keys
-        }
-        for table in effectivity_satellites:
-            driving_keys_by_table[table] = [
-                driving_key
-                for driving_key in self.driving_keys
-                if driving_key.satellite_name == table
-            ]
-
-        return driving_keys_by_table
-
-    @cached_property
-    def _fields(self) -> Dict[str, List[Field]]:
-        """Deserialize all fields present in `self.target_tables`.
-
-        This deserialization will be done using Snowflake's `SHOW COLUMNS` command.
-
-        Returns:
-            Mapping between each table and its fields list.
-        """
-        if self.role_playing_hubs:
-            tables = set(self.target_tables + list(self.role_playing_hubs.values()))
-        else:
-            tables = self.target_tables
-
+        if self._last_altered is None and self._model_tables:
+            try:
+                self._last_altered = self._fetch_last_altered()
+            except Error as e:
+                self._logger.warning(
+                    "Tables' last alteration could not be fetched (the next refresh "
+                    "rebuilds all tables): %s",
+                    e,
+                )
         model_metadata_sql = METADATA_SQL_FILE_PATH.read_text().format(
             target_database=self.target_database, target_schema=self.target_schema
         )
-        with self.database_connection.cursor(DictCursor) as cursor:
+        with self.connection() as connection, connection.cursor(DictCursor) as cursor:
             # Get model properties from database metadata (for all tables in
-            # self.target_tables).
+            # self.target_schema).
             cursor.execute(model_metadata_sql)
-            fields = defaultdict(list)
-
-            # Variables used to calculate the position of each field within its table.
-            # Snowflake's `SHOW COLUMNS` command returns the columns' metadata in the
-            # correct order, but does not return a pre-calculated field with the
-            # position of the field.
-            previous_table = None
-            position = 1
-
-            for field in cursor:
-                table_name = field["table_name"].lower()
-
-                if table_name not in tables:
-                    continue
-
-                if previous_table != table_name:
-                    position = 1
-
-                data_type_properties = json.loads(field["data_type"])
-
-                fields[table_name].append(
-                    Field(
-                        parent_table_name=table_name,
-                        name=field["column_name"].lower(),
-                        data_type=FieldDataType(
-                            data_type_properties["type"]
-                            if data_type_properties["type"] != "FIXED"
-                            else "NUMBER"
-                        ),
-                        position=position,
-                        is_mandatory=not (data_type_properties["nullable"]),
-                        precision=data_type_properties.get("precision"),
-                        scale=data_type_properties.get("scale"),
-                        length=data_type_properties.get("length"),
-                    )
-                )
+            yield from cursor
 
-                position += 1
-                previous_table = table_name
+    def _fetch_last_altered(self) -> Dict[str, Any]:
+        """Fetch the moment when each table of the model was last altered.
 
-        return fields
-
-    def _get_table_type(self, target_table_name: str) -> Type[DataVaultTable]:
-        """Get the type (class) that should be used to instantiate a given target table.
-
-        The type is calculated based on the table prefix.
+        Returns:
+            Last alteration timestamp, indexed by table name.
+        """
+        last_altered_sql = TABLES_LAST_ALTERED_SQL_FILE_PATH.read_text().format(
+            target_database=self.target_database, target_schema=self.target_schema
+        )
+        model_tables = set(self._model_tables)
+        with self.connection() as connection, connection.cursor(DictCursor) as cursor:
+            cursor.execute(last_altered_sql)
+            return {
+                table["table_name"].lower(): table["last_altered"]
+                for table in cursor
+                if table["table_name"].lower() in model_tables
+            }
+
+    def _fetch_table_metadata(self, target_table_name: str) -> List[Dict[str, Any]]:
+        """Fetch the column metadata of a single table from Snowflake.
 
         Args:
             target_table_name: Name of the table.
 
         Returns:
-            Mapping between the table name and table type.
-
-        Raises:
-            RuntimeError: When the table name is not valid (does not have a valid
-                prefix).
+            Column metadata, one entry per column.
         """
-        table_prefix = next(split_part for split_part in target_table_name.split("_"))
-        if (
-            table_prefix in TABLE_PREFIXES[TableType.HUB]
-            and target_table_name in self.role_playing_hubs.keys()
-        ):
-            return RolePlayingHub
-        if table_prefix in TABLE_PREFIXES[TableType.HUB]:
-            return Hub
-        if table_prefix in TABLE_PREFIXES[TableType.LINK]:
-            return Link
-        if table_prefix in TABLE_PREFIXES[
-            TableType.SATELLITE
-        ] and self._driving_keys_by_table.get(target_table_name):
-            return EffectivitySatellite
-        if table_prefix in TABLE_PREFIXES[TableType.SATELLITE]:
-            return Satellite
-
-        raise RuntimeError(
-            f"'{target_table_name}' is not a valid name for a Table "
-            f"(check allowed prefixes in TABLE_PREFIXES enum)"
+        table_metadata_sql = TABLE_METADATA_SQL_FILE_PATH.read_text().format(
+            target_database=self.target_database,
+            target_schema=self.target_schema,
+            target_table=target_table_name,
         )
+        with self.connection() as connection, connection.cursor(DictCursor) as cursor:
+            cursor.execute(table_metadata_sql)
+            return list(cursor)
 
-    @property
-    def deserialized_target_tables(self) -> List[DataVaultTable]:
-        """Deserialize all target tables passed as argument during instance creation.
+    def refresh(self) -> List[str]:
+        """Refresh the deserialized model with the tables altered since last refresh.
+
+        Instead of fetching the metadata of the whole schema again, only the tables
+        whose `LAST_DDL` (or `LAST_ALTERED`, when the former is not available) changed
+        since the metadata was fetched (or since the last refresh) are fetched and
+        rebuilt. When at least one table is rebuilt, `self.model_version` is
+        incremented, so that consumers can invalidate their caches.
 
         Returns:
-            List of deserialized target tables.
+            Names of the rebuilt tables.
+
+        Raises:
+            RuntimeError: When tables of the model were dropped from the target schema
+                (the model is left as it is).
         """
-        deserialized_target_tables = [
-            self._deserialize_table(table) for table in self.target_tables
+        if "_fields" not in self.__dict__:
+            # The metadata was not fetched yet: it will be up to date once fetched.
+            return []
+
+        last_altered = self._fetch_last_altered()
+        dropped_tables = [
+            table for table in self._model_tables if table not in last_altered
         ]
+        if dropped_tables:
+            raise RuntimeError(
+                f"Tables dropped from schema '{self.target_schema}': "
+                f"{', '.join(dropped_tables)}"
+            )
 
-        # Set RolePlayingHubs parent tables.
-        role_playing_hubs = filter(
-            lambda x: isinstance(x, RolePlayingHub), deserialized_target_tables
-        )
-        for rph in role_playing_hubs:
-            rph.parent_table = self._deserialize_table(self.role_playing_hubs[rph.name])
+        altered_tables = [
+            table
+            for table in self._model_tables
+            if self._last_altered is None
+            or last_altered[table] != self._last_altered.get(table)
+        ]
+        for table in altered_tables:
+            self._fields[table] = self._deserialize_fields(
+                self._fetch_table_metadata(table), {table}
+            )[table]
+            self._deserialized_tables.pop(table, None)
+
+        self._last_altered = last_altered
+        if altered_tables:
+            # Drop memoized target tables, so that they are built again (pointing to
+            # the rebuilt tables).
+            self.__dict__.pop("deserialized_target_tables", None)
+            self.model_version += 1
+            self._logger.info(
+                "Model refreshed to version (%s), rebuilt tables: (%s).",
+                self.model_version,
+                ", ".join(altered_tables),
+            )
 
-        return deserialized_target_tables
+        return altered_tables
@@ -0,0 +1,22 @@
+/* Fetch all needed properties to discover all Table objects in a schema, including
+   table comments (used to configure role playing hubs and effectivity satellites).
+   Columns follow the structure of the results of `SHOW COLUMNS`. */
+SELECT
+  c.table_name,
+  c.column_name,
+  TO_JSON(
+    OBJECT_CONSTRUCT(
+      'type', IFF(c.data_type = 'FLOAT', 'REAL', c.data_type),
+      'nullable', c.is_nullable = 'YES',
+      'length', c.character_maximum_length,
+      'precision', c.numeric_precision,
+      'scale', c.numeric_scale
+    )
+  ) AS data_type,
+  c.comment,
+  t.comment AS table_comment
+FROM {target_database}.information_schema.columns AS c
+  INNER JOIN {target_database}.information_schema.tables AS t
+             ON (c.table_schema = t.table_schema AND c.table_name = t.table_name)
+WHERE c.table_schema = UPPER('{target_schema}')
+ORDER BY c.table_name, c.ordinal_position;
@@ -0,0 +1,2 @@
+/* Fetch all needed properties to initialize a single Table object. */
+SHOW COLUMNS IN TABLE {target_database}.{target_schema}.{target_table};
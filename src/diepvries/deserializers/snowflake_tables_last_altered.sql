@@ -0,0 +1,6 @@
+/* Fetch the moment when each table of the Data Vault model was last altered. */
+SELECT
+  table_name,
+  COALESCE(last_ddl, last_altered) AS last_altered
+FROM {target_database}.information_schema.tables
+WHERE table_schema = UPPER('{target_schema}');
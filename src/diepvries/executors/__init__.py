@@ -0,0 +1,5 @@
+"""Data Vault load executors."""
+
+from pathlib import Path
+
+EXECUTORS_DIR = Path(__file__).resolve().parent
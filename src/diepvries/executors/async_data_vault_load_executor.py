@@ -0,0 +1,435 @@
+"""Asynchronous (asyncio) executor for Data Vault loads."""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from snowflake.connector import DictCursor, SnowflakeConnection
+from snowflake.connector.constants import QueryStatus
+from snowflake.connector.cursor import SnowflakeCursor
+
+from .. import FixedPrefixLoggerAdapter
+from ..connection_pool import ConnectionPool
+from ..data_vault_load import DataVaultLoad
+from ..template_sql.sql_formulas import split_sql_script
+from .data_vault_load_executor import Scheduling
+from .load_statement import (
+    QUERY_TAG_PARAMETER,
+    LoadResult,
+    LoadStatement,
+    StatementResult,
+    StatementStatus,
+    get_load_statements,
+    get_query_tag_sql_statement,
+)
+
+# Statuses of queries waiting to run (for warehouse resources or locks).
+QUEUED_QUERY_STATUSES = {
+    QueryStatus.QUEUED,
+    QueryStatus.QUEUED_REPARING_WAREHOUSE,
+    QueryStatus.RESUMING_WAREHOUSE,
+    QueryStatus.BLOCKED,
+}
+
+
+@dataclass
+class PollingConfiguration:
+    """Configuration of the status checks of asynchronous queries.
+
+    The polling interval grows while a query runs, so that short queries finish
+    quickly while long ones cause few status requests.
+    """
+
+    #: Time (in seconds) to wait before the second status check of a query.
+    min_interval: float = 0.1
+    #: Maximum time (in seconds) between status checks of a query.
+    max_interval: float = 5.0
+    #: Factor applied to the interval after each check of a query still running.
+    backoff: float = 1.5
+
+    def __post_init__(self):
+        """Validate the polling configuration.
+
+        Raises:
+            ValueError: If the intervals are not positive, if min_interval is greater
+                than max_interval or if backoff is lower than 1.
+        """
+        if not 0 < self.min_interval <= self.max_interval or self.backoff < 1:
+            raise ValueError(
+                "Polling intervals should be positive (min_interval <= max_interval) "
+                "and backoff should be at least 1"
+            )
+
+
+class AsyncDataVaultLoadExecutor:
+    """Execute Data Vault loads from an asyncio event loop.
+
+    Statements are submitted with Snowflake asynchronous queries
+    (`SnowflakeCursor.execute_async`) and their completion is awaited by polling
+    their query ID, with a polling interval that grows while a query runs. No thread
+    is held while queries run, so a single event loop can drive many concurrent loads
+    (e.g. with `asyncio.gather`).
+
+    Scheduling and failure handling follow `DataVaultLoadExecutor`. As load scripts
+    rely on session variables, statements of the same table run one after the other
+    in the same connection, and each running table uses its own connection (from a
+    pool of at most `max_concurrency` connections, or from a shared
+    `ConnectionPool`, in which case concurrency is also bounded by its `max_size`).
+
+    Blocking calls to the Snowflake connector run in a thread pool of this executor,
+    with one thread per concurrent statement (instead of the default executor of the
+    event loop, that has a fixed number of threads).
+
+    Client-side timings of each statement are collected in its result: the time
+    between two status checks is attributed to the status seen at the first check
+    (queued or running). Queries can be tagged as in `DataVaultLoadExecutor`.
+    """
+
+    def __init__(
+        self,
+        connection_factory: Optional[Callable[[], SnowflakeConnection]] = None,
+        max_concurrency: int = 4,
+        fail_fast: bool = True,
+        scheduling: Scheduling = Scheduling.DEPENDENCIES,
+        polling_configuration: PollingConfiguration = None,
+        tag_queries: bool = False,
+        connection_pool: ConnectionPool = None,
+    ):
+        """Instantiate an AsyncDataVaultLoadExecutor.
+
+        Args:
+            connection_factory: Function that creates a new Snowflake connection.
+            max_concurrency: Maximum number of statements executed concurrently (and
+                of open connections), shared by all loads executed concurrently. It is
+                lowered to the `max_size` of connection_pool, when smaller.
+            fail_fast: Whether remaining statements should be skipped after a
+                statement fails.
+            scheduling: Strategy used to schedule the statements of a load.
+            polling_configuration: Configuration of the status checks of queries
+                (check `PollingConfiguration` for the defaults).
+            tag_queries: Whether the query tag of each session should be set to
+                identify the statements it runs.
+            connection_pool: Pool of Snowflake sessions, shared with other executors
+                and deserializers, used instead of connection_factory. It is not
+                closed with this executor.
+
+        Raises:
+            ValueError: If max_concurrency is lower than 1, or if not exactly one of
+                connection_factory and connection_pool is defined.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be at least 1")
+        if (connection_factory is None) == (connection_pool is None):
+            raise ValueError(
+                "Either connection_factory or connection_pool should be defined"
+            )
+
+        self.connection_factory = connection_factory
+        self.max_concurrency = max_concurrency
+        self.fail_fast = fail_fast
+        self.scheduling = scheduling
+        self.polling_configuration = polling_configuration or PollingConfiguration()
+        self.tag_queries = tag_queries
+        self._owns_connection_pool = connection_pool is None
+        self.connection_pool = connection_pool or ConnectionPool(connection_factory)
+        # Statements beyond the size of the pool would only wait for a session,
+        # holding a thread.
+        concurrency = min(
+            max_concurrency, self.connection_pool.max_size or max_concurrency
+        )
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pool = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix=type(self).__name__
+        )
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+        self._logger.info("Instance of (%s) created.", type(self))
+
+    def __str__(self) -> str:
+        """Representation of an AsyncDataVaultLoadExecutor object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return (
+            f"{type(self).__name__}: max_concurrency={self.max_concurrency}, "
+            f"fail_fast={self.fail_fast}, scheduling={self.scheduling.value}"
+        )
+
+    async def __aenter__(self) -> "AsyncDataVaultLoadExecutor":
+        """Enter the executor context.
+
+        Returns:
+            This executor.
+        """
+        return self
+
+    async def __aexit__(self, *_args):
+        """Exit the executor context, closing all connections.
+
+        Args:
+            _args: Unused, exception details.
+        """
+        await self.close()
+
+    async def close(self):
+        """Close the connections and the threads of this executor."""
+        if self._owns_connection_pool:
+            await self._run_in_thread(self.connection_pool.close)
+        self._pool.shutdown(wait=False)
+
+    async def _run_in_thread(self, function: Callable, *args: Any) -> Any:
+        """Run a blocking function in the thread pool of this executor.
+
+        As `asyncio.to_thread`, the current context is propagated to the thread.
+
+        Args:
+            function: Blocking function (e.g. a Snowflake connector call).
+            args: Arguments of the function.
+
+        Returns:
+            Result of the function.
+        """
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._pool, functools.partial(context.run, function, *args)
+        )
+
+    async def _acquire_connection(self) -> SnowflakeConnection:
+        """Check out a connection from the pool, within the concurrency limit.
+
+        Returns:
+            Snowflake connection.
+        """
+        await self._semaphore.acquire()
+        connection = None
+        try:
+            connection = await self._run_in_thread(self.connection_pool.acquire)
+        finally:
+            if connection is None:
+                self._semaphore.release()
+
+        return connection
+
+    async def _release_connection(
+        self, connection: SnowflakeConnection, tagged: bool = False
+    ):
+        """Return a connection to the pool.
+
+        Args:
+            connection: Snowflake connection.
+            tagged: Whether the query tag of the session was set, in which case it is
+                reset.
+        """
+        try:
+            await self._run_in_thread(
+                self.connection_pool.release,
+                connection,
+                [QUERY_TAG_PARAMETER] if tagged else [],
+            )
+        finally:
+            self._semaphore.release()
+
+    async def execute(self, data_vault_load: DataVaultLoad) -> LoadResult:
+        """Execute a Data Vault load.
+
+        Args:
+            data_vault_load: Data Vault load.
+
+        Returns:
+            Results of all statements of the load.
+        """
+        start = time.perf_counter()
+        load_result = LoadResult(staging_table=data_vault_load.staging_table.name)
+        staging_statements, *load_statements = get_load_statements(data_vault_load)
+        failed = asyncio.Event()
+        staging_result = await self._execute_statement(staging_statements[0], failed)
+        load_result.statement_results.append(staging_result)
+
+        if self.scheduling == Scheduling.GROUPS:
+            # Each statement depends on all statements of the previous group.
+            dependencies = {
+                statement.target_table: [
+                    previous_statement.target_table
+                    for previous_statement in previous_statements
+                ]
+                for previous_statements, statements in zip(
+                    [[]] + load_statements, load_statements
+                )
+                for statement in statements
+            }
+        else:
+            dependencies = {
+                statement.target_table: statement.dependencies
+                for statements in load_statements
+                for statement in statements
+            }
+        statuses: Dict[str, asyncio.Future] = {
+            target_table: asyncio.get_running_loop().create_future()
+            for target_table in dependencies
+        }
+
+        async def execute_when_ready(load_statement: LoadStatement) -> StatementResult:
+            target_status = statuses[load_statement.target_table]
+            try:
+                dependency_statuses = [
+                    await statuses[dependency]
+                    for dependency in dependencies[load_statement.target_table]
+                ]
+                # Without the staging table, no table can be loaded.
+                if staging_result.status != StatementStatus.SUCCEEDED or any(
+                    status != StatementStatus.SUCCEEDED
+                    for status in dependency_statuses
+                ):
+                    result = StatementResult(
+                        statement=load_statement, status=StatementStatus.SKIPPED
+                    )
+                else:
+                    result = await self._execute_statement(load_statement, failed)
+                target_status.set_result(result.status)
+                return result
+            finally:
+                # Statements waiting for this one must not wait forever.
+                if not target_status.done():
+                    target_status.set_result(StatementStatus.FAILED)
+
+        load_result.statement_results.extend(
+            await asyncio.gather(
+                *(
+                    execute_when_ready(statement)
+                    for statements in load_statements
+                    for statement in statements
+                )
+            )
+        )
+        load_result.elapsed_time = time.perf_counter() - start
+
+        self._logger.info(
+            "Load of (%s) finished in %.2fs (%s failed statements).",
+            load_result.staging_table,
+            load_result.elapsed_time,
+            len(load_result.failed_statements),
+        )
+
+        return load_result
+
+    async def _execute_statement(
+        self, load_statement: LoadStatement, failed: asyncio.Event
+    ) -> StatementResult:
+        """Execute a load statement, in a single connection.
+
+        Args:
+            load_statement: Statement to execute.
+            failed: Event set when a statement of the load fails. When set and in fail
+                fast mode, the statement is skipped.
+
+        Returns:
+            Statement result.
+        """
+        if self.fail_fast and failed.is_set():
+            return StatementResult(
+                statement=load_statement, status=StatementStatus.SKIPPED
+            )
+
+        result = StatementResult(
+            statement=load_statement, status=StatementStatus.SUCCEEDED
+        )
+        connection = None
+        tagged = False
+        start = time.perf_counter()
+        try:
+            connection = await self._acquire_connection()
+            # Checked again, as another statement might have failed in the meantime.
+            if self.fail_fast and failed.is_set():
+                result.status = StatementStatus.SKIPPED
+                return result
+
+            with connection.cursor(DictCursor) as cursor:
+                if self.tag_queries:
+                    tagged = True
+                    await self._run_in_thread(
+                        cursor.execute, get_query_tag_sql_statement([load_statement])
+                    )
+                for statement in split_sql_script(load_statement.sql):
+                    result.query_ids.append(
+                        await self._execute_async(connection, cursor, statement, result)
+                    )
+        except Exception as e:  # pylint: disable=broad-except
+            # Any error (not only Snowflake's, e.g. network errors) fails the
+            # statement, so that statements depending on it are skipped.
+            result.status = StatementStatus.FAILED
+            result.error = e
+            failed.set()
+            self._logger.error(
+                "Statement for (%s) failed: %s",
+                load_statement.target_table or "staging table",
+                e,
+            )
+        finally:
+            if connection is not None:
+                await self._release_connection(connection, tagged)
+            if result.status != StatementStatus.SKIPPED:
+                result.elapsed_time = time.perf_counter() - start
+
+        return result
+
+    async def _execute_async(
+        self,
+        connection: SnowflakeConnection,
+        cursor: SnowflakeCursor,
+        statement: str,
+        result: StatementResult,
+    ) -> str:
+        """Submit a statement asynchronously and wait until it finishes.
+
+        The query status is polled with a growing interval (check
+        `PollingConfiguration`). Results are fetched once the statement finished.
+
+        Args:
+            connection: Snowflake connection.
+            cursor: Cursor of the connection.
+            statement: SQL statement.
+            result: Result of the load statement, where the timings and row counts
+                of the SQL statement are added.
+
+        Returns:
+            Query ID.
+        """
+        timings = result.timings
+        start = time.perf_counter()
+        await self._run_in_thread(cursor.execute_async, statement)
+        query_id = cursor.sfqid
+        check_time = time.perf_counter()
+        timings.submit_time += check_time - start
+        status = None
+        poll_interval = self.polling_configuration.min_interval
+        while status is None or connection.is_still_running(status):
+            if status is not None:
+                await asyncio.sleep(poll_interval)
+                poll_interval = min(
+                    poll_interval * self.polling_configuration.backoff,
+                    self.polling_configuration.max_interval,
+                )
+            previous_status = status
+            status = await self._run_in_thread(
+                connection.get_query_status_throw_if_error, query_id
+            )
+            previous_check_time, check_time = check_time, time.perf_counter()
+            if previous_status in QUEUED_QUERY_STATUSES:
+                timings.queued_time += check_time - previous_check_time
+            else:
+                timings.execution_time += check_time - previous_check_time
+
+        await self._run_in_thread(cursor.get_results_from_sfqid, query_id)
+        result.row_counts.add(await self._run_in_thread(cursor.fetchall))
+        timings.fetch_time += time.perf_counter() - check_time
+
+        return query_id
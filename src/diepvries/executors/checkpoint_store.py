@@ -0,0 +1,298 @@
+"""Persistence of the completed statements of Data Vault loads."""
+
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Set, Union
+
+from snowflake.connector import SnowflakeConnection
+
+from .. import FixedPrefixLoggerAdapter
+from . import EXECUTORS_DIR
+
+if TYPE_CHECKING:
+    from ..data_vault_load import DataVaultLoad
+
+CHECKPOINTS_DDL_SQL_FILE_PATH = EXECUTORS_DIR / "snowflake_checkpoints_ddl.sql"
+CHECKPOINTS_SELECT_SQL_FILE_PATH = EXECUTORS_DIR / "snowflake_checkpoints_select.sql"
+CHECKPOINTS_INSERT_SQL_FILE_PATH = EXECUTORS_DIR / "snowflake_checkpoints_insert.sql"
+CHECKPOINTS_DELETE_SQL_FILE_PATH = EXECUTORS_DIR / "snowflake_checkpoints_delete.sql"
+
+
+def get_checkpoint_key(data_vault_load: "DataVaultLoad") -> str:
+    """Get the key of the checkpoints of a load.
+
+    Args:
+        data_vault_load: Data Vault load.
+
+    Returns:
+        Qualified name of the staging table of the load.
+    """
+    staging_table = data_vault_load.staging_table
+    return f"{staging_table.schema}.{staging_table.name}"
+
+
+class CheckpointStore(ABC):
+    """Store of the completed statements of Data Vault loads.
+
+    Statements are recorded by qualified staging table name (which identifies a
+    load, as it holds the extraction start timestamp, check `get_checkpoint_key`) and
+    fingerprint (check `LoadStatement.fingerprint`).
+    """
+
+    def __init__(self):
+        """Instantiate a CheckpointStore."""
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+    def __str__(self) -> str:
+        """Representation of a CheckpointStore object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return type(self).__name__
+
+    @abstractmethod
+    def get_completed(self, staging_table: str) -> Set[str]:
+        """Get the fingerprints of the completed statements of a load.
+
+        Args:
+            staging_table: Qualified name of the staging table of the load.
+
+        Returns:
+            Statement fingerprints.
+        """
+
+    @abstractmethod
+    def mark_completed(self, staging_table: str, fingerprint: str):
+        """Record a completed statement of a load.
+
+        Args:
+            staging_table: Qualified name of the staging table of the load.
+            fingerprint: Statement fingerprint.
+        """
+
+    @abstractmethod
+    def clear(self, staging_table: str):
+        """Remove the records of the completed statements of a load.
+
+        Args:
+            staging_table: Qualified name of the staging table of the load.
+        """
+
+
+@dataclass
+class LoadCheckpoints:
+    """Checkpoints of a load, read from a `CheckpointStore` when the load starts."""
+
+    #: Store of the checkpoints.
+    checkpoint_store: CheckpointStore
+    #: Qualified name of the staging table of the load.
+    staging_table: str
+    #: Fingerprints of the statements completed in earlier attempts of the load.
+    completed: Set[str] = field(default_factory=set)
+
+    @classmethod
+    def read(
+        cls, checkpoint_store: CheckpointStore, data_vault_load: "DataVaultLoad"
+    ) -> "LoadCheckpoints":
+        """Read the checkpoints of a load.
+
+        Args:
+            checkpoint_store: Store of the checkpoints.
+            data_vault_load: Data Vault load.
+
+        Returns:
+            LoadCheckpoints instance.
+        """
+        staging_table = get_checkpoint_key(data_vault_load)
+        return cls(
+            checkpoint_store=checkpoint_store,
+            staging_table=staging_table,
+            completed=checkpoint_store.get_completed(staging_table),
+        )
+
+    def mark_completed(self, fingerprint: str):
+        """Record a completed statement of the load.
+
+        Args:
+            fingerprint: Statement fingerprint.
+        """
+        self.checkpoint_store.mark_completed(self.staging_table, fingerprint)
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Store of completed statements in a local JSON file."""
+
+    def __init__(self, file_path: Union[str, Path]):
+        """Instantiate a FileCheckpointStore.
+
+        Args:
+            file_path: Path of the JSON file (created when the first statement is
+                recorded).
+        """
+        self.file_path = Path(file_path)
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def __str__(self) -> str:
+        """Representation of a FileCheckpointStore object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return f"{type(self).__name__}: {self.file_path}"
+
+    def _read(self) -> Dict[str, List[str]]:
+        """Read the completed statements of all loads.
+
+        Returns:
+            Statement fingerprints, indexed by qualified staging table name.
+        """
+        if not self.file_path.exists():
+            return {}
+        return json.loads(self.file_path.read_text(encoding="utf-8"))
+
+    def _write(self, checkpoints: Dict[str, List[str]]):
+        """Write the completed statements of all loads.
+
+        The file is replaced at once, so that it is never left half written.
+
+        Args:
+            checkpoints: Statement fingerprints, indexed by staging table name.
+        """
+        temporary_file_path = self.file_path.with_suffix(".tmp")
+        temporary_file_path.write_text(
+            json.dumps(checkpoints, indent=2), encoding="utf-8"
+        )
+        temporary_file_path.replace(self.file_path)
+
+    def get_completed(self, staging_table: str) -> Set[str]:
+        """Get the fingerprints of the completed statements of a load.
+
+        Args:
+            staging_table: Qualified name of the staging table of the load.
+
+        Returns:
+            Statement fingerprints.
+        """
+        with self._lock:
+            return set(self._read().get(staging_table, []))
+
+    def mark_completed(self, staging_table: str, fingerprint: str):
+        """Record a completed statement of a load.
+
+        Args:
+            staging_table: Qualified name of the staging table of the load.
+            fingerprint: Statement fingerprint.
+        """
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints.setdefault(staging_table, []).append(fingerprint)
+            self._write(checkpoints)
+
+    def clear(self, staging_table: str):
+        """Remove the records of the completed statements of a load.
+
+        Args:
+            staging_table: Qualified name of the staging table of the load.
+        """
+        with self._lock:
+            checkpoints = self._read()
+            if checkpoints.pop(staging_table, None) is not None:
+                self._write(checkpoints)
+
+        self._logger.info("Checkpoints of (%s) cleared.", staging_table)
+
+
+class SnowflakeCheckpointStore(CheckpointStore):
+    """Store of completed statements in a Snowflake control table.
+
+    The control table is created when the store is instantiated, if it does not
+    exist.
+    """
+
+    def __init__(self, connection: SnowflakeConnection, checkpoint_table: str):
+        """Instantiate a SnowflakeCheckpointStore.
+
+        Args:
+            connection: Snowflake connection, used only by this store.
+            checkpoint_table: Qualified name of the control table.
+        """
+        self.connection = connection
+        self.checkpoint_table = checkpoint_table
+        self._lock = threading.Lock()
+        super().__init__()
+
+        self._execute(CHECKPOINTS_DDL_SQL_FILE_PATH)
+
+    def __str__(self) -> str:
+        """Representation of a SnowflakeCheckpointStore object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return f"{type(self).__name__}: {self.checkpoint_table}"
+
+    def _execute(self, sql_file_path: Path, **parameters) -> List[tuple]:
+        """Execute a statement on the control table.
+
+        Args:
+            sql_file_path: Path of the SQL statement.
+            parameters: Parameters bound to the statement.
+
+        Returns:
+            Rows returned by the statement.
+        """
+        sql = sql_file_path.read_text().format(checkpoint_table=self.checkpoint_table)
+        with self._lock, self.connection.cursor() as cursor:
+            cursor.execute(sql, parameters or None)
+            return cursor.fetchall()
+
+    def get_completed(self, staging_table: str) -> Set[str]:
+        """Get the fingerprints of the completed statements of a load.
+
+        Args:
+            staging_table: Qualified name of the staging table of the load.
+
+        Returns:
+            Statement fingerprints.
+        """
+        return {
+            fingerprint
+            for (fingerprint,) in self._execute(
+                CHECKPOINTS_SELECT_SQL_FILE_PATH, staging_table=staging_table
+            )
+        }
+
+    def mark_completed(self, staging_table: str, fingerprint: str):
+        """Record a completed statement of a load.
+
+        Args:
+            staging_table: Qualified name of the staging table of the load.
+            fingerprint: Statement fingerprint.
+        """
+        self._execute(
+            CHECKPOINTS_INSERT_SQL_FILE_PATH,
+            staging_table=staging_table,
+            fingerprint=fingerprint,
+        )
+
+    def clear(self, staging_table: str):
+        """Remove the records of the completed statements of a load.
+
+        Args:
+            staging_table: Qualified name of the staging table of the load.
+        """
+        self._execute(CHECKPOINTS_DELETE_SQL_FILE_PATH, staging_table=staging_table)
+
+        self._logger.info("Checkpoints of (%s) cleared.", staging_table)
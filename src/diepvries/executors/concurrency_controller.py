@@ -0,0 +1,211 @@
+"""Adaptive concurrency limit for Data Vault load executors."""
+
+import functools
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional
+
+from snowflake.connector import DictCursor, SnowflakeConnection
+
+from .. import FixedPrefixLoggerAdapter
+from . import EXECUTORS_DIR
+
+QUERY_TIMINGS_SQL_FILE_PATH = EXECUTORS_DIR / "snowflake_query_timings.sql"
+
+# Number of queries of the session searched for the timings of a statement.
+QUERY_HISTORY_RESULT_LIMIT = 100
+
+
+@dataclass
+class QueryTimings:
+    """Time spent by a query in the warehouse queue and executing."""
+
+    query_id: str
+    #: Time (in seconds) that the query waited for an overloaded warehouse.
+    queued_time: float
+    #: Time (in seconds) that the query took to execute.
+    execution_time: float
+
+
+def get_query_history_timings(
+    connection: SnowflakeConnection, query_ids: List[str], database: str = None
+) -> List[QueryTimings]:
+    """Get the timings of queries from the query history of their session.
+
+    Args:
+        connection: Snowflake connection where the queries ran.
+        query_ids: Snowflake query IDs.
+        database: Database whose information schema is queried (None for the
+            database of the connection).
+
+    Returns:
+        Timings of the queries found in the query history.
+    """
+    if not query_ids:
+        return []
+    query_timings_sql = QUERY_TIMINGS_SQL_FILE_PATH.read_text().format(
+        database=database or connection.database,
+        result_limit=QUERY_HISTORY_RESULT_LIMIT,
+        query_ids=", ".join(f"'{query_id}'" for query_id in query_ids),
+    )
+    with connection.cursor(DictCursor) as cursor:
+        cursor.execute(query_timings_sql)
+        return [
+            QueryTimings(
+                query_id=row["QUERY_ID"],
+                queued_time=row["QUEUED_OVERLOAD_TIME"] / 1000,
+                execution_time=row["EXECUTION_TIME"] / 1000,
+            )
+            for row in cursor.fetchall()
+        ]
+
+
+class ConcurrencyController:
+    """Adapt the concurrency limit of an executor to the warehouse capacity.
+
+    The limit follows an additive increase/multiplicative decrease (AIMD) policy.
+    It grows by one for each window of `limit` statements that ran without queuing.
+    It is multiplied by `decrease_factor` when a statement queued for an overloaded
+    warehouse for longer than `max_queued_ratio` times its execution time. Decreases
+    happen at most once per window, as statements running at the same time see the
+    same congestion.
+
+    Statement timings come from `timings_provider`; by default, from the query
+    history of the session where the statement ran (one extra query per statement,
+    run once the statement released its slot).
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        max_queued_ratio: float = 0.1,
+        decrease_factor: float = 0.5,
+        timings_provider: Optional[
+            Callable[[SnowflakeConnection, List[str]], List[QueryTimings]]
+        ] = None,
+        database: str = None,
+    ):
+        """Instantiate a ConcurrencyController.
+
+        The concurrency limit starts at min_limit.
+
+        Args:
+            max_limit: Maximum concurrency limit.
+            min_limit: Minimum concurrency limit.
+            max_queued_ratio: Maximum ratio between the queued time and the execution
+                time of a statement, above which the limit decreases.
+            decrease_factor: Factor applied to the limit when it decreases.
+            timings_provider: Function that gets the timings of queries, given the
+                connection where they ran and their IDs. When not defined, timings
+                come from the query history (check `get_query_history_timings`).
+            database: Database whose information schema is queried by the default
+                timings provider (None for the database of the connection).
+
+        Raises:
+            ValueError: If the limits are lower than 1, if min_limit is greater than
+                max_limit or if decrease_factor is not between 0 and 1.
+        """
+        if not 1 <= min_limit <= max_limit or not 0 < decrease_factor < 1:
+            raise ValueError(
+                "Concurrency limits should be at least 1 (min_limit <= max_limit) "
+                "and decrease_factor should be between 0 and 1"
+            )
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queued_ratio = max_queued_ratio
+        self.decrease_factor = decrease_factor
+        self.timings_provider = timings_provider or functools.partial(
+            get_query_history_timings, database=database
+        )
+        self._limit = float(min_limit)
+        self._running = 0
+        self._statements_since_decrease = 0
+        self._condition = threading.Condition()
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+    def __str__(self) -> str:
+        """Representation of a ConcurrencyController object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return (
+            f"{type(self).__name__}: min_limit={self.min_limit}, "
+            f"max_limit={self.max_limit}"
+        )
+
+    @property
+    def limit(self) -> int:
+        """Get the current concurrency limit.
+
+        Returns:
+            Maximum number of statements that can run concurrently.
+        """
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Wait until a statement can run without exceeding the concurrency limit.
+
+        Yields:
+            Nothing, the slot is released afterwards.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._running < self.limit)
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._condition.notify_all()
+
+    def observe(self, connection: SnowflakeConnection, query_ids: List[str]):
+        """Update the concurrency limit with the timings of a statement.
+
+        Args:
+            connection: Snowflake connection where the statement ran.
+            query_ids: Query IDs of the statement.
+        """
+        if not query_ids:
+            return
+        timings = self.timings_provider(connection, query_ids)
+        if timings:
+            self.update(
+                queued_time=sum(timing.queued_time for timing in timings),
+                execution_time=sum(timing.execution_time for timing in timings),
+            )
+
+    def update(self, queued_time: float, execution_time: float):
+        """Update the concurrency limit with the timings of a statement.
+
+        Args:
+            queued_time: Time (in seconds) that the statement waited for an
+                overloaded warehouse.
+            execution_time: Time (in seconds) that the statement took to execute.
+        """
+        with self._condition:
+            previous_limit = self.limit
+            self._statements_since_decrease += 1
+            if queued_time > self.max_queued_ratio * execution_time:
+                if self._statements_since_decrease >= previous_limit:
+                    self._limit = max(
+                        self.min_limit, self._limit * self.decrease_factor
+                    )
+                    self._statements_since_decrease = 0
+            else:
+                self._limit = min(self.max_limit, self._limit + 1 / self.limit)
+            if self.limit != previous_limit:
+                self._logger.info(
+                    "Concurrency limit changed from %s to %s.",
+                    previous_limit,
+                    self.limit,
+                )
+                self._condition.notify_all()
@@ -0,0 +1,206 @@
+"""Pre-flight cost estimation of Data Vault loads, from their query plans."""
+
+import copy
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from snowflake.connector import SnowflakeConnection
+
+from .. import FixedPrefixLoggerAdapter, StagingTableKind
+from ..data_vault_load import DataVaultLoad
+from ..template_sql.sql_formulas import split_sql_script
+from .load_statement import LoadStatement, get_load_statements
+
+# Formula used to get the query plan of a statement.
+EXPLAIN_SQL_TEMPLATE = "EXPLAIN USING JSON {statement}"
+
+# Pattern of the session variables used to prune target tables (check the MERGE
+# templates).
+MIN_TIMESTAMP_VARIABLE_PATTERN = re.compile(r"\$min_timestamp\w*\b")
+
+
+@dataclass
+class TableScan:
+    """Scan of a table in a query plan."""
+
+    #: Qualified name of the table (in lowercase).
+    table: str
+    #: Number of micro-partitions assigned to the scan (after compile time pruning).
+    partitions_assigned: int = 0
+    #: Number of micro-partitions of the table.
+    partitions_total: int = 0
+    #: Number of bytes assigned to the scan.
+    bytes_assigned: int = 0
+
+
+@dataclass
+class CostEstimate:
+    """Estimated cost of the statement that loads a target table."""
+
+    #: Name of the loaded table.
+    target_table: str
+    #: Number of micro-partitions assigned to the statement.
+    partitions_assigned: int = 0
+    #: Number of micro-partitions of the tables scanned by the statement.
+    partitions_total: int = 0
+    #: Number of bytes assigned to the statement.
+    bytes_assigned: int = 0
+    #: Table scans of the statement.
+    table_scans: List[TableScan] = field(default_factory=list)
+    #: Whether the statement filters the written table on `$min_timestamp`, but all
+    #: scans of that table read all its micro-partitions.
+    pruning_ineffective: bool = False
+
+
+def parse_query_plan(
+    load_statement: LoadStatement, query_plan: Dict[str, Any]
+) -> CostEstimate:
+    """Get the cost estimate of a load statement from its query plan.
+
+    Args:
+        load_statement: Load statement.
+        query_plan: Query plan of its DML statement (`EXPLAIN USING JSON` output).
+
+    Returns:
+        Cost estimate.
+    """
+    global_stats = query_plan.get("GlobalStats", {})
+    cost_estimate = CostEstimate(
+        target_table=load_statement.target_table,
+        partitions_assigned=global_stats.get("partitionsAssigned", 0),
+        partitions_total=global_stats.get("partitionsTotal", 0),
+        bytes_assigned=global_stats.get("bytesAssigned", 0),
+    )
+    for operations in query_plan.get("Operations", []):
+        for operation in operations:
+            if operation.get("operation") != "TableScan":
+                continue
+            cost_estimate.table_scans.extend(
+                TableScan(
+                    table=table.lower(),
+                    partitions_assigned=operation.get("partitionsAssigned", 0),
+                    partitions_total=operation.get("partitionsTotal", 0),
+                    bytes_assigned=operation.get("bytesAssigned", 0),
+                )
+                for table in operation.get("objects", [])
+            )
+
+    # Scans of the written table are the ones filtered on $min_timestamp. Table
+    # names in query plans are qualified with the database name.
+    written_table_scans = [
+        table_scan
+        for table_scan in cost_estimate.table_scans
+        if table_scan.table.endswith(f".{load_statement.written_table.lower()}")
+    ]
+    cost_estimate.pruning_ineffective = bool(
+        MIN_TIMESTAMP_VARIABLE_PATTERN.search(split_sql_script(load_statement.sql)[-1])
+        and written_table_scans
+        and all(
+            1 < table_scan.partitions_assigned == table_scan.partitions_total
+            for table_scan in written_table_scans
+        )
+    )
+
+    return cost_estimate
+
+
+class CostEstimator:
+    """Estimate the cost of the statements of a Data Vault load, without running them.
+
+    The staging table is created as a temporary table (it only lives in the session
+    of the estimator, and costs a scan of the extraction table), unless it already
+    exists. For each target table, the statements setting session variables (e.g.
+    `$min_timestamp`, which only read data) are executed, and the query plan of the
+    MERGE statement is requested with `EXPLAIN USING JSON`.
+
+    Query plans only reflect compile time pruning: partitions pruned while the
+    statement runs (e.g. through joins) are still assigned.
+    """
+
+    def __init__(self, connection: SnowflakeConnection):
+        """Instantiate a CostEstimator.
+
+        Args:
+            connection: Snowflake connection (all statements run in its session).
+        """
+        self.connection = connection
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+    def __str__(self) -> str:
+        """Representation of a CostEstimator object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return type(self).__name__
+
+    @staticmethod
+    def get_temporary_staging_create_sql_statement(
+        data_vault_load: DataVaultLoad,
+    ) -> str:
+        """Generate the SQL statement that creates a temporary staging table.
+
+        Args:
+            data_vault_load: Data Vault load, whose staging table is created.
+
+        Returns:
+            SQL statement.
+        """
+        temporary_load = copy.copy(data_vault_load)
+        temporary_load.staging_table = copy.copy(data_vault_load.staging_table)
+        temporary_load.staging_table.kind = StagingTableKind.TEMPORARY
+        return temporary_load.staging_create_sql_statement
+
+    def estimate(
+        self, data_vault_load: DataVaultLoad, create_staging_table: bool = True
+    ) -> List[CostEstimate]:
+        """Estimate the cost of the statements of a load.
+
+        Args:
+            data_vault_load: Data Vault load.
+            create_staging_table: Whether the staging table should be created (as a
+                temporary table), or already exists.
+
+        Returns:
+            Cost estimates of all target tables, the most expensive (in bytes) first.
+        """
+        _, *load_statements = get_load_statements(data_vault_load)
+        cost_estimates = []
+        with self.connection.cursor() as cursor:
+            if create_staging_table:
+                cursor.execute(
+                    self.get_temporary_staging_create_sql_statement(data_vault_load)
+                )
+            for statements in load_statements:
+                for load_statement in statements:
+                    *variable_statements, dml_statement = split_sql_script(
+                        load_statement.sql
+                    )
+                    for statement in variable_statements:
+                        cursor.execute(statement)
+                    cursor.execute(EXPLAIN_SQL_TEMPLATE.format(statement=dml_statement))
+                    row = cursor.fetchone()
+                    cost_estimates.append(
+                        parse_query_plan(
+                            load_statement, json.loads(row[0]) if row else {}
+                        )
+                    )
+
+        for cost_estimate in cost_estimates:
+            if cost_estimate.pruning_ineffective:
+                self._logger.warning(
+                    "Pruning on $min_timestamp is not effective for (%s).",
+                    cost_estimate.target_table,
+                )
+
+        return sorted(
+            cost_estimates,
+            key=lambda cost_estimate: cost_estimate.bytes_assigned,
+            reverse=True,
+        )
@@ -0,0 +1,1082 @@
+"""Parallel executor for Data Vault loads."""
+
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack, nullcontext
+from enum import Enum
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from snowflake.connector import DictCursor, SnowflakeConnection
+from snowflake.connector.errors import Error
+
+from .. import FixedPrefixLoggerAdapter
+from ..connection_pool import ConnectionPool
+from ..data_vault_load import DataVaultLoad
+from ..template_sql.sql_formulas import split_sql_script
+from .checkpoint_store import LoadCheckpoints, get_checkpoint_key
+from .deadlines import DeadlineExceeded, Deadlines, StragglerQueue
+from .load_statement import (
+    QUERY_TAG_PARAMETER,
+    LoadResult,
+    LoadStatement,
+    StatementResult,
+    StatementStatus,
+    get_load_statements,
+    get_query_tag_sql_statement,
+)
+from .statement_execution import Batching, execute_sql_statements
+
+if TYPE_CHECKING:
+    from .checkpoint_store import CheckpointStore
+    from .concurrency_controller import ConcurrencyController
+    from .query_statistics import QueryStatisticsCollector
+    from .warehouse_router import WarehouseRouter
+
+
+class Scheduling(Enum):
+    """Possible strategies to schedule the statements of a load.
+
+    - GROUPS: each group in `DataVaultLoad.sql_load_scripts_by_group` starts when all
+      statements of the previous group finished;
+    - DEPENDENCIES: each statement starts as soon as the statements loading its
+      dependencies finished (check `DataVaultLoad.dependencies`).
+    """
+
+    GROUPS = "groups"
+    DEPENDENCIES = "dependencies"
+
+
+class DataVaultLoadExecutor:
+    """Execute Data Vault loads, running the statements of each group in parallel.
+
+    The staging table is created first. By default, each remaining statement starts
+    as soon as the statements loading its dependencies finished (e.g. a satellite
+    waits for its parent hub, but not for all links). Alternatively, statements are
+    executed group by group, as in `DataVaultLoad.sql_load_scripts_by_group` (check
+    `Scheduling`). Statements run concurrently over a bounded thread pool; each
+    statement runs in its own connection (taken from a pool with one connection per
+    thread), as load scripts rely on session variables. A `ConnectionPool` can be
+    shared with other executors and deserializers, to reuse warm sessions across
+    loads.
+
+    To reduce client/server round trips, statements can be submitted in
+    multi-statement requests (check `Batching`). Group batching always schedules
+    statements by group.
+
+    Statements can be routed to different warehouses according to their estimated
+    cost (check `WarehouseRouter`), e.g. to load big satellites in a larger
+    warehouse. Each warehouse then has its own connections (unless a shared pool is
+    full, check `ConnectionPool`).
+
+    The number of statements running concurrently can adapt to the warehouse
+    capacity, based on the time statements spend queued (check
+    `ConcurrencyController`).
+
+    Completed statements can be recorded (check `CheckpointStore`), so that a load
+    executed again after a failure (with the same staging table, i.e. the same
+    extraction start timestamp) resumes where it stopped: completed statements,
+    including the staging table creation, are not executed again. Records of a load
+    are removed once all its statements succeeded.
+
+    Queries can be tagged with the load, group, target table and kind of their
+    statement (check `get_query_tag`), at the cost of one extra request per
+    statement. Client-side timings of each statement are collected in its result.
+    Statistics of the executed queries (e.g. scanned partitions) can be collected
+    after each load (check `QueryStatisticsCollector`).
+
+    Staging tables can be dropped once all statements of their load succeeded
+    (staging tables of failed loads are kept, to resume them). Temporary staging
+    tables are not supported, as statements run in several sessions.
+
+    Statements and loads can have deadlines (check `Deadlines`): the queries of
+    statements running past their deadline are cancelled by query ID, and their
+    dependent statements are skipped or wait for them to run again (check
+    `StragglerPolicy`). Stragglers do not stop the other statements, even in fail
+    fast mode. Statements with a deadline are submitted asynchronously and polled,
+    so deadlines cannot be combined with batching.
+
+    When a statement fails, the remaining statements are skipped (fail fast), or
+    executed anyway (continue on error). In the latter case, statements that depend
+    on a failed statement are still skipped when scheduling by dependencies. A
+    failure to create the staging table always skips all remaining statements.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+
+    def __init__(
+        self,
+        connection_factory: Optional[Callable[[], SnowflakeConnection]] = None,
+        max_concurrency: int = 4,
+        fail_fast: bool = True,
+        scheduling: Scheduling = Scheduling.DEPENDENCIES,
+        batching: Batching = Batching.NONE,
+        warehouse_router: "WarehouseRouter" = None,
+        concurrency_controller: "ConcurrencyController" = None,
+        checkpoint_store: "CheckpointStore" = None,
+        drop_staging_table: bool = False,
+        tag_queries: bool = False,
+        statistics_collector: "QueryStatisticsCollector" = None,
+        deadlines: Deadlines = None,
+        connection_pool: ConnectionPool = None,
+    ):
+        """Instantiate a DataVaultLoadExecutor.
+
+        Args:
+            connection_factory: Function that creates a new Snowflake connection (e.g.
+                `functools.partial(snowflake.connector.connect, **configuration)`).
+            max_concurrency: Maximum number of statements executed concurrently.
+            fail_fast: Whether remaining statements should be skipped after a
+                statement fails.
+            scheduling: Strategy used to schedule the statements of a load.
+            batching: How statements are grouped in requests to Snowflake.
+            warehouse_router: Router of statements to warehouses. When not defined,
+                all statements run in the default warehouse of the connections.
+            concurrency_controller: Controller of an adaptive concurrency limit (up to
+                max_concurrency). When not defined, max_concurrency statements run
+                concurrently.
+            checkpoint_store: Store of completed statements, to resume failed loads.
+            drop_staging_table: Whether the staging table should be dropped after its
+                load succeeded.
+            tag_queries: Whether the query tag of each session should be set to
+                identify the statements it runs.
+            statistics_collector: Collector of the statistics of the executed
+                queries, run after each load.
+            deadlines: Deadlines of statements and loads.
+            connection_pool: Pool of Snowflake sessions, shared with other executors
+                and deserializers, used instead of connection_factory. It is not
+                closed with this executor.
+
+        Raises:
+            ValueError: If max_concurrency is lower than 1, if deadlines are combined
+                with batching, or if not exactly one of connection_factory and
+                connection_pool is defined.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be at least 1")
+        if (connection_factory is None) == (connection_pool is None):
+            raise ValueError(
+                "Either connection_factory or connection_pool should be defined"
+            )
+        if deadlines is not None and batching != Batching.NONE:
+            raise ValueError("Deadlines cannot be combined with batching")
+
+        self.connection_factory = connection_factory
+        self.max_concurrency = max_concurrency
+        self.fail_fast = fail_fast
+        self.scheduling = scheduling
+        self.batching = batching
+        self.warehouse_router = warehouse_router
+        self.concurrency_controller = concurrency_controller
+        self.checkpoint_store = checkpoint_store
+        self.drop_staging_table = drop_staging_table
+        self.tag_queries = tag_queries
+        self.statistics_collector = statistics_collector
+        self.deadlines = deadlines
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix=type(self).__name__
+        )
+        # Connections are kept open between statements (each warehouse has its own
+        # sessions), in a pool owned by this executor unless one is shared.
+        self._owns_connection_pool = connection_pool is None
+        self.connection_pool = connection_pool or ConnectionPool(connection_factory)
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+        self._logger.info("Instance of (%s) created.", type(self))
+
+    def __str__(self) -> str:
+        """Representation of a DataVaultLoadExecutor object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return (
+            f"{type(self).__name__}: max_concurrency={self.max_concurrency}, "
+            f"fail_fast={self.fail_fast}, scheduling={self.scheduling.value}, "
+            f"batching={self.batching.value}"
+        )
+
+    def __enter__(self) -> "DataVaultLoadExecutor":
+        """Enter the executor context.
+
+        Returns:
+            This executor.
+        """
+        return self
+
+    def __exit__(self, *_args):
+        """Exit the executor context, closing all connections.
+
+        Args:
+            _args: Unused, exception details.
+        """
+        self.close()
+
+    def close(self):
+        """Wait for running statements and close the connections of this executor."""
+        self._pool.shutdown(wait=True)
+        if self._owns_connection_pool:
+            self.connection_pool.close()
+
+    def _connection(
+        self, warehouse: str = None, tagged: bool = False
+    ) -> ContextManager[SnowflakeConnection]:
+        """Check out a connection from the pool.
+
+        Args:
+            warehouse: Warehouse of the connection (None for the default warehouse
+                of the pool).
+            tagged: Whether the query tag of the session is set, in which case it is
+                reset when the connection is returned.
+
+        Returns:
+            Context manager yielding a Snowflake connection.
+        """
+        return self.connection_pool.connection(
+            warehouse, changed_parameters=[QUERY_TAG_PARAMETER] if tagged else []
+        )
+
+    def _get_load_deadline(self) -> Optional[float]:
+        """Get the deadline of a load starting now.
+
+        Returns:
+            Deadline (a `time.monotonic` value), or None without load deadline.
+        """
+        if self.deadlines is None:
+            return None
+        return self.deadlines.get_load_deadline()
+
+    def _read_checkpoints(
+        self, data_vault_load: DataVaultLoad
+    ) -> Optional[LoadCheckpoints]:
+        """Read the checkpoints of a load starting now.
+
+        Checkpoints are read once per load, not before each statement.
+
+        Args:
+            data_vault_load: Data Vault load.
+
+        Returns:
+            Checkpoints of the load, or None without checkpoint store.
+        """
+        if self.checkpoint_store is None:
+            return None
+        return LoadCheckpoints.read(self.checkpoint_store, data_vault_load)
+
+    def _get_warehouse(self, load_statements: List[LoadStatement]) -> Optional[str]:
+        """Get the warehouse where load statements should run.
+
+        Statements submitted together run in the largest of their warehouses.
+
+        Args:
+            load_statements: Statements to execute.
+
+        Returns:
+            Warehouse name (None for the default warehouse of the connections).
+        """
+        if self.warehouse_router is None:
+            return None
+        return max(
+            (
+                self.warehouse_router.get_warehouse(load_statement)
+                for load_statement in load_statements
+            ),
+            key=self.warehouse_router.warehouses.index,
+        )
+
+    def execute(self, data_vault_load: DataVaultLoad) -> LoadResult:
+        """Execute a Data Vault load.
+
+        Loads can be executed concurrently (e.g. from several threads), in which case
+        they share this executor's concurrency limit.
+
+        Args:
+            data_vault_load: Data Vault load.
+
+        Returns:
+            Results of all statements of the load.
+        """
+        start = time.perf_counter()
+        load_deadline = self._get_load_deadline()
+        checkpoints = self._read_checkpoints(data_vault_load)
+        load_result = LoadResult(staging_table=data_vault_load.staging_table.name)
+        staging_statements, *load_statements = get_load_statements(data_vault_load)
+        load_result.statement_results.extend(
+            self._execute_group(staging_statements, load_deadline, checkpoints)
+        )
+        if not load_result.succeeded:
+            # Without the staging table, no table can be loaded.
+            load_result.statement_results.extend(
+                StatementResult(statement=statement, status=StatementStatus.SKIPPED)
+                for statements in load_statements
+                for statement in statements
+            )
+        elif self.scheduling == Scheduling.GROUPS or self.batching == Batching.GROUP:
+            load_result.statement_results.extend(
+                self._execute_by_groups(load_statements, load_deadline, checkpoints)
+            )
+        else:
+            load_result.statement_results.extend(
+                self._execute_by_dependencies(
+                    [
+                        statement
+                        for statements in load_statements
+                        for statement in statements
+                    ],
+                    load_deadline,
+                    checkpoints,
+                )
+            )
+        load_result.elapsed_time = time.perf_counter() - start
+        self._finish_load(data_vault_load, load_result)
+
+        return load_result
+
+    def execute_loads(self, data_vault_loads: List[DataVaultLoad]) -> List[LoadResult]:
+        """Execute several Data Vault loads, never writing to a table concurrently.
+
+        Loads often share target tables (e.g. most loads write to the same hubs).
+        Concurrent MERGE statements into the same table are serialized by Snowflake
+        on the table lock, holding a connection (and a slot of this executor) while
+        they wait. Here, statements of all loads are scheduled together: a
+        statement starts as soon as its staging table and its dependencies are
+        loaded (as in `Scheduling.DEPENDENCIES`) and no other statement writes to
+        the same table (check `LoadStatement.written_table`). Free slots are filled
+        with statements writing to other tables, giving priority to the most
+        contended tables, which otherwise become the bottleneck of all loads.
+
+        Failures only affect the load they happen in: in fail fast mode, the
+        remaining statements of that load are skipped. `batching` applies to each
+        table separately (group batching is not possible across loads).
+
+        Args:
+            data_vault_loads: Data Vault loads.
+
+        Returns:
+            Results of all statements of each load, in the same order as the loads.
+        """
+        load_statements = [
+            [
+                statement
+                for statements in get_load_statements(data_vault_load)
+                for statement in statements
+            ]
+            for data_vault_load in data_vault_loads
+        ]
+        load_results = [
+            LoadResult(staging_table=data_vault_load.staging_table.name)
+            for data_vault_load in data_vault_loads
+        ]
+        results = self._execute_statements_of_loads(
+            load_statements,
+            load_results,
+            [
+                self._read_checkpoints(data_vault_load)
+                for data_vault_load in data_vault_loads
+            ],
+        )
+
+        for load_index, (data_vault_load, load_result) in enumerate(
+            zip(data_vault_loads, load_results)
+        ):
+            load_result.statement_results = [
+                results[(load_index, statement_index)]
+                for statement_index in range(len(load_statements[load_index]))
+            ]
+            self._finish_load(data_vault_load, load_result)
+
+        return load_results
+
+    def _finish_load(self, data_vault_load: DataVaultLoad, load_result: LoadResult):
+        """Log the outcome of a load and clean it up, if it succeeded.
+
+        Query statistics are collected for all loads, if configured (failing to
+        collect them does not affect the load result). Cleaning up a
+        load removes its checkpoints and (if configured) drops its staging table.
+        Failing to drop the staging table does not affect the load result (check
+        `StagingTableSweeper` to drop it later).
+
+        Args:
+            data_vault_load: Data Vault load.
+            load_result: Result of the load.
+        """
+        self._logger.info(
+            "Load of (%s) finished in %.2fs (%s failed statements, %s stragglers).",
+            load_result.staging_table,
+            load_result.elapsed_time,
+            len(load_result.failed_statements),
+            len(load_result.stragglers),
+        )
+        for result in load_result.stragglers:
+            self._logger.warning(
+                "Statement for (%s) ran past its deadline (query IDs: %s).",
+                result.statement.target_table or "staging table",
+                ", ".join(result.query_ids),
+            )
+        if self.statistics_collector is not None:
+            try:
+                with self._connection() as connection:
+                    self.statistics_collector.collect(connection, load_result)
+            except Exception as e:  # pylint: disable=broad-except
+                # Statistics are best effort, the load result is kept.
+                self._logger.warning(
+                    "Statistics of (%s) could not be collected: %s",
+                    load_result.staging_table,
+                    e,
+                )
+        if not load_result.succeeded:
+            return
+        if self.checkpoint_store is not None:
+            self.checkpoint_store.clear(get_checkpoint_key(data_vault_load))
+        if self.drop_staging_table:
+            drop_statement = LoadStatement(
+                group=0,
+                sql=data_vault_load.staging_drop_sql_statement,
+                staging_table=load_result.staging_table,
+            )
+            try:
+                with (
+                    self._connection(tagged=self.tag_queries) as connection,
+                    connection.cursor() as cursor,
+                ):
+                    if self.tag_queries:
+                        cursor.execute(get_query_tag_sql_statement([drop_statement]))
+                    cursor.execute(drop_statement.sql)
+            except Error as e:
+                self._logger.warning(
+                    "Staging table (%s) could not be dropped: %s",
+                    load_result.staging_table,
+                    e,
+                )
+
+    def _execute_statements_of_loads(
+        self,
+        load_statements: List[List[LoadStatement]],
+        load_results: List[LoadResult],
+        load_checkpoints: List[Optional[LoadCheckpoints]],
+    ) -> Dict[Tuple[int, int], StatementResult]:
+        """Execute the statements of several loads (check `execute_loads`).
+
+        Args:
+            load_statements: Statements of each load.
+            load_results: Results of each load, where the elapsed time of each load is
+                set.
+            load_checkpoints: Checkpoints of each load.
+
+        Returns:
+            Statement results, indexed by (load index, statement index).
+        """
+        start = time.perf_counter()
+        load_failed = [threading.Event() for _ in load_statements]
+        load_deadlines = [self._get_load_deadline() for _ in load_statements]
+        stragglers: StragglerQueue[Tuple[int, int]] = StragglerQueue(
+            self.deadlines and self.deadlines.straggler_policy
+        )
+        pending = [
+            (load_index, statement_index)
+            for load_index, statements in enumerate(load_statements)
+            for statement_index in range(len(statements))
+        ]
+        running: Dict[Future, Tuple[int, int]] = {}
+        results: Dict[Tuple[int, int], StatementResult] = {}
+        # Statuses of each load, indexed by target table (None for the staging table).
+        statuses: List[Dict[Optional[str], StatementStatus]] = [
+            {} for _ in load_statements
+        ]
+        written_tables: Set[str] = set()
+        while pending or running or stragglers:
+            if not running:
+                pending.extend(stragglers.release())
+            for key in self._get_runnable_statements(
+                load_statements, pending, statuses, load_failed, results
+            ):
+                if len(running) >= self.max_concurrency:
+                    break
+                if load_statements[key[0]][key[1]].written_table in written_tables:
+                    continue
+                written_tables.add(load_statements[key[0]][key[1]].written_table)
+                future = self._pool.submit(
+                    self._execute_statement,
+                    load_statements[key[0]][key[1]],
+                    load_failed[key[0]],
+                    load_deadlines[key[0]],
+                    load_checkpoints[key[0]],
+                )
+                running[future] = key
+                pending.remove(key)
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                written_tables.discard(load_statements[key[0]][key[1]].written_table)
+                load_results[key[0]].elapsed_time = time.perf_counter() - start
+                if stragglers.defer(key, future.result()):
+                    continue
+                results[key] = future.result()
+                statuses[key[0]][results[key].statement.target_table] = results[
+                    key
+                ].status
+
+        return results
+
+    def _get_runnable_statements(
+        self,
+        load_statements: List[List[LoadStatement]],
+        pending: List[Tuple[int, int]],
+        statuses: List[Dict[Optional[str], StatementStatus]],
+        load_failed: List[threading.Event],
+        results: Dict[Tuple[int, int], StatementResult],
+    ) -> List[Tuple[int, int]]:
+        """Get the pending statements of several loads that can start now.
+
+        Pending statements that can no longer run (their load failed in fail fast
+        mode, or a statement they depend on failed or was skipped) are skipped:
+        they are removed from `pending`, and their results and statuses are set.
+
+        Statements writing to the tables with the most pending statements come
+        first.
+
+        Args:
+            load_statements: Statements of each load.
+            pending: Pending statements, as (load index, statement index) tuples.
+            statuses: Statuses of the finished statements of each load, indexed by
+                target table (None for the staging table).
+            load_failed: Events set when a statement of each load fails.
+            results: Results of finished statements.
+
+        Returns:
+            Pending statements whose dependencies all succeeded.
+        """
+        pending_count = None
+        while pending_count != len(pending):
+            pending_count = len(pending)
+            runnable = []
+            for load_index, statement_index in list(pending):
+                statement = load_statements[load_index][statement_index]
+                # All target tables depend on the staging table.
+                dependency_statuses = [
+                    statuses[load_index].get(dependency)
+                    for dependency in (
+                        [None, *statement.dependencies]
+                        if statement.target_table is not None
+                        else []
+                    )
+                ]
+                if (self.fail_fast and load_failed[load_index].is_set()) or any(
+                    status not in (None, StatementStatus.SUCCEEDED)
+                    for status in dependency_statuses
+                ):
+                    results[(load_index, statement_index)] = StatementResult(
+                        statement=statement, status=StatementStatus.SKIPPED
+                    )
+                    statuses[load_index][
+                        statement.target_table
+                    ] = StatementStatus.SKIPPED
+                    pending.remove((load_index, statement_index))
+                elif all(
+                    status == StatementStatus.SUCCEEDED
+                    for status in dependency_statuses
+                ):
+                    runnable.append((load_index, statement_index))
+
+        pending_writes = Counter(
+            load_statements[load_index][statement_index].written_table
+            for load_index, statement_index in pending
+        )
+
+        return sorted(
+            runnable,
+            key=lambda key: -pending_writes[
+                load_statements[key[0]][key[1]].written_table
+            ],
+        )
+
+    def _execute_by_groups(
+        self,
+        load_statements: List[List[LoadStatement]],
+        load_deadline: Optional[float] = None,
+        checkpoints: Optional[LoadCheckpoints] = None,
+    ) -> List[StatementResult]:
+        """Execute groups of statements, one group after the other.
+
+        In fail fast mode, a failed statement skips all remaining groups. Stragglers
+        only skip the statements that depend on them (directly or not).
+
+        Args:
+            load_statements: Groups of statements.
+            load_deadline: Deadline of the load (a `time.monotonic` value).
+            checkpoints: Checkpoints of the load.
+
+        Returns:
+            Statement results, in the same order as the statements.
+        """
+        results = []
+        skip_remaining = False
+        # Tables that timed out, or were skipped because of a table that timed out.
+        straggling_tables: Set[str] = set()
+        for statements in load_statements:
+            group_results = [
+                StatementResult(statement=statement, status=StatementStatus.SKIPPED)
+                for statement in statements
+            ]
+            runnable = [
+                index
+                for index, statement in enumerate(statements)
+                if not skip_remaining
+                and not straggling_tables.intersection(statement.dependencies)
+            ]
+            if runnable and self.batching == Batching.GROUP:
+                run_results = self._pool.submit(
+                    self._execute_batch,
+                    [statements[index] for index in runnable],
+                    threading.Event(),
+                    None,
+                    checkpoints,
+                ).result()
+            elif runnable:
+                run_results = self._execute_group(
+                    [statements[index] for index in runnable],
+                    load_deadline,
+                    checkpoints,
+                )
+            else:
+                run_results = []
+            for index, result in zip(runnable, run_results):
+                group_results[index] = result
+            if not skip_remaining:
+                straggling_tables.update(
+                    result.statement.target_table
+                    for index, result in enumerate(group_results)
+                    if index not in runnable
+                    or result.status == StatementStatus.TIMED_OUT
+                )
+            results.extend(group_results)
+            skip_remaining = self.fail_fast and any(
+                result.status == StatementStatus.FAILED for result in results
+            )
+
+        return results
+
+    def _execute_group(
+        self,
+        load_statements: List[LoadStatement],
+        load_deadline: Optional[float] = None,
+        checkpoints: Optional[LoadCheckpoints] = None,
+    ) -> List[StatementResult]:
+        """Execute the statements of a group concurrently.
+
+        Stragglers to reschedule run again once all statements of the group
+        finished.
+
+        Args:
+            load_statements: Statements of the group.
+            load_deadline: Deadline of the load (a `time.monotonic` value).
+            checkpoints: Checkpoints of the load.
+
+        Returns:
+            Statement results, in the same order as the statements.
+        """
+        group_failed = threading.Event()
+        futures = [
+            self._pool.submit(
+                self._execute_statement,
+                statement,
+                group_failed,
+                load_deadline,
+                checkpoints,
+            )
+            for statement in load_statements
+        ]
+        results = [future.result() for future in futures]
+
+        stragglers: StragglerQueue[int] = StragglerQueue(
+            self.deadlines and self.deadlines.straggler_policy
+        )
+        for index, result in enumerate(results):
+            stragglers.defer(index, result)
+        futures = {
+            index: self._pool.submit(
+                self._execute_statement,
+                load_statements[index],
+                group_failed,
+                load_deadline,
+                checkpoints,
+            )
+            for index in stragglers.release()
+        }
+        for index, future in futures.items():
+            results[index] = future.result()
+
+        return results
+
+    def _execute_by_dependencies(
+        self,
+        load_statements: List[LoadStatement],
+        load_deadline: Optional[float] = None,
+        checkpoints: Optional[LoadCheckpoints] = None,
+    ) -> List[StatementResult]:
+        """Execute statements as soon as the statements they depend on finished.
+
+        Statements that depend on a failed (or skipped) statement are skipped.
+
+        Args:
+            load_statements: Statements to execute.
+            load_deadline: Deadline of the load (a `time.monotonic` value).
+            checkpoints: Checkpoints of the load.
+
+        Returns:
+            Statement results, in the same order as the statements.
+        """
+        load_failed = threading.Event()
+        stragglers: StragglerQueue[int] = StragglerQueue(
+            self.deadlines and self.deadlines.straggler_policy
+        )
+        pending = list(range(len(load_statements)))
+        running: Dict[Future, int] = {}
+        results: Dict[int, StatementResult] = {}
+        statuses: Dict[str, StatementStatus] = {}
+        while pending or running or stragglers:
+            if not running:
+                pending.extend(stragglers.release())
+            pending_count = None
+            while pending_count != len(pending):
+                pending_count = len(pending)
+                for index in list(pending):
+                    statement = load_statements[index]
+                    dependency_statuses = [
+                        statuses.get(dependency)
+                        for dependency in statement.dependencies
+                    ]
+                    if (self.fail_fast and load_failed.is_set()) or any(
+                        status not in (None, StatementStatus.SUCCEEDED)
+                        for status in dependency_statuses
+                    ):
+                        results[index] = StatementResult(
+                            statement=statement, status=StatementStatus.SKIPPED
+                        )
+                        statuses[statement.target_table] = StatementStatus.SKIPPED
+                        pending.remove(index)
+                    elif all(
+                        status == StatementStatus.SUCCEEDED
+                        for status in dependency_statuses
+                    ):
+                        future = self._pool.submit(
+                            self._execute_statement,
+                            statement,
+                            load_failed,
+                            load_deadline,
+                            checkpoints,
+                        )
+                        running[future] = index
+                        pending.remove(index)
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index = running.pop(future)
+                if stragglers.defer(index, future.result()):
+                    continue
+                results[index] = future.result()
+                statuses[load_statements[index].target_table] = results[index].status
+
+        return [results[index] for index in range(len(load_statements))]
+
+    def _execute_statement(
+        self,
+        load_statement: LoadStatement,
+        failed: threading.Event,
+        load_deadline: Optional[float] = None,
+        checkpoints: Optional[LoadCheckpoints] = None,
+    ) -> StatementResult:
+        """Execute a load statement, in a single connection.
+
+        Args:
+            load_statement: Statement to execute.
+            failed: Event set when a statement fails (it is shared by statements of
+                the same group or load). When set and in fail fast mode, the statement
+                is skipped.
+            load_deadline: Deadline of the load (a `time.monotonic` value).
+            checkpoints: Checkpoints of the load.
+
+        Returns:
+            Statement result.
+        """
+        return self._execute_batch(
+            [load_statement], failed, load_deadline, checkpoints
+        )[0]
+
+    def _execute_batch(
+        self,
+        load_statements: List[LoadStatement],
+        failed: threading.Event,
+        load_deadline: Optional[float] = None,
+        checkpoints: Optional[LoadCheckpoints] = None,
+    ) -> List[StatementResult]:
+        """Execute load statements one after the other, in a single connection.
+
+        Depending on `batching`, the SQL statements of the load statements are
+        submitted one by one, or in a single multi-statement request. Statements that
+        completed in an earlier attempt of the load are not executed again (check
+        `CheckpointStore`).
+
+        Args:
+            load_statements: Statements to execute (of the same load).
+            failed: Event set when a statement fails (it is shared by statements of
+                the same group or load). When set and in fail fast mode, the
+                statements are skipped.
+            load_deadline: Deadline of the load (a `time.monotonic` value), after
+                which the statements are skipped.
+            checkpoints: Checkpoints of the load (None without checkpoint store).
+
+        Returns:
+            Statement results, in the same order as the statements.
+        """
+        if (self.fail_fast and failed.is_set()) or (
+            load_deadline is not None and time.monotonic() >= load_deadline
+        ):
+            return [
+                StatementResult(
+                    statement=load_statement, status=StatementStatus.SKIPPED
+                )
+                for load_statement in load_statements
+            ]
+        if checkpoints is None:
+            return self._run_batch(load_statements, failed, load_deadline)
+
+        completed = checkpoints.completed
+        statements_to_run = [
+            load_statement
+            for load_statement in load_statements
+            if load_statement.fingerprint not in completed
+        ]
+        run_results = iter(
+            self._run_batch(statements_to_run, failed, load_deadline)
+            if statements_to_run
+            else []
+        )
+        results = []
+        for load_statement in load_statements:
+            if load_statement.fingerprint in completed:
+                self._logger.info(
+                    "Statement for (%s) completed in an earlier attempt.",
+                    load_statement.target_table or "staging table",
+                )
+                results.append(
+                    StatementResult(
+                        statement=load_statement,
+                        status=StatementStatus.SUCCEEDED,
+                        resumed=True,
+                    )
+                )
+                continue
+            results.append(next(run_results))
+            if results[-1].status == StatementStatus.SUCCEEDED:
+                checkpoints.mark_completed(load_statement.fingerprint)
+
+        return results
+
+    def _run_batch(
+        self,
+        load_statements: List[LoadStatement],
+        failed: threading.Event,
+        load_deadline: Optional[float] = None,
+    ) -> List[StatementResult]:
+        """Run load statements one after the other, in a single connection.
+
+        Check `_execute_batch`.
+
+        Args:
+            load_statements: Statements to execute.
+            failed: Event set when a statement fails.
+            load_deadline: Deadline of the load (a `time.monotonic` value).
+
+        Returns:
+            Statement results, in the same order as the statements.
+        """
+        results = [
+            StatementResult(statement=load_statement, status=StatementStatus.SUCCEEDED)
+            for load_statement in load_statements
+        ]
+        sql_statements = [
+            split_sql_script(load_statement.sql) for load_statement in load_statements
+        ]
+        with ExitStack() as slot:
+            slot.enter_context(self._concurrency_slot())
+            start = time.perf_counter()
+            end = None
+            try:
+                with (
+                    self._connection(
+                        self._get_warehouse(load_statements), self.tag_queries
+                    ) as connection,
+                    connection.cursor(DictCursor) as cursor,
+                ):
+                    if self.tag_queries:
+                        cursor.execute(get_query_tag_sql_statement(load_statements))
+                    try:
+                        execute_sql_statements(
+                            connection,
+                            cursor,
+                            results,
+                            sql_statements,
+                            self.batching,
+                            self.deadlines,
+                            load_deadline,
+                        )
+                    finally:
+                        end = time.perf_counter()
+                        # Timings are observed after releasing the slot, so that
+                        # other statements can start in the meantime.
+                        slot.close()
+                    self._observe_timings(connection, results)
+            except DeadlineExceeded as e:
+                self._set_batch_timeout(results, e)
+            except Exception as e:  # pylint: disable=broad-except
+                # Any error (not only Snowflake's, e.g. network errors) fails the
+                # batch, so that statements depending on it are skipped.
+                failed.set()
+                self._set_batch_error(results, sql_statements, e)
+            finally:
+                for result in results:
+                    result.elapsed_time = (end or time.perf_counter()) - start
+
+        return results
+
+    def _concurrency_slot(self) -> ContextManager:
+        """Wait until statements can run without exceeding the concurrency limit.
+
+        Returns:
+            Context manager holding a slot of the concurrency controller (or doing
+            nothing, without concurrency controller).
+        """
+        if self.concurrency_controller is None:
+            return nullcontext()
+        return self.concurrency_controller.slot()
+
+    def _observe_timings(
+        self, connection: SnowflakeConnection, results: List[StatementResult]
+    ):
+        """Update the concurrency limit with the timings of executed statements.
+
+        Failing to get the timings does not affect the statements.
+
+        Args:
+            connection: Snowflake connection where the statements ran.
+            results: Results of the statements.
+        """
+        if self.concurrency_controller is None:
+            return
+        try:
+            self.concurrency_controller.observe(
+                connection,
+                [query_id for result in results for query_id in result.query_ids],
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            # Timings only tune the concurrency limit, their statements succeeded.
+            self._logger.warning("Query timings could not be fetched: %s", e)
+
+    def _set_batch_timeout(
+        self, results: List[StatementResult], deadline_exceeded: DeadlineExceeded
+    ):
+        """Set the outcome of a batch of load statements where a query was cancelled.
+
+        The load statement of the cancelled query timed out, earlier load statements
+        of the batch succeeded and later ones were skipped.
+
+        Args:
+            results: Results of the load statements of the batch.
+            deadline_exceeded: Exception raised when the query was cancelled.
+        """
+        timed_out = False
+        for result in results:
+            if timed_out:
+                result.status = StatementStatus.SKIPPED
+            elif deadline_exceeded.query_id in result.query_ids:
+                timed_out = True
+                result.status = StatementStatus.TIMED_OUT
+                self._logger.warning(
+                    "Statement for (%s) cancelled: %s",
+                    result.statement.target_table or "staging table",
+                    deadline_exceeded,
+                )
+
+    def _set_batch_error(
+        self,
+        results: List[StatementResult],
+        sql_statements: List[List[str]],
+        error: Exception,
+    ):
+        """Set the outcome of a batch of load statements where a statement failed.
+
+        SQL statements run in order, and the query ID of each one is added to its
+        result once it succeeded (the query ID of a failed asynchronous query is
+        added when it is submitted). The failed load statement is then the first
+        one holding the query ID of the error, or missing the query ID of any of its
+        SQL statements. In a multi-statement request (check `Batching`), the query
+        IDs of the SQL statements that ran, up to the failed one, come from the query
+        history: the failed load statement is the one holding the last query ID.
+        Earlier load statements of the batch succeeded and later ones were skipped.
+        When the failed statement cannot be found, all load statements are
+        considered failed.
+
+        Args:
+            results: Results of the load statements of the batch.
+            sql_statements: SQL statements of each load statement.
+            error: Error raised by Snowflake (or by the client, without query ID).
+        """
+        if self.batching != Batching.NONE:
+            query_ids = [
+                query_id for result in results for query_id in result.query_ids
+            ]
+            failed_index = next(
+                (
+                    index
+                    for index, result in enumerate(results)
+                    if query_ids and query_ids[-1] in result.query_ids
+                ),
+                None,
+            )
+        else:
+            query_id = getattr(error, "sfqid", None)
+            failed_index = next(
+                (
+                    index
+                    for index, (result, statements) in enumerate(
+                        zip(results, sql_statements)
+                    )
+                    if (query_id is not None and query_id in result.query_ids)
+                    or len(result.query_ids) < len(statements)
+                ),
+                None,
+            )
+        for index, result in enumerate(results):
+            if failed_index is not None and index < failed_index:
+                continue
+            if failed_index is not None and index > failed_index:
+                result.status = StatementStatus.SKIPPED
+                result.query_ids = []
+                continue
+            result.status = StatementStatus.FAILED
+            result.error = error
+            self._logger.error(
+                "Statement for (%s) failed: %s",
+                result.statement.target_table or "staging table",
+                error,
+            )
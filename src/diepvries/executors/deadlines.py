@@ -0,0 +1,155 @@
+"""Deadlines of the statements of Data Vault loads."""
+
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Generic, Hashable, List, Optional, Set, TypeVar
+
+from .load_statement import StatementResult, StatementStatus
+
+Key = TypeVar("Key", bound=Hashable)
+
+
+class StragglerPolicy(Enum):
+    """Possible ways to handle statements cancelled for exceeding their deadline.
+
+    - SKIP: statements that depend on the straggler are skipped, other statements
+      still run;
+    - RESCHEDULE: the straggler runs again once (with a new statement deadline), as
+      soon as no other statement is running; statements that depend on it wait.
+    """
+
+    SKIP = "skip"
+    RESCHEDULE = "reschedule"
+
+
+@dataclass
+class Deadlines:
+    """Time limits of the statements of a load and of the whole load.
+
+    When a statement runs past its deadline, its query is cancelled and the statement
+    is a straggler (`StatementStatus.TIMED_OUT`). Statements that did not start
+    before the deadline of their load are skipped.
+    """
+
+    #: Maximum time (in seconds) that a statement can run.
+    statement_timeout: Optional[float] = None
+    #: Maximum time (in seconds) that a load can run.
+    load_timeout: Optional[float] = None
+    #: How stragglers are handled.
+    straggler_policy: StragglerPolicy = StragglerPolicy.SKIP
+    #: Time (in seconds) between status checks of a running statement.
+    poll_interval: float = 0.5
+
+    def __post_init__(self):
+        """Validate the deadlines.
+
+        Raises:
+            ValueError: If the timeouts or the polling interval are not positive.
+        """
+        if any(
+            timeout is not None and timeout <= 0
+            for timeout in (self.statement_timeout, self.load_timeout)
+        ) or (self.poll_interval <= 0):
+            raise ValueError("Timeouts and poll_interval should be positive")
+
+    def get_load_deadline(self) -> Optional[float]:
+        """Get the deadline of a load starting now.
+
+        Returns:
+            Deadline (a `time.monotonic` value), or None without load timeout.
+        """
+        if self.load_timeout is None:
+            return None
+        return time.monotonic() + self.load_timeout
+
+    def get_statement_deadline(self, load_deadline: Optional[float]) -> Optional[float]:
+        """Get the deadline of a statement starting now.
+
+        Args:
+            load_deadline: Deadline of the load of the statement.
+
+        Returns:
+            Deadline (a `time.monotonic` value), or None without any timeout.
+        """
+        deadlines = [
+            deadline
+            for deadline in (
+                load_deadline,
+                (
+                    None
+                    if self.statement_timeout is None
+                    else time.monotonic() + self.statement_timeout
+                ),
+            )
+            if deadline is not None
+        ]
+        return min(deadlines, default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a query is cancelled for running past its deadline."""
+
+    def __init__(self, query_id: str):
+        """Instantiate a DeadlineExceeded exception.
+
+        Args:
+            query_id: Snowflake query ID of the cancelled query.
+        """
+        super().__init__(f"Query {query_id} cancelled, as it ran past its deadline")
+        self.query_id = query_id
+
+
+class StragglerQueue(Generic[Key]):
+    """Stragglers waiting to run again (check `StragglerPolicy.RESCHEDULE`).
+
+    Stragglers are identified by a key of the caller's choice (e.g. the index of the
+    statement). Each straggler is rescheduled at most once.
+    """
+
+    def __init__(self, straggler_policy: Optional[StragglerPolicy]):
+        """Instantiate a StragglerQueue.
+
+        Args:
+            straggler_policy: How stragglers are handled (None without deadlines).
+        """
+        self.straggler_policy = straggler_policy
+        self._deferred: List[Key] = []
+        self._rescheduled: Set[Key] = set()
+
+    def __bool__(self) -> bool:
+        """Check whether stragglers are waiting to run again.
+
+        Returns:
+            True if stragglers are waiting.
+        """
+        return bool(self._deferred)
+
+    def defer(self, key: Key, result: StatementResult) -> bool:
+        """Defer a statement, if it is a straggler that should run again.
+
+        Args:
+            key: Key of the statement.
+            result: Result of the statement.
+
+        Returns:
+            True if the statement was deferred (its result should be discarded).
+        """
+        if (
+            result.status != StatementStatus.TIMED_OUT
+            or self.straggler_policy != StragglerPolicy.RESCHEDULE
+            or key in self._rescheduled
+        ):
+            return False
+        self._deferred.append(key)
+        return True
+
+    def release(self) -> List[Key]:
+        """Take the deferred stragglers, to run them again.
+
+        Returns:
+            Keys of the stragglers.
+        """
+        keys, self._deferred = self._deferred, []
+        self._rescheduled.update(keys)
+        return keys
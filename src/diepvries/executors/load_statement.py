@@ -0,0 +1,416 @@
+"""Statements of Data Vault loads and results of their execution."""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .. import StagingTableKind, TableType
+from ..data_vault_load import DataVaultLoad
+from ..hub import Hub
+from ..link import Link
+from ..replay_connection import normalize_sql
+from ..role_playing_hub import RolePlayingHub
+from ..table import DataVaultTable
+from ..template_sql.sql_formulas import SET_QUERY_TAG_SQL_TEMPLATE, split_sql_script
+
+if TYPE_CHECKING:
+    from .query_statistics import QueryStatistics
+
+# Length of the fingerprints of load statements (number of hexadecimal characters).
+FINGERPRINT_LENGTH = 16
+
+# Maximum length of a Snowflake query tag.
+QUERY_TAG_MAX_LENGTH = 2000
+
+# Session parameter holding the query tag.
+QUERY_TAG_PARAMETER = "QUERY_TAG"
+
+# Columns of the results of DML statements, with the matching `RowCounts` fields.
+ROW_COUNT_COLUMNS = {
+    "number of rows inserted": "rows_inserted",
+    "number of rows updated": "rows_updated",
+    "number of rows deleted": "rows_deleted",
+}
+
+
+class StatementStatus(Enum):
+    """Possible outcomes of a load statement.
+
+    TIMED_OUT statements were cancelled, as they ran past their deadline (check
+    `Deadlines`).
+    """
+
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    TIMED_OUT = "timed_out"
+
+
+@dataclass
+class LoadStatement:
+    """SQL script that loads one target table (or creates the staging table)."""
+
+    #: Position of the statement's group in `DataVaultLoad.sql_load_scripts_by_group`.
+    group: int
+    #: SQL script, as generated by `DataVaultLoad` (it can hold several statements).
+    sql: str
+    #: Name of the loaded table (None for the staging table creation).
+    target_table: Optional[str] = None
+    #: Names of the target tables that must be loaded before this statement runs.
+    dependencies: List[str] = field(default_factory=list)
+    #: Qualified name of the table written by the statement (the staging table, the
+    #: target table or, for role playing hubs, their parent hub).
+    written_table: Optional[str] = None
+    #: Type of the loaded table (None for the staging table creation).
+    table_type: Optional[TableType] = None
+    #: Number of fields of the loaded table.
+    field_count: int = 0
+    #: Name of the staging table of the load.
+    staging_table: Optional[str] = None
+
+    @property
+    def kind(self) -> str:
+        """Get the kind of the statement.
+
+        Returns:
+            "staging" for the staging table creation, otherwise the type of the
+            loaded table.
+        """
+        if self.table_type is None:
+            return "staging"
+        return self.table_type.value
+
+    @property
+    def fingerprint(self) -> str:
+        """Get a fingerprint of the SQL of the statement.
+
+        Returns:
+            Fingerprint (insensitive to whitespace changes).
+        """
+        return hashlib.sha256(
+            "\n".join(
+                normalize_sql(statement) for statement in split_sql_script(self.sql)
+            ).encode()
+        ).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+@dataclass
+class StatementTimings:
+    """Client-side timings (in seconds) of the execution of a load statement.
+
+    Timings are summed over all SQL statements of the load statement. Submission and
+    queuing can only be told apart from execution for asynchronous queries; for
+    synchronous queries, the execution time covers the whole request.
+    """
+
+    #: Time taken to submit the statement.
+    submit_time: float = 0.0
+    #: Time during which the statement was seen queued (or blocked), at the
+    #: resolution of the status checks.
+    queued_time: float = 0.0
+    #: Time during which the statement was seen running.
+    execution_time: float = 0.0
+    #: Time taken to fetch the results of the statement.
+    fetch_time: float = 0.0
+
+    @property
+    def total_time(self) -> float:
+        """Get the total time of the statement.
+
+        Returns:
+            Sum of all timings.
+        """
+        return (
+            self.submit_time + self.queued_time + self.execution_time + self.fetch_time
+        )
+
+
+@dataclass
+class RowCounts:
+    """Numbers of rows changed by the DML statements of a load statement."""
+
+    rows_inserted: int = 0
+    rows_updated: int = 0
+    rows_deleted: int = 0
+
+    @property
+    def changed(self) -> bool:
+        """Check whether any row changed.
+
+        Returns:
+            True if rows were inserted, updated or deleted.
+        """
+        return bool(self.rows_inserted or self.rows_updated or self.rows_deleted)
+
+    def add(self, rows: List[Dict[str, Any]]):
+        """Add the row counts returned by a statement (fetched with a `DictCursor`).
+
+        Results of statements other than DML statements (e.g. `SET`) are ignored.
+
+        Args:
+            rows: Result rows of the statement.
+        """
+        for row in rows:
+            for column, value in row.items():
+                field_name = ROW_COUNT_COLUMNS.get(column.lower())
+                if field_name is not None:
+                    setattr(self, field_name, getattr(self, field_name) + value)
+
+
+@dataclass
+class StatementResult:
+    """Outcome of the execution of a load statement."""
+
+    statement: LoadStatement
+    status: StatementStatus
+    #: Snowflake query IDs, one per executed statement of the SQL script.
+    query_ids: List[str] = field(default_factory=list)
+    #: Error raised by Snowflake, when the statement failed.
+    error: Optional[Exception] = None
+    #: Time (in seconds) that the statement took to execute (for batched statements,
+    #: the time of the whole batch).
+    elapsed_time: float = 0.0
+    #: Whether the statement was not executed, as it completed in an earlier attempt
+    #: of the load (check `CheckpointStore`).
+    resumed: bool = False
+    #: Client-side timings of the statement (for batched statements, the timings of
+    #: the whole batch).
+    timings: StatementTimings = field(default_factory=StatementTimings)
+    #: Statistics of the executed queries, when collected after the load (check
+    #: `QueryStatisticsCollector`).
+    statistics: List["QueryStatistics"] = field(default_factory=list)
+    #: Numbers of rows changed by the statement.
+    row_counts: RowCounts = field(default_factory=RowCounts)
+
+
+@dataclass
+class LoadResult:
+    """Outcome of the execution of a Data Vault load."""
+
+    #: Name of the staging table of the load.
+    staging_table: str
+    #: Results of all statements, in the order of `sql_load_scripts_by_group`.
+    statement_results: List[StatementResult] = field(default_factory=list)
+    #: Time (in seconds) that the load took to execute.
+    elapsed_time: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        """Check whether all statements of the load succeeded.
+
+        Returns:
+            True if all statements succeeded.
+        """
+        return all(
+            result.status == StatementStatus.SUCCEEDED
+            for result in self.statement_results
+        )
+
+    @property
+    def failed_statements(self) -> List[StatementResult]:
+        """Get the results of the statements that failed.
+
+        Returns:
+            Results of failed statements.
+        """
+        return [
+            result
+            for result in self.statement_results
+            if result.status == StatementStatus.FAILED
+        ]
+
+    @property
+    def stragglers(self) -> List[StatementResult]:
+        """Get the results of the statements cancelled for exceeding their deadline.
+
+        Returns:
+            Results of timed out statements.
+        """
+        return [
+            result
+            for result in self.statement_results
+            if result.status == StatementStatus.TIMED_OUT
+        ]
+
+    @property
+    def results_by_table(self) -> Dict[str, StatementResult]:
+        """Get the results of the statements that load target tables.
+
+        Returns:
+            Statement results, indexed by target table name.
+        """
+        return {
+            result.statement.target_table: result
+            for result in self.statement_results
+            if result.statement.target_table is not None
+        }
+
+    @property
+    def row_counts_by_table(self) -> Dict[str, RowCounts]:
+        """Get the numbers of rows changed in each target table.
+
+        Returns:
+            Row counts, indexed by target table name.
+        """
+        return {
+            target_table: result.row_counts
+            for target_table, result in self.results_by_table.items()
+        }
+
+    @property
+    def changed_tables(self) -> List[str]:
+        """Get the target tables where rows changed.
+
+        Returns:
+            Names of the target tables, in the order of `sql_load_scripts_by_group`.
+        """
+        return [
+            target_table
+            for target_table, row_counts in self.row_counts_by_table.items()
+            if row_counts.changed
+        ]
+
+
+def get_query_tag(load_statements: List[LoadStatement]) -> str:
+    """Get the Snowflake query tag of load statements submitted together.
+
+    The query tag is a JSON object, which identifies the load (by staging table
+    name), the group, the target table and the kind of statement (check
+    `LoadStatement.kind`), e.g. to find the queries of a table in `QUERY_HISTORY`
+    (`PARSE_JSON(query_tag):target_table`). For several statements, the target tables
+    and kinds are lists. Target tables are left out of tags that would exceed the
+    Snowflake limit.
+
+    Args:
+        load_statements: Statements submitted together (of the same load).
+
+    Returns:
+        Query tag.
+    """
+
+    def get_value(values: List[Optional[str]]) -> Optional[object]:
+        return values[0] if len(set(values)) == 1 else values
+
+    query_tag = {
+        "application": "diepvries",
+        "load_id": load_statements[0].staging_table,
+        "group": get_value([statement.group for statement in load_statements]),
+        "target_table": get_value(
+            [statement.target_table for statement in load_statements]
+        ),
+        "statement_kind": get_value([statement.kind for statement in load_statements]),
+    }
+    if len(json.dumps(query_tag)) > QUERY_TAG_MAX_LENGTH:
+        query_tag["target_table"] = None
+
+    return json.dumps(query_tag)
+
+
+def get_query_tag_sql_statement(load_statements: List[LoadStatement]) -> str:
+    """Get the statement that sets the query tag of load statements in a session.
+
+    Check `get_query_tag`.
+
+    Args:
+        load_statements: Statements submitted together (of the same load).
+
+    Returns:
+        SQL statement.
+    """
+    query_tag = get_query_tag(load_statements)
+    return SET_QUERY_TAG_SQL_TEMPLATE.format(
+        query_tag=query_tag.replace("\\", "\\\\").replace("'", "\\'")
+    )
+
+
+def _get_written_table(target_table: DataVaultTable) -> str:
+    """Get the qualified name of the table written when loading a target table.
+
+    Role playing hubs are loaded into their parent hub.
+
+    Args:
+        target_table: Target table.
+
+    Returns:
+        Qualified table name.
+    """
+    if isinstance(target_table, RolePlayingHub):
+        target_table = target_table.parent_table
+    return f"{target_table.schema}.{target_table.name}"
+
+
+def _get_table_type(target_table: DataVaultTable) -> TableType:
+    """Get the type of a target table.
+
+    Args:
+        target_table: Target table.
+
+    Returns:
+        Table type (HUB, LINK or SATELLITE).
+    """
+    if isinstance(target_table, Hub):
+        return TableType.HUB
+    if isinstance(target_table, Link):
+        return TableType.LINK
+    return TableType.SATELLITE
+
+
+def get_load_statements(data_vault_load: DataVaultLoad) -> List[List[LoadStatement]]:
+    """Get the statements of a Data Vault load, grouped by execution order.
+
+    Groups follow `DataVaultLoad.sql_load_scripts_by_group`: the staging table
+    creation, followed by one group per loading order.
+
+    As they run in several sessions, loads with a temporary staging table are not
+    supported.
+
+    Args:
+        data_vault_load: Data Vault load.
+
+    Returns:
+        Load statements, one list per group.
+
+    Raises:
+        ValueError: If the staging table of the load is temporary.
+    """
+    if data_vault_load.staging_table.kind == StagingTableKind.TEMPORARY:
+        raise ValueError(
+            "Temporary staging tables are only visible to the session that creates "
+            "them, use sql_load_script or sql_load_block instead"
+        )
+    dependencies = data_vault_load.dependencies
+    staging_table = data_vault_load.staging_table
+    load_statements = [
+        [
+            LoadStatement(
+                group=0,
+                sql=data_vault_load.staging_create_sql_statement,
+                written_table=f"{staging_table.schema}.{staging_table.name}",
+                field_count=sum(
+                    len(target_table.fields)
+                    for target_table in data_vault_load.target_tables
+                ),
+                staging_table=staging_table.name,
+            )
+        ]
+    ]
+    for group, target_tables in enumerate(data_vault_load.target_tables_by_group, 1):
+        load_statements.append(
+            [
+                LoadStatement(
+                    group=group,
+                    sql=target_table.sql_load_statement,
+                    target_table=target_table.name,
+                    dependencies=dependencies[target_table.name],
+                    written_table=_get_written_table(target_table),
+                    table_type=_get_table_type(target_table),
+                    field_count=len(target_table.fields),
+                    staging_table=staging_table.name,
+                )
+                for target_table in target_tables
+            ]
+        )
+
+    return load_statements
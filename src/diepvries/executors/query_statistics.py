@@ -0,0 +1,215 @@
+"""Statistics of the queries executed by Data Vault loads."""
+
+import functools
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from snowflake.connector import DictCursor, SnowflakeConnection
+
+from .. import FixedPrefixLoggerAdapter
+from . import EXECUTORS_DIR
+from .load_statement import LoadResult
+
+QUERY_STATISTICS_SQL_FILE_PATH = EXECUTORS_DIR / "snowflake_query_statistics.sql"
+
+# Number of queries of the user searched for the statistics of a load (the maximum
+# allowed by Snowflake).
+QUERY_STATISTICS_RESULT_LIMIT = 10000
+
+
+@dataclass
+class QueryStatistics:
+    """Statistics of an executed query."""
+
+    query_id: str
+    #: Number of bytes scanned.
+    bytes_scanned: int = 0
+    #: Number of micro-partitions scanned.
+    partitions_scanned: int = 0
+    #: Number of micro-partitions of the scanned tables.
+    partitions_total: int = 0
+    #: Number of rows inserted.
+    rows_inserted: int = 0
+    #: Number of rows updated.
+    rows_updated: int = 0
+    #: Number of bytes spilled to local storage.
+    bytes_spilled_local: int = 0
+    #: Number of bytes spilled to remote storage.
+    bytes_spilled_remote: int = 0
+
+    @property
+    def scanned_partitions_ratio(self) -> float:
+        """Get the ratio of micro-partitions scanned by the query.
+
+        A ratio close to 1 for a MERGE statement means that pruning on
+        `$min_timestamp` did not take effect.
+
+        Returns:
+            Scanned partitions divided by total partitions (0 when no table was
+            scanned).
+        """
+        if not self.partitions_total:
+            return 0.0
+        return self.partitions_scanned / self.partitions_total
+
+
+def get_query_history_statistics(
+    connection: SnowflakeConnection, query_ids: List[str], database: str = None
+) -> List[QueryStatistics]:
+    """Get the statistics of queries from the query history of the current user.
+
+    Args:
+        connection: Snowflake connection (of the user that ran the queries).
+        query_ids: Snowflake query IDs.
+        database: Database whose information schema is queried (None for the
+            database of the connection).
+
+    Returns:
+        Statistics of the queries found in the query history.
+    """
+    if not query_ids:
+        return []
+    query_statistics_sql = QUERY_STATISTICS_SQL_FILE_PATH.read_text().format(
+        database=database or connection.database,
+        result_limit=QUERY_STATISTICS_RESULT_LIMIT,
+        query_ids=", ".join(f"'{query_id}'" for query_id in query_ids),
+    )
+    with connection.cursor(DictCursor) as cursor:
+        cursor.execute(query_statistics_sql)
+        return [
+            QueryStatistics(
+                query_id=row["QUERY_ID"],
+                bytes_scanned=row["BYTES_SCANNED"] or 0,
+                partitions_scanned=row["PARTITIONS_SCANNED"] or 0,
+                partitions_total=row["PARTITIONS_TOTAL"] or 0,
+                rows_inserted=row["ROWS_INSERTED"] or 0,
+                rows_updated=row["ROWS_UPDATED"] or 0,
+                bytes_spilled_local=row["BYTES_SPILLED_TO_LOCAL_STORAGE"] or 0,
+                bytes_spilled_remote=row["BYTES_SPILLED_TO_REMOTE_STORAGE"] or 0,
+            )
+            for row in cursor.fetchall()
+        ]
+
+
+class FakeQueryStatisticsProvider:
+    """Stand-in for the query history, for local testing.
+
+    Statistics are returned for every requested query: the statistics defined for
+    its ID, or empty statistics otherwise.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, statistics: List[QueryStatistics] = None):
+        """Instantiate a FakeQueryStatisticsProvider.
+
+        Args:
+            statistics: Statistics of known queries.
+        """
+        self.statistics: Dict[str, QueryStatistics] = {
+            query_statistics.query_id: query_statistics
+            for query_statistics in statistics or []
+        }
+
+    def __call__(
+        self, _connection: SnowflakeConnection, query_ids: List[str]
+    ) -> List[QueryStatistics]:
+        """Get the statistics of queries.
+
+        Args:
+            _connection: Unused, Snowflake connection.
+            query_ids: Snowflake query IDs.
+
+        Returns:
+            Statistics of all queries.
+        """
+        return [
+            self.statistics.get(query_id, QueryStatistics(query_id=query_id))
+            for query_id in query_ids
+        ]
+
+
+class QueryStatisticsCollector:
+    """Attach the statistics of the executed queries to the results of a load.
+
+    Statistics come from `statistics_provider`; by default, from the query history of
+    the user (one extra query per load). Snowflake can take a few seconds to record
+    finished queries: statements whose queries are missing keep no statistics.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(
+        self,
+        statistics_provider: Optional[
+            Callable[[SnowflakeConnection, List[str]], List[QueryStatistics]]
+        ] = None,
+        database: str = None,
+    ):
+        """Instantiate a QueryStatisticsCollector.
+
+        Args:
+            statistics_provider: Function that gets the statistics of queries, given a
+                connection and their IDs. When not defined, statistics come from the
+                query history (check `get_query_history_statistics`).
+            database: Database whose information schema is queried by the default
+                statistics provider (None for the database of the connection).
+        """
+        self.statistics_provider = statistics_provider or functools.partial(
+            get_query_history_statistics, database=database
+        )
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+    def __str__(self) -> str:
+        """Representation of a QueryStatisticsCollector object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return type(self).__name__
+
+    def collect(self, connection: SnowflakeConnection, load_result: LoadResult):
+        """Attach the statistics of the executed queries to the results of a load.
+
+        Failing to get the statistics does not affect the load result.
+
+        Args:
+            connection: Snowflake connection.
+            load_result: Result of the load (check `StatementResult.statistics`).
+        """
+        query_ids = [
+            query_id
+            for result in load_result.statement_results
+            for query_id in result.query_ids
+        ]
+        if not query_ids:
+            return
+        try:
+            statistics = {
+                query_statistics.query_id: query_statistics
+                for query_statistics in self.statistics_provider(connection, query_ids)
+            }
+        except Exception as e:  # pylint: disable=broad-except
+            self._logger.warning(
+                "Statistics of (%s) could not be fetched: %s",
+                load_result.staging_table,
+                e,
+            )
+            return
+
+        for result in load_result.statement_results:
+            result.statistics = [
+                statistics[query_id]
+                for query_id in result.query_ids
+                if query_id in statistics
+            ]
+        self._logger.info(
+            "Statistics of %s/%s queries of (%s) collected.",
+            len(statistics),
+            len(query_ids),
+            load_result.staging_table,
+        )
@@ -0,0 +1,6 @@
+/* Create the control table where completed load statements are recorded. */
+CREATE TABLE IF NOT EXISTS {checkpoint_table} (
+  staging_table TEXT NOT NULL,
+  fingerprint TEXT NOT NULL,
+  completed_at TIMESTAMP_NTZ NOT NULL DEFAULT SYSDATE()
+);
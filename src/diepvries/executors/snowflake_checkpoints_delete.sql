@@ -0,0 +1,3 @@
+/* Remove the records of the completed statements of a load. */
+DELETE FROM {checkpoint_table}
+WHERE staging_table = %(staging_table)s;
@@ -0,0 +1,3 @@
+/* Record a completed statement of a load. */
+INSERT INTO {checkpoint_table} (staging_table, fingerprint)
+VALUES (%(staging_table)s, %(fingerprint)s);
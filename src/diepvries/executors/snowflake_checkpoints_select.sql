@@ -0,0 +1,4 @@
+/* Fetch the fingerprints of the completed statements of a load. */
+SELECT fingerprint
+FROM {checkpoint_table}
+WHERE staging_table = %(staging_table)s;
@@ -0,0 +1,22 @@
+/* Fetch the queries of the current session run by a multi-statement request (its
+   child queries, which start after the request and end before it), in the order
+   they ran. The information schema is qualified, as the session might have no
+   current database. */
+WITH session_queries AS (
+  SELECT
+    query_id,
+    execution_status,
+    start_time,
+    end_time
+  FROM TABLE({database}.information_schema.query_history_by_session(RESULT_LIMIT => {result_limit}))
+)
+SELECT
+  child_query.query_id,
+  child_query.execution_status
+FROM session_queries AS child_query
+INNER JOIN session_queries AS request
+  ON request.query_id = '{query_id}'
+  AND child_query.query_id <> request.query_id
+  AND child_query.start_time >= request.start_time
+  AND child_query.end_time <= request.end_time
+ORDER BY child_query.start_time;
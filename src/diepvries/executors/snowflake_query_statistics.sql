@@ -0,0 +1,13 @@
+/* Fetch the scan, DML and spilling statistics of queries run by the current user. The
+   information schema is qualified, as the session might have no current database. */
+SELECT
+  query_id,
+  bytes_scanned,
+  partitions_scanned,
+  partitions_total,
+  rows_inserted,
+  rows_updated,
+  bytes_spilled_to_local_storage,
+  bytes_spilled_to_remote_storage
+FROM TABLE({database}.information_schema.query_history_by_user(RESULT_LIMIT => {result_limit}))
+WHERE query_id IN ({query_ids});
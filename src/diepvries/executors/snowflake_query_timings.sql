@@ -0,0 +1,9 @@
+/* Fetch the queued and execution times (in milliseconds) of queries of the current
+   session. Only queuing caused by an overloaded warehouse is considered. The
+   information schema is qualified, as the session might have no current database. */
+SELECT
+  query_id,
+  queued_overload_time,
+  execution_time
+FROM TABLE({database}.information_schema.query_history_by_session(RESULT_LIMIT => {result_limit}))
+WHERE query_id IN ({query_ids});
@@ -0,0 +1 @@
+SHOW TERSE TABLES IN SCHEMA {staging_schema};
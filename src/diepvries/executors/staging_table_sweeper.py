@@ -0,0 +1,144 @@
+"""Removal of the staging tables left behind by Data Vault loads."""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from snowflake.connector import DictCursor, SnowflakeConnection
+
+from .. import FixedPrefixLoggerAdapter
+from ..table import STAGING_TABLE_SUFFIX_FORMAT
+from ..template_sql.sql_formulas import DROP_TABLE_SQL_TEMPLATE
+from . import EXECUTORS_DIR
+
+STAGING_TABLES_SQL_FILE_PATH = EXECUTORS_DIR / "snowflake_staging_tables.sql"
+
+# Staging table names end with the extraction start timestamp of their load.
+STAGING_TABLE_NAME_PATTERN = re.compile(r"^(?P<name>.+)_(?P<suffix>\d{8}_\d{6})$")
+
+
+class StagingTableSweeper:
+    """Drop the staging tables whose load started longer ago than a retention.
+
+    Staging tables are named after the extraction start timestamp of their load
+    (check `StagingTable`). Tables whose name does not end with such a timestamp
+    are never dropped. As permanent tables can follow the same naming, only the
+    staging tables listed in `staging_tables` are dropped, unless the schema is
+    declared as dedicated to staging tables.
+
+    Staging tables of failed loads are kept by the executors, so that loads can be
+    resumed; the retention should leave enough time for that.
+    """
+
+    def __init__(
+        self,
+        connection: SnowflakeConnection,
+        staging_schema: str,
+        retention: timedelta,
+        staging_tables: Optional[Iterable[str]] = None,
+        dedicated_schema: bool = False,
+    ):
+        """Instantiate a StagingTableSweeper.
+
+        Args:
+            connection: Snowflake connection.
+            staging_schema: Schema holding the staging tables.
+            retention: Time after the extraction start timestamp during which
+                staging tables are kept.
+            staging_tables: Names of the staging tables (without timestamp) that can
+                be dropped.
+            dedicated_schema: Whether staging_schema only holds staging tables, in
+                which case all its tables named as staging tables can be dropped
+                when staging_tables is not given.
+
+        Raises:
+            ValueError: If the retention is negative, or if staging_tables is not
+                given for a schema that is not dedicated to staging tables.
+        """
+        if retention < timedelta(0):
+            raise ValueError("The retention of staging tables cannot be negative")
+        if staging_tables is None and not dedicated_schema:
+            raise ValueError(
+                "staging_tables should be given, unless the staging schema only holds "
+                "staging tables (dedicated_schema=True)"
+            )
+
+        self.connection = connection
+        self.staging_schema = staging_schema
+        self.retention = retention
+        self.staging_tables = (
+            None
+            if staging_tables is None
+            else {staging_table.lower() for staging_table in staging_tables}
+        )
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+    def __str__(self) -> str:
+        """Representation of a StagingTableSweeper object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        return f"{type(self).__name__}: {self.staging_schema}"
+
+    def orphaned_staging_tables(self, now: Optional[datetime] = None) -> List[str]:
+        """Get the staging tables older than the retention.
+
+        Args:
+            now: Reference timestamp (defaults to the current UTC timestamp).
+
+        Returns:
+            Names of the staging tables, sorted.
+        """
+        now = now or datetime.now(timezone.utc)
+        with self.connection.cursor(DictCursor) as cursor:
+            cursor.execute(
+                STAGING_TABLES_SQL_FILE_PATH.read_text().format(
+                    staging_schema=self.staging_schema
+                )
+            )
+            table_names = [row["name"].lower() for row in cursor.fetchall()]
+
+        orphaned_staging_tables = []
+        for table_name in table_names:
+            match = STAGING_TABLE_NAME_PATTERN.match(table_name)
+            if match is None or (
+                self.staging_tables is not None
+                and match.group("name") not in self.staging_tables
+            ):
+                continue
+            try:
+                extract_start_timestamp = datetime.strptime(
+                    match.group("suffix"), STAGING_TABLE_SUFFIX_FORMAT
+                ).replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            if now - extract_start_timestamp > self.retention:
+                orphaned_staging_tables.append(table_name)
+
+        return sorted(orphaned_staging_tables)
+
+    def sweep(self, now: Optional[datetime] = None) -> List[str]:
+        """Drop the staging tables older than the retention.
+
+        Args:
+            now: Reference timestamp (defaults to the current UTC timestamp).
+
+        Returns:
+            Names of the dropped staging tables.
+        """
+        orphaned_staging_tables = self.orphaned_staging_tables(now)
+        with self.connection.cursor() as cursor:
+            for table_name in orphaned_staging_tables:
+                cursor.execute(
+                    DROP_TABLE_SQL_TEMPLATE.format(
+                        table=f"{self.staging_schema}.{table_name}"
+                    )
+                )
+                self._logger.info("Staging table (%s) dropped.", table_name)
+
+        return orphaned_staging_tables
@@ -0,0 +1,281 @@
+"""Submission of the SQL statements of Data Vault loads to Snowflake."""
+
+import dataclasses
+import itertools
+import time
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from snowflake.connector import DictCursor, SnowflakeConnection
+from snowflake.connector.constants import QueryStatus
+from snowflake.connector.cursor import SnowflakeCursor
+from snowflake.connector.errors import Error
+
+from ..template_sql.sql_formulas import CANCEL_QUERY_SQL_TEMPLATE
+from . import EXECUTORS_DIR
+from .deadlines import DeadlineExceeded, Deadlines
+from .load_statement import StatementResult, StatementTimings
+
+CHILD_QUERIES_SQL_FILE_PATH = EXECUTORS_DIR / "snowflake_child_queries.sql"
+
+# Number of queries of the session searched for the child queries of a request.
+CHILD_QUERIES_RESULT_LIMIT = 1000
+
+
+class Batching(Enum):
+    """Possible ways to submit the statements of a load to Snowflake.
+
+    - NONE: each statement is submitted in its own request (e.g. the `SET` and
+      `MERGE` statements of a hub are two requests);
+    - TABLE: all statements that load a table are submitted in a single
+      multi-statement request;
+    - GROUP: all statements of a group in `DataVaultLoad.sql_load_scripts_by_group`
+      are submitted in a single multi-statement request (tables of the same group
+      are then loaded one after the other, server side).
+    """
+
+    NONE = "none"
+    TABLE = "table"
+    GROUP = "group"
+
+
+def execute_single_statement(
+    cursor: SnowflakeCursor, statement: str, result: StatementResult
+):
+    """Execute a SQL statement of a load statement and fetch its results.
+
+    Args:
+        cursor: Snowflake cursor (a `DictCursor`).
+        statement: SQL statement.
+        result: Result of the load statement, where the query ID, timings and row
+            counts of the SQL statement are added.
+    """
+    start = time.perf_counter()
+    cursor.execute(statement)
+    fetch_start = time.perf_counter()
+    result.row_counts.add(cursor.fetchall())
+    result.timings.execution_time += fetch_start - start
+    result.timings.fetch_time += time.perf_counter() - fetch_start
+    result.query_ids.append(cursor.sfqid)
+
+
+def get_multi_statement_sql(statements: List[str]) -> str:
+    """Get the SQL of a multi-statement request.
+
+    Args:
+        statements: SQL statements.
+
+    Returns:
+        SQL statements, one per line.
+    """
+    return "\n".join(f"{statement.rstrip(';')};" for statement in statements)
+
+
+def get_child_query_ids(
+    connection: SnowflakeConnection, query_id: str, database: str = None
+) -> Optional[List[str]]:
+    """Get the query IDs of the statements run by a failed multi-statement request.
+
+    Snowflake raises the error of a multi-statement request with the query ID of the
+    request, without the results of its statements. They are found in the query
+    history of the session instead.
+
+    Args:
+        connection: Snowflake connection where the request ran.
+        query_id: Query ID of the request.
+        database: Database whose information schema is queried (None for the
+            database of the connection).
+
+    Returns:
+        Query IDs of the statements that succeeded, in order, followed by the query
+        ID of the failed statement. None when the failed statement is not found in
+        the query history.
+    """
+    child_queries_sql = CHILD_QUERIES_SQL_FILE_PATH.read_text().format(
+        database=database or connection.database,
+        result_limit=CHILD_QUERIES_RESULT_LIMIT,
+        query_id=query_id,
+    )
+    with connection.cursor(DictCursor) as cursor:
+        cursor.execute(child_queries_sql)
+        child_query_ids = []
+        for row in cursor.fetchall():
+            child_query_ids.append(row["QUERY_ID"])
+            if row["EXECUTION_STATUS"] != QueryStatus.SUCCESS.name:
+                return child_query_ids
+
+    return None
+
+
+def execute_multi_statement(
+    cursor: SnowflakeCursor,
+    statements: List[str],
+    timings: StatementTimings,
+    statement_results: List[Tuple[str, List[Dict[str, Any]]]],
+):
+    """Submit several SQL statements in a single request and fetch their results.
+
+    Snowflake stops a multi-statement request at its first failing statement, and
+    raises its error from `execute`, with the query ID of the whole request: no
+    results are fetched then (check `get_child_query_ids`).
+
+    Args:
+        cursor: Snowflake cursor (a `DictCursor`).
+        statements: SQL statements.
+        timings: Timings of the request, where the time of the statements is
+            added.
+        statement_results: List where the query ID and result rows of each
+            statement are added, as soon as they are fetched.
+    """
+    start = time.perf_counter()
+    cursor.execute(get_multi_statement_sql(statements), num_statements=len(statements))
+    fetch_start = time.perf_counter()
+    statement_results.append((cursor.sfqid, cursor.fetchall()))
+    while cursor.nextset():
+        statement_results.append((cursor.sfqid, cursor.fetchall()))
+    timings.execution_time += fetch_start - start
+    timings.fetch_time += time.perf_counter() - fetch_start
+
+
+def execute_batched_statements(
+    connection: SnowflakeConnection,
+    cursor: SnowflakeCursor,
+    results: List[StatementResult],
+    sql_statements: List[List[str]],
+):
+    """Submit the SQL statements of several load statements in a single request.
+
+    All load statements share the timings of the request. When the request fails,
+    the query IDs of its SQL statements are looked up in the query history (check
+    `get_child_query_ids`): the query IDs of the SQL statements that succeeded and of
+    the failed one are added to the results, so that the failed load statement is
+    the one holding the last query ID. When the failed SQL statement cannot be
+    found, no query IDs are added.
+
+    Args:
+        connection: Snowflake connection.
+        cursor: Snowflake cursor (a `DictCursor`).
+        results: Results of the load statements, where the query IDs, timings and
+            row counts of their SQL statements are added.
+        sql_statements: SQL statements of each load statement.
+    """
+    timings = StatementTimings()
+    statement_results: List[Tuple[str, List[Dict[str, Any]]]] = []
+    try:
+        execute_multi_statement(
+            cursor,
+            list(itertools.chain.from_iterable(sql_statements)),
+            timings,
+            statement_results,
+        )
+    except Exception as e:
+        child_query_ids = None
+        if getattr(e, "sfqid", None) is not None:
+            try:
+                child_query_ids = get_child_query_ids(connection, e.sfqid)
+            except Exception:  # pylint: disable=broad-except
+                # The lookup is best effort: the error of the request is raised.
+                pass
+        fetched_rows = [rows for _, rows in statement_results]
+        statement_results = [
+            (query_id, fetched_rows[index] if index < len(fetched_rows) else [])
+            for index, query_id in enumerate(child_query_ids or [])
+        ]
+        raise
+    finally:
+        for result, statements in zip(results, sql_statements):
+            for query_id, rows in statement_results[: len(statements)]:
+                result.query_ids.append(query_id)
+                result.row_counts.add(rows)
+            result.timings = dataclasses.replace(timings)
+            statement_results = statement_results[len(statements) :]
+
+
+def execute_with_deadline(
+    connection: SnowflakeConnection,
+    cursor: SnowflakeCursor,
+    statement: str,
+    result: StatementResult,
+    deadline: float,
+    poll_interval: float,
+):
+    """Execute a SQL statement, cancelling its query if it runs past a deadline.
+
+    The statement is submitted asynchronously and its status is polled until it
+    finishes or the deadline passes.
+
+    Args:
+        connection: Snowflake connection.
+        cursor: Cursor of the connection (a `DictCursor`).
+        statement: SQL statement.
+        result: Result of the load statement, where the query ID, timings and row
+            counts of the SQL statement are added.
+        deadline: Deadline of the statement (a `time.monotonic` value).
+        poll_interval: Time (in seconds) between status checks.
+
+    Raises:
+        DeadlineExceeded: If the query was cancelled.
+    """
+    start = time.perf_counter()
+    cursor.execute_async(statement)
+    query_id = cursor.sfqid
+    result.query_ids.append(query_id)
+    check_time = time.perf_counter()
+    result.timings.submit_time += check_time - start
+    while connection.is_still_running(
+        connection.get_query_status_throw_if_error(query_id)
+    ):
+        remaining_time = deadline - time.monotonic()
+        if remaining_time <= 0:
+            cursor.execute(CANCEL_QUERY_SQL_TEMPLATE.format(query_id=query_id))
+            result.timings.execution_time += time.perf_counter() - check_time
+            raise DeadlineExceeded(query_id)
+        time.sleep(min(poll_interval, remaining_time))
+    fetch_start = time.perf_counter()
+    result.timings.execution_time += fetch_start - check_time
+    cursor.get_results_from_sfqid(query_id)
+    result.row_counts.add(cursor.fetchall())
+    result.timings.fetch_time += time.perf_counter() - fetch_start
+
+
+def execute_sql_statements(
+    connection: SnowflakeConnection,
+    cursor: SnowflakeCursor,
+    results: List[StatementResult],
+    sql_statements: List[List[str]],
+    batching: Batching,
+    deadlines: Optional[Deadlines] = None,
+    load_deadline: Optional[float] = None,
+):
+    """Execute the SQL statements of load statements.
+
+    With deadlines, statements are submitted one by one (`Batching.NONE`), as their
+    queries have to be cancelled when they run past the statement deadline.
+
+    Args:
+        connection: Snowflake connection.
+        cursor: Cursor of the connection (a `DictCursor`).
+        results: Results of the load statements, where the query IDs, timings and
+            row counts of their SQL statements are added.
+        sql_statements: SQL statements of each load statement.
+        batching: How the statements are submitted.
+        deadlines: Deadlines of the statements.
+        load_deadline: Deadline of the load of the statements.
+    """
+    if batching != Batching.NONE:
+        execute_batched_statements(connection, cursor, results, sql_statements)
+        return
+    deadline = deadlines and deadlines.get_statement_deadline(load_deadline)
+    for result, statements in zip(results, sql_statements):
+        for statement in statements:
+            if deadline is None:
+                execute_single_statement(cursor, statement, result)
+            else:
+                execute_with_deadline(
+                    connection,
+                    cursor,
+                    statement,
+                    result,
+                    deadline,
+                    deadlines.poll_interval,
+                )
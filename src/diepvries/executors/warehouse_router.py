@@ -0,0 +1,141 @@
+"""Routing of load statements to Snowflake warehouses."""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .. import FixedPrefixLoggerAdapter, TableType
+from .load_statement import LoadResult, LoadStatement, StatementStatus
+
+#: Relative cost of loading a field, by type of the loaded table (None for the
+#: staging table). Links hold several hashkeys and satellites compare whole records
+#: (hashdiffs) against the largest tables of the model.
+FIELD_WEIGHT_BY_TABLE_TYPE: Dict[Optional[TableType], float] = {
+    None: 1.0,
+    TableType.HUB: 1.0,
+    TableType.LINK: 2.0,
+    TableType.SATELLITE: 4.0,
+}
+
+
+@dataclass
+class WarehouseRoute:
+    """Warehouse where statements of at least a given weight run."""
+
+    #: Snowflake warehouse name.
+    warehouse: str
+    #: Minimum estimated weight (check `WarehouseRouter.estimate_weight`) of the
+    #: statements routed to the warehouse.
+    min_weight: float = 0.0
+    #: Minimum historical runtime (in seconds) of the statements routed to the
+    #: warehouse. Used instead of min_weight when the runtime of a statement is known.
+    min_runtime: float = 0.0
+
+
+class WarehouseRouter:
+    """Route load statements to warehouses, according to their estimated cost.
+
+    The cost of a statement is estimated from the type of the loaded table and its
+    number of fields (check `estimate_weight`), or taken from its historical runtime,
+    when known. Routes go from the smallest to the largest warehouse: each statement
+    runs in the last warehouse whose thresholds it reaches (or in the first one, if
+    it reaches none). E.g., to load big satellites in a larger warehouse:
+
+        WarehouseRouter(
+            [
+                WarehouseRoute("load_xs"),
+                WarehouseRoute("load_l", min_weight=800, min_runtime=300),
+            ]
+        )
+    """
+
+    def __init__(self, routes: List[WarehouseRoute], runtimes: Dict[str, float] = None):
+        """Instantiate a WarehouseRouter.
+
+        Args:
+            routes: Warehouse routes, from the smallest to the largest warehouse.
+            runtimes: Historical runtimes (in seconds), indexed by target table name.
+
+        Raises:
+            ValueError: If no route is defined.
+        """
+        if not routes:
+            raise ValueError("At least one warehouse route should be defined")
+
+        self.routes = routes
+        self.runtimes = dict(runtimes or {})
+
+        self._logger = FixedPrefixLoggerAdapter(logging.getLogger(__name__), str(self))
+
+    def __str__(self) -> str:
+        """Representation of a WarehouseRouter object as a string.
+
+        This helps the tracking of logging events per entity.
+
+        Returns:
+            Logger string format.
+        """
+        warehouses = ", ".join(route.warehouse for route in self.routes)
+        return f"{type(self).__name__}: {warehouses}"
+
+    @property
+    def warehouses(self) -> List[str]:
+        """Get the names of all routed warehouses.
+
+        Returns:
+            Warehouse names, from the smallest to the largest warehouse.
+        """
+        return [route.warehouse for route in self.routes]
+
+    @staticmethod
+    def estimate_weight(load_statement: LoadStatement) -> float:
+        """Estimate the cost of a load statement.
+
+        Args:
+            load_statement: Load statement.
+
+        Returns:
+            Number of fields of the loaded table, weighted by its type (check
+            `FIELD_WEIGHT_BY_TABLE_TYPE`).
+        """
+        return (
+            load_statement.field_count
+            * FIELD_WEIGHT_BY_TABLE_TYPE[load_statement.table_type]
+        )
+
+    def get_warehouse(self, load_statement: LoadStatement) -> str:
+        """Get the warehouse where a load statement should run.
+
+        Args:
+            load_statement: Load statement.
+
+        Returns:
+            Warehouse name.
+        """
+        runtime = self.runtimes.get(load_statement.target_table)
+        if runtime is None:
+            weight = self.estimate_weight(load_statement)
+            routes = [route for route in self.routes if weight >= route.min_weight]
+        else:
+            routes = [route for route in self.routes if runtime >= route.min_runtime]
+        warehouse = (routes or self.routes)[-1].warehouse
+
+        self._logger.debug(
+            "Statement for (%s) routed to (%s).",
+            load_statement.target_table or "staging table",
+            warehouse,
+        )
+
+        return warehouse
+
+    def update_runtimes(self, load_result: LoadResult):
+        """Record the runtimes of the succeeded statements of a load.
+
+        For batched statements, the runtime is the one of the whole batch.
+
+        Args:
+            load_result: Result of a load.
+        """
+        for target_table, result in load_result.results_by_table.items():
+            if result.status == StatementStatus.SUCCEEDED:
+                self.runtimes[target_table] = result.elapsed_time
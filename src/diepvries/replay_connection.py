@@ -0,0 +1,786 @@
+"""Record/replay stand-ins for Snowflake connections.
+
+`RecordingConnection` wraps a real Snowflake connection and records the results of
+every executed statement (rows, row counts, query IDs, errors and elapsed time).
+`ReplayConnection` replays those results without any network access, optionally
+with artificial latency, for both synchronous and asynchronous queries. Both can be
+used wherever a Snowflake connection is expected by diepvries (e.g.
+`SnowflakeDeserializer`), which makes it possible to benchmark and reproduce
+production behaviour locally.
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from snowflake.connector import SnowflakeConnection
+from snowflake.connector.constants import QueryStatus
+from snowflake.connector.errors import Error, ProgrammingError
+from snowflake.connector.util_text import split_statements
+
+
+def normalize_sql(sql: str) -> str:
+    """Normalize an SQL statement, so that it can be used to match recordings.
+
+    Args:
+        sql: SQL statement.
+
+    Returns:
+        SQL statement with all whitespace sequences replaced by a single space.
+    """
+    return " ".join(sql.split())
+
+
+@dataclass
+class RecordedQuery:
+    """Results of a statement executed through a `RecordingConnection`."""
+
+    #: Executed SQL statement (normalized, check `normalize_sql`).
+    sql: str
+    #: Rows returned by the statement (dictionaries when a `DictCursor` was used).
+    rows: List[Any] = field(default_factory=list)
+    #: Number of rows returned or affected by the statement.
+    rowcount: Optional[int] = None
+    #: Snowflake query ID.
+    query_id: Optional[str] = None
+    #: Error message, when the statement failed.
+    error: Optional[str] = None
+    #: Time (in seconds) that the statement took to execute and fetch.
+    elapsed_time: float = 0.0
+
+
+def load_recordings(file_path: Union[str, Path]) -> List[RecordedQuery]:
+    """Load recorded queries from a file (check `RecordingConnection.save`).
+
+    Args:
+        file_path: Path of the recordings file.
+
+    Returns:
+        Recorded queries.
+    """
+    return [
+        RecordedQuery(**recorded_query)
+        for recorded_query in json.loads(Path(file_path).read_text(encoding="utf-8"))
+    ]
+
+
+class ReplayCursor:
+    """Cursor of a `ReplayConnection`.
+
+    Implements the subset of the `SnowflakeCursor` interface used by diepvries.
+    """
+
+    def __init__(self, connection: Union["ReplayConnection", "RecordingConnection"]):
+        """Instantiate a ReplayCursor.
+
+        Args:
+            connection: Connection that created this cursor.
+        """
+        self.connection = connection
+        self.rowcount: Optional[int] = None
+        self.sfqid: Optional[str] = None
+        self._rows: List[Any] = []
+        self._position = 0
+        # Results of the remaining statements of a multi-statement request.
+        self._pending_results: List[Tuple[RecordedQuery, str]] = []
+
+    def __enter__(self) -> "ReplayCursor":
+        """Enter the cursor context.
+
+        Returns:
+            This cursor.
+        """
+        return self
+
+    def __exit__(self, *_args):
+        """Exit the cursor context.
+
+        Args:
+            _args: Unused, exception details.
+        """
+        self.close()
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the remaining rows of the last executed statement.
+
+        Yields:
+            Result rows.
+        """
+        while self._position < len(self._rows):
+            yield self.fetchone()
+
+    def execute(
+        self,
+        command: str,
+        *_args,
+        num_statements: Optional[int] = None,
+        **_kwargs,
+    ) -> "ReplayCursor":
+        """Replay the results of a statement.
+
+        When `num_statements` is given, the command is a multi-statement request: each
+        statement is replayed in order and the results of the first one are loaded
+        (check `nextset`). As in Snowflake, the request stops at its first failing
+        statement and fails as a whole: its error is raised right away, with the
+        query ID of the request (and without the results of any statement). A
+        request recorded as a whole (check `RecordingCursor.execute`) is replayed as
+        such.
+
+        Args:
+            command: SQL statement (or statements, for a multi-statement request).
+            _args: Unused, for compatibility with `SnowflakeCursor.execute`.
+            num_statements: Number of statements of a multi-statement request (0 for
+                any number of statements).
+            _kwargs: Unused, for compatibility with `SnowflakeCursor.execute`.
+
+        Returns:
+            This cursor.
+
+        Raises:
+            ProgrammingError: If the number of statements does not match
+                num_statements, or if a statement failed.
+        """
+        if num_statements is None or self.connection.has_recording(command):
+            return self._load(self.connection.replay(command), command)
+
+        statements = [
+            statement
+            for statement, _ in split_statements(
+                StringIO(command), remove_comments=True
+            )
+        ]
+        if num_statements not in (0, len(statements)):
+            raise ProgrammingError(
+                msg=(
+                    f"Actual statement count {len(statements)} did not match the "
+                    f"desired statement count {num_statements}"
+                ),
+                query=command,
+                send_telemetry=False,
+            )
+        self._pending_results = []
+        pending_results = []
+        for statement in statements:
+            recorded_query = self.connection.replay(statement)
+            if recorded_query.error is not None:
+                self.sfqid = str(uuid.uuid4())
+                raise ProgrammingError(
+                    msg=recorded_query.error,
+                    sfqid=self.sfqid,
+                    query=command,
+                    send_telemetry=False,
+                )
+            pending_results.append((recorded_query, statement))
+        self._pending_results = pending_results
+        self.nextset()
+
+        return self
+
+    def nextset(self) -> Optional["ReplayCursor"]:
+        """Load the results of the next statement of a multi-statement request.
+
+        Returns:
+            This cursor, or None when there are no more statements.
+        """
+        if not self._pending_results:
+            return None
+        self._load(*self._pending_results.pop(0))
+
+        return self
+
+    def execute_async(self, command: str, *_args, **_kwargs) -> Dict[str, Any]:
+        """Submit a statement, without waiting for its results.
+
+        Args:
+            command: SQL statement.
+            _args: Unused, for compatibility with `SnowflakeCursor.execute_async`.
+            _kwargs: Unused, for compatibility with `SnowflakeCursor.execute_async`.
+
+        Returns:
+            Submission response, holding the query ID.
+        """
+        self.sfqid = self.connection.submit(command)
+        return {"queryId": self.sfqid}
+
+    def get_results_from_sfqid(self, sfqid: str):
+        """Load the results of an asynchronous query, waiting for it to finish.
+
+        Args:
+            sfqid: Snowflake query ID.
+        """
+        self._load(*self.connection.wait(sfqid))
+
+    def _load(self, recorded_query: RecordedQuery, command: str) -> "ReplayCursor":
+        """Load the results of a recorded query into this cursor.
+
+        Args:
+            recorded_query: Recorded query.
+            command: SQL statement, as executed.
+
+        Returns:
+            This cursor.
+
+        Raises:
+            ProgrammingError: If the recorded statement failed.
+        """
+        self.sfqid = recorded_query.query_id or str(uuid.uuid4())
+        if recorded_query.error is not None:
+            raise ProgrammingError(
+                msg=recorded_query.error,
+                sfqid=self.sfqid,
+                query=command,
+                send_telemetry=False,
+            )
+
+        self._rows = [
+            tuple(row) if isinstance(row, list) else row for row in recorded_query.rows
+        ]
+        self._position = 0
+        self.rowcount = (
+            recorded_query.rowcount
+            if recorded_query.rowcount is not None
+            else len(self._rows)
+        )
+
+        return self
+
+    def fetchone(self) -> Optional[Any]:
+        """Fetch the next row of the last executed statement.
+
+        Returns:
+            Next row, or None when all rows were fetched.
+        """
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    def fetchall(self) -> List[Any]:
+        """Fetch all remaining rows of the last executed statement.
+
+        Returns:
+            Remaining rows.
+        """
+        return list(self)
+
+    def close(self):
+        """Close the cursor (no-op)."""
+
+
+class ReplayConnection:
+    """Stand-in for a Snowflake connection that replays recorded results.
+
+    Statements are matched with recordings by their normalized SQL text. When a
+    statement was recorded more than once, recordings are replayed in the order they
+    were recorded (cycling back to the first one when all of them were replayed).
+    """
+
+    def __init__(
+        self,
+        recordings: List[RecordedQuery],
+        latency: float = 0.0,
+        elapsed_time_scale: float = 0.0,
+        strict: bool = True,
+        database: str = None,
+    ):
+        """Instantiate a ReplayConnection.
+
+        Args:
+            recordings: Recorded queries (check `load_recordings`).
+            latency: Artificial latency (in seconds) added to every statement.
+            elapsed_time_scale: Factor applied to the recorded elapsed time of each
+                statement, which is added to its latency. Use 1.0 to replay statements
+                as slowly as they were recorded and 0.0 to ignore recorded times.
+            strict: Whether statements without recordings should fail. Otherwise, they
+                return no rows.
+            database: Current database of the session.
+        """
+        self.database = database
+        self.latency = latency
+        self.elapsed_time_scale = elapsed_time_scale
+        self.strict = strict
+        self.executed_statements: List[str] = []
+        self._is_closed = False
+        self._recordings: Dict[str, List[RecordedQuery]] = defaultdict(list)
+        self._replay_counts: Dict[str, int] = defaultdict(int)
+        # Asynchronous queries (recording, statement and finish time), indexed by
+        # query ID.
+        self._async_queries: Dict[str, Tuple[RecordedQuery, str, float]] = {}
+        self._lock = threading.Lock()
+
+        for recorded_query in recordings:
+            self._recordings[normalize_sql(recorded_query.sql)].append(recorded_query)
+
+    @classmethod
+    def from_file(cls, file_path: Union[str, Path], **kwargs) -> "ReplayConnection":
+        """Instantiate a ReplayConnection from a recordings file.
+
+        Args:
+            file_path: Path of the recordings file.
+            kwargs: Remaining arguments of `ReplayConnection.__init__`.
+
+        Returns:
+            ReplayConnection instance.
+        """
+        return cls(recordings=load_recordings(file_path), **kwargs)
+
+    def cursor(self, _cursor_class: Any = None) -> ReplayCursor:
+        """Create a cursor.
+
+        Args:
+            _cursor_class: Unused, rows are replayed as they were recorded.
+
+        Returns:
+            Cursor instance.
+        """
+        return ReplayCursor(self)
+
+    def has_recording(self, command: str) -> bool:
+        """Check whether a statement was recorded.
+
+        Args:
+            command: SQL statement.
+
+        Returns:
+            True if the statement has recordings.
+        """
+        return normalize_sql(command) in self._recordings
+
+    def replay(self, command: str) -> RecordedQuery:
+        """Get the recording of a statement, simulating its latency.
+
+        Args:
+            command: SQL statement.
+
+        Returns:
+            Recorded query.
+        """
+        recorded_query = self._match(command)
+        time.sleep(self._get_latency(recorded_query))
+
+        return recorded_query
+
+    def submit(self, command: str) -> str:
+        """Submit a statement asynchronously (check `SnowflakeCursor.execute_async`).
+
+        The statement is considered running until its latency elapsed.
+
+        Args:
+            command: SQL statement.
+
+        Returns:
+            Query ID.
+        """
+        recorded_query = self._match(command)
+        with self._lock:
+            query_id = recorded_query.query_id
+            if query_id is None or query_id in self._async_queries:
+                query_id = str(uuid.uuid4())
+            self._async_queries[query_id] = (
+                recorded_query,
+                command,
+                time.monotonic() + self._get_latency(recorded_query),
+            )
+
+        return query_id
+
+    def wait(self, query_id: str) -> Tuple[RecordedQuery, str]:
+        """Wait until an asynchronous query finishes.
+
+        Args:
+            query_id: Query ID.
+
+        Returns:
+            Recorded query and SQL statement, as submitted.
+        """
+        recorded_query, command, finish_time = self._async_queries[query_id]
+        time.sleep(max(finish_time - time.monotonic(), 0.0))
+
+        return recorded_query, command
+
+    def get_query_status(self, query_id: str) -> QueryStatus:
+        """Get the status of an asynchronous query.
+
+        Args:
+            query_id: Query ID.
+
+        Returns:
+            Query status.
+        """
+        recorded_query, _, finish_time = self._async_queries[query_id]
+        if time.monotonic() < finish_time:
+            return QueryStatus.RUNNING
+        if recorded_query.error is not None:
+            return QueryStatus.FAILED_WITH_ERROR
+        return QueryStatus.SUCCESS
+
+    def get_query_status_throw_if_error(self, query_id: str) -> QueryStatus:
+        """Get the status of an asynchronous query, raising an error if it failed.
+
+        Args:
+            query_id: Query ID.
+
+        Returns:
+            Query status.
+
+        Raises:
+            ProgrammingError: If the query failed.
+        """
+        status = self.get_query_status(query_id)
+        if self.is_an_error(status):
+            recorded_query, command, _ = self._async_queries[query_id]
+            raise ProgrammingError(
+                msg=recorded_query.error,
+                sfqid=query_id,
+                query=command,
+                send_telemetry=False,
+            )
+
+        return status
+
+    is_still_running = staticmethod(SnowflakeConnection.is_still_running)
+    is_an_error = staticmethod(SnowflakeConnection.is_an_error)
+
+    def _match(self, command: str) -> RecordedQuery:
+        """Get the recording of a statement.
+
+        Args:
+            command: SQL statement.
+
+        Returns:
+            Recorded query.
+
+        Raises:
+            ProgrammingError: If no recording exists for the statement (in strict
+                mode).
+        """
+        sql = normalize_sql(command)
+        with self._lock:
+            self.executed_statements.append(command)
+            recordings = self._recordings.get(sql)
+            if recordings:
+                recorded_query = recordings[self._replay_counts[sql] % len(recordings)]
+                self._replay_counts[sql] += 1
+            elif self.strict:
+                raise ProgrammingError(
+                    msg=f"No recording found for statement: {sql}",
+                    query=command,
+                    send_telemetry=False,
+                )
+            else:
+                recorded_query = RecordedQuery(sql=sql)
+
+        return recorded_query
+
+    def _get_latency(self, recorded_query: RecordedQuery) -> float:
+        """Get the simulated latency of a statement.
+
+        Args:
+            recorded_query: Recorded query.
+
+        Returns:
+            Latency (in seconds).
+        """
+        return self.latency + recorded_query.elapsed_time * self.elapsed_time_scale
+
+    def is_closed(self) -> bool:
+        """Check whether the connection is closed.
+
+        Returns:
+            True if the connection was closed.
+        """
+        return self._is_closed
+
+    def close(self):
+        """Close the connection."""
+        self._is_closed = True
+
+
+class RecordingCursor(ReplayCursor):
+    """Cursor of a `RecordingConnection`, wrapping a real Snowflake cursor.
+
+    Each statement of a successful multi-statement request is recorded separately,
+    as `ReplayCursor` replays them one by one, while failed requests are recorded as
+    a whole. Asynchronous queries are recorded when their results are fetched, or
+    when they fail.
+    """
+
+    def __init__(self, connection: "RecordingConnection", cursor: Any):
+        """Instantiate a RecordingCursor.
+
+        Args:
+            connection: Connection that created this cursor.
+            cursor: Wrapped Snowflake cursor.
+        """
+        super().__init__(connection)
+        self._cursor = cursor
+
+    def execute(
+        self,
+        command: str,
+        *args,
+        num_statements: Optional[int] = None,
+        **kwargs,
+    ) -> "RecordingCursor":
+        """Execute a statement and record its results.
+
+        All rows are fetched right away, so that they can be recorded. For a
+        multi-statement request, the results of all statements are fetched and the
+        results of the first one are loaded (check `nextset`). A failed request is
+        recorded as a whole, as Snowflake does not tell which statement failed.
+
+        Args:
+            command: SQL statement (or statements, for a multi-statement request).
+            args: Remaining positional arguments of `SnowflakeCursor.execute`.
+            num_statements: Number of statements of a multi-statement request.
+            kwargs: Remaining keyword arguments of `SnowflakeCursor.execute`.
+
+        Returns:
+            This cursor.
+
+        Raises:
+            Error: If the statement fails (the error is recorded as well).
+        """
+        if num_statements is None:
+            recorded_query = self._record(
+                command,
+                lambda: self._cursor.execute(command, *args, **kwargs),
+            )
+            return self._load(recorded_query, command)
+
+        statements = [
+            statement
+            for statement, _ in split_statements(
+                StringIO(command), remove_comments=True
+            )
+        ]
+        self._pending_results = []
+        start = time.perf_counter()
+        self._record(
+            command,
+            lambda: self._cursor.execute(
+                command, *args, num_statements=num_statements, **kwargs
+            ),
+            record_success=False,
+        )
+        steps = [lambda: None, *[self._cursor.nextset] * (len(statements) - 1)]
+        self._pending_results = [
+            (self._record(statement, step, start), statement)
+            for statement, step in zip(statements, steps)
+        ]
+        self.nextset()
+
+        return self
+
+    def execute_async(self, command: str, *args, **kwargs) -> Dict[str, Any]:
+        """Submit a statement, without waiting for its results.
+
+        Args:
+            command: SQL statement.
+            args: Remaining positional arguments of `SnowflakeCursor.execute_async`.
+            kwargs: Remaining keyword arguments of `SnowflakeCursor.execute_async`.
+
+        Returns:
+            Submission response, holding the query ID.
+        """
+        response = self._cursor.execute_async(command, *args, **kwargs)
+        self.sfqid = self._cursor.sfqid
+        self.connection.submitted(self.sfqid, command)
+
+        return response
+
+    def get_results_from_sfqid(self, sfqid: str):
+        """Load and record the results of an asynchronous query.
+
+        Args:
+            sfqid: Snowflake query ID.
+        """
+        command, submit_time = self.connection.async_queries[sfqid]
+        self._load(
+            self._record(
+                command,
+                lambda: self._cursor.get_results_from_sfqid(sfqid),
+                submit_time,
+                sfqid,
+            ),
+            command,
+        )
+
+    def _record(
+        self,
+        command: str,
+        execute: Callable[[], Any],
+        start: Optional[float] = None,
+        query_id: Optional[str] = None,
+        record_success: bool = True,
+    ) -> RecordedQuery:
+        """Execute a statement (or fetch its results) and record its results.
+
+        Args:
+            command: SQL statement.
+            execute: Function executing the statement in the wrapped cursor.
+            start: Time (a `time.perf_counter` value) when the statement was
+                submitted, when it is not executed by `execute`.
+            query_id: Snowflake query ID, when known before the statement executes.
+            record_success: Whether the statement is recorded when it succeeds.
+                Otherwise, only failures are recorded.
+
+        Returns:
+            Recorded query.
+
+        Raises:
+            Error: If the statement fails (the error is recorded as well).
+        """
+        recorded_query = RecordedQuery(sql=normalize_sql(command))
+        start = time.perf_counter() if start is None else start
+        try:
+            execute()
+            if record_success:
+                recorded_query.rows = list(self._cursor)
+        except Error as e:
+            recorded_query.error = e.raw_msg
+            query_id = query_id or e.sfqid
+            raise
+        finally:
+            recorded_query.elapsed_time = time.perf_counter() - start
+            recorded_query.query_id = query_id or self._cursor.sfqid
+            recorded_query.rowcount = self._cursor.rowcount
+            if record_success or recorded_query.error is not None:
+                self.connection.record(recorded_query)
+
+        return recorded_query
+
+    def close(self):
+        """Close the wrapped cursor."""
+        self._cursor.close()
+
+
+class RecordingConnection:
+    """Wrapper of a Snowflake connection that records all executed statements."""
+
+    def __init__(self, connection: SnowflakeConnection):
+        """Instantiate a RecordingConnection.
+
+        Args:
+            connection: Wrapped Snowflake connection.
+        """
+        self.connection = connection
+        self.recordings: List[RecordedQuery] = []
+        # SQL statement and submission time (a `time.perf_counter` value) of
+        # asynchronous queries, indexed by query ID.
+        self.async_queries: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def cursor(self, *args, **kwargs) -> RecordingCursor:
+        """Create a cursor.
+
+        Args:
+            args: Positional arguments of `SnowflakeConnection.cursor`.
+            kwargs: Keyword arguments of `SnowflakeConnection.cursor`.
+
+        Returns:
+            Cursor instance.
+        """
+        return RecordingCursor(self, self.connection.cursor(*args, **kwargs))
+
+    @property
+    def database(self) -> Optional[str]:
+        """Get the current database of the wrapped connection.
+
+        Returns:
+            Database name.
+        """
+        return self.connection.database
+
+    def record(self, recorded_query: RecordedQuery):
+        """Add a recorded query.
+
+        Args:
+            recorded_query: Recorded query.
+        """
+        with self._lock:
+            self.recordings.append(recorded_query)
+
+    def submitted(self, query_id: str, command: str):
+        """Keep track of an asynchronous query, to record it once it finishes.
+
+        Args:
+            query_id: Snowflake query ID.
+            command: SQL statement.
+        """
+        with self._lock:
+            self.async_queries[query_id] = (command, time.perf_counter())
+
+    def get_query_status(self, query_id: str) -> QueryStatus:
+        """Get the status of an asynchronous query.
+
+        Args:
+            query_id: Query ID.
+
+        Returns:
+            Query status.
+        """
+        return self.connection.get_query_status(query_id)
+
+    def get_query_status_throw_if_error(self, query_id: str) -> QueryStatus:
+        """Get the status of an asynchronous query, raising an error if it failed.
+
+        Failed queries are recorded with their error.
+
+        Args:
+            query_id: Query ID.
+
+        Returns:
+            Query status.
+
+        Raises:
+            Error: If the query failed.
+        """
+        try:
+            return self.connection.get_query_status_throw_if_error(query_id)
+        except Error as e:
+            command, submit_time = self.async_queries[query_id]
+            self.record(
+                RecordedQuery(
+                    sql=normalize_sql(command),
+                    query_id=query_id,
+                    error=e.raw_msg,
+                    elapsed_time=time.perf_counter() - submit_time,
+                )
+            )
+            raise
+
+    is_still_running = staticmethod(SnowflakeConnection.is_still_running)
+    is_an_error = staticmethod(SnowflakeConnection.is_an_error)
+
+    def save(self, file_path: Union[str, Path]):
+        """Save all recordings to a file (check `load_recordings`).
+
+        Args:
+            file_path: Path of the recordings file.
+        """
+        Path(file_path).write_text(
+            json.dumps(
+                [asdict(recorded_query) for recorded_query in self.recordings],
+                default=str,
+            ),
+            encoding="utf-8",
+        )
+
+    def is_closed(self) -> bool:
+        """Check whether the wrapped connection is closed.
+
+        Returns:
+            True if the connection was closed.
+        """
+        return self.connection.is_closed()
+
+    def close(self):
+        """Close the wrapped connection."""
+        self.connection.close()
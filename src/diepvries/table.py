@@ -6,10 +6,19 @@ from datetime import datetime
 from functools import cached_property
 from typing import Dict, List
 
-from . import HASH_DELIMITER, METADATA_FIELDS, FieldRole, FixedPrefixLoggerAdapter
+from . import (
+    HASH_DELIMITER,
+    METADATA_FIELDS,
+    FieldRole,
+    FixedPrefixLoggerAdapter,
+    StagingTableKind,
+)
 from .field import Field
 from .template_sql.sql_formulas import HASHKEY_SQL_TEMPLATE
 
+# Format of the extraction start timestamp in staging table names.
+STAGING_TABLE_SUFFIX_FORMAT = "%Y%m%d_%H%M%S"
+
 
 class Table(ABC):
     """A generic table.
@@ -51,16 +60,26 @@ class StagingTable(Table):
 
     # pylint: disable=too-few-public-methods
 
-    def __init__(self, schema: str, name: str, extract_start_timestamp: datetime):
+    def __init__(
+        self,
+        schema: str,
+        name: str,
+        extract_start_timestamp: datetime,
+        kind: StagingTableKind = StagingTableKind.PERMANENT,
+    ):
         """Instantiate a StagingTable.
 
         Args:
              schema: Schema name.
              name: Table name.
              extract_start_timestamp: Extract start timestamp.
+             kind: Kind of table (permanent, transient or temporary).
         """
-        staging_table_suffix = extract_start_timestamp.strftime("%Y%m%d_%H%M%S")
+        staging_table_suffix = extract_start_timestamp.strftime(
+            STAGING_TABLE_SUFFIX_FORMAT
+        )
         physical_name = f"{name}_{staging_table_suffix}"
+        self.kind = kind
 
         super().__init__(schema=schema, name=physical_name)
 
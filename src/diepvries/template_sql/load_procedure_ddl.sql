@@ -0,0 +1,11 @@
+CREATE PROCEDURE IF NOT EXISTS {procedure_schema}.{procedure_name}({arguments})
+  RETURNS VARCHAR
+  LANGUAGE SQL
+  EXECUTE AS CALLER
+AS
+$$
+BEGIN
+{statements}
+RETURN :{staging_table_argument};
+END;
+$$;
@@ -0,0 +1,5 @@
+EXECUTE IMMEDIATE $$
+BEGIN
+{statements}
+END;
+$$;
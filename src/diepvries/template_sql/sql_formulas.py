@@ -1,6 +1,10 @@
 """SQL formulas (formatted strings)."""
 
-from typing import List, Union
+import re
+from io import StringIO
+from typing import Any, Dict, List, Union
+
+from snowflake.connector.util_text import split_statements
 
 from .. import END_OF_TIME, HASH_DELIMITER, METADATA_FIELDS, UNKNOWN
 from ..driving_key_field import DrivingKeyField
@@ -63,6 +67,52 @@ RECORD_START_TIMESTAMP_SQL_TEMPLATE = (
 # aliased.
 SOURCE_SQL_TEMPLATE = f"'{{source}}' AS {METADATA_FIELDS['record_source']}"
 
+# Formulas used in stored procedures, where the extraction start timestamp, the
+# staging table and the source are procedure arguments (check
+# `DataVaultLoad.sql_create_procedure_statement`).
+RECORD_START_TIMESTAMP_ARGUMENT_SQL_TEMPLATE = (
+    f"CAST(:{{argument}} AS TIMESTAMP) AS {METADATA_FIELDS['record_start_timestamp']}"
+)
+SOURCE_ARGUMENT_SQL_TEMPLATE = f":{{argument}} AS {METADATA_FIELDS['record_source']}"
+STAGING_TABLE_ARGUMENT_SQL_TEMPLATE = "IDENTIFIER(:{argument})"
+
+# Formula used to call a stored procedure.
+CALL_PROCEDURE_SQL_TEMPLATE = "CALL {procedure_schema}.{procedure_name}({arguments});"
+
+# Formula used to drop a table.
+DROP_TABLE_SQL_TEMPLATE = "DROP TABLE IF EXISTS {table};"
+
+# Formula used to set the query tag of a session.
+SET_QUERY_TAG_SQL_TEMPLATE = "ALTER SESSION SET QUERY_TAG = '{query_tag}';"
+
+# Formula used to cancel a running query.
+CANCEL_QUERY_SQL_TEMPLATE = "SELECT SYSTEM$CANCEL_QUERY('{query_id}');"
+
+# Formula used to set the warehouse of a session.
+USE_WAREHOUSE_SQL_TEMPLATE = "USE WAREHOUSE {warehouse};"
+
+# Formula used to set parameters of a session (e.g. `TIMEZONE = 'UTC'`).
+SET_SESSION_PARAMETERS_SQL_TEMPLATE = "ALTER SESSION SET {parameters};"
+
+# Formula used to reset parameters of a session to their default values.
+UNSET_SESSION_PARAMETERS_SQL_TEMPLATE = "ALTER SESSION UNSET {parameters};"
+
+# Statement used to check that a session still works.
+HEALTH_CHECK_SQL = "SELECT 1;"
+
+# Pattern of the session variables set by the load templates (e.g. `min_timestamp`,
+# `min_timestamp_link`), where they are referenced (`$min_timestamp`) or set (`SET
+# min_timestamp = ...`, at the start of a line). Columns and aliases are not matched.
+SESSION_VARIABLE_PATTERN = re.compile(
+    r"(?<=\$)min_timestamp\w*\b|(?<=^SET )min_timestamp\w*\b(?=\s*=)", re.MULTILINE
+)
+
+# Formula used to run a statement asynchronously in a Snowflake Scripting block.
+ASYNC_STATEMENT_SQL_TEMPLATE = "ASYNC ({statement});"
+
+# Formula used to wait for all asynchronous statements of a Snowflake Scripting block.
+AWAIT_ALL_SQL_TEMPLATE = "AWAIT ALL;"
+
 
 def format_fields_for_join(
     fields: List[Union[Field, DrivingKeyField]],
@@ -113,3 +163,60 @@ def format_fields_for_select(
         ]
 
     return [field.name for field in fields]
+
+
+def format_session_parameters(parameters: Dict[str, Any]) -> str:
+    """Get the statement that sets parameters of a session.
+
+    String values are quoted, other values (e.g. numbers, booleans) are used as they
+    are.
+
+    Args:
+        parameters: Session parameters, indexed by name.
+
+    Returns:
+        SQL statement.
+    """
+    assignments = []
+    for name, value in parameters.items():
+        if isinstance(value, bool):
+            value = str(value).upper()
+        elif isinstance(value, str):
+            escaped_value = value.replace("\\", "\\\\").replace("'", "\\'")
+            value = f"'{escaped_value}'"
+        assignments.append(f"{name} = {value}")
+    return SET_SESSION_PARAMETERS_SQL_TEMPLATE.format(parameters=" ".join(assignments))
+
+
+def split_sql_script(sql_script: str) -> List[str]:
+    """Split an SQL script in the statements it holds.
+
+    Load scripts set session variables before running their MERGE statement, so
+    these statements must run in order, in the same session.
+
+    Args:
+        sql_script: SQL script.
+
+    Returns:
+        SQL statements (without comments).
+    """
+    return [
+        statement
+        for statement, _ in split_statements(StringIO(sql_script), remove_comments=True)
+    ]
+
+
+def rename_session_variables(sql: str, suffix: str) -> str:
+    """Rename the session variables used in a load script.
+
+    This makes it possible to run load scripts of several tables concurrently in the
+    same session.
+
+    Args:
+        sql: Load script (check `SESSION_VARIABLE_PATTERN`).
+        suffix: Suffix added to each session variable name.
+
+    Returns:
+        Load script with renamed session variables.
+    """
+    return SESSION_VARIABLE_PATTERN.sub(rf"\g<0>_{suffix}", sql)
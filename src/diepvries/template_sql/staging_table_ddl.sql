@@ -1,4 +1,4 @@
-CREATE OR REPLACE TABLE {staging_schema}.{staging_table}
+CREATE OR REPLACE {staging_table_kind} {staging_schema}.{staging_table}
   ({fields_ddl}) AS
   SELECT {fields_dml}
   FROM {extract_schema_name}.{extract_table_name};
@@ -807,3 +807,31 @@ def data_vault_load(
     return DataVaultLoad(
         **data_vault_load_configuration, extract_start_timestamp=extract_start_timestamp
     )
+
+
+@pytest.fixture
+def other_data_vault_load(
+    process_configuration: Dict[str, str],
+    extract_start_timestamp: datetime,
+    data_vault_load: DataVaultLoad,
+) -> DataVaultLoad:
+    """Define an instance of DataVaultLoad that shares its target tables with
+    data_vault_load, from another staging table.
+
+    Args:
+        process_configuration: Process configuration fixture value.
+        extract_start_timestamp: Extraction start timestamp fixture value.
+        data_vault_load: Data vault load fixture value.
+
+    Returns:
+        Instance of DataVaultLoad suitable for testing.
+    """
+    return DataVaultLoad(
+        extract_schema=process_configuration["extract_schema"],
+        extract_table="extract_other_orders",
+        staging_schema=process_configuration["staging_schema"],
+        staging_table="other_orders",
+        extract_start_timestamp=extract_start_timestamp,
+        target_tables=data_vault_load.target_tables,
+        source=process_configuration["source"],
+    )
@@ -9,6 +9,12 @@ from unittest.mock import Mock
 import pytest
 from snowflake.connector import SnowflakeConnection
 
+from diepvries.deserializers.file_deserializer import FileDeserializer
+from diepvries.deserializers.model_discovery import (
+    DISCOVERY_SQL_FILE_PATH,
+    ModelDiscovery,
+)
+from diepvries.deserializers.model_session import ModelSession
 from diepvries.deserializers.snowflake_deserializer import (
     METADATA_SQL_FILE_PATH,
     DatabaseConfiguration,
@@ -19,6 +25,7 @@ from diepvries.effectivity_satellite import EffectivitySatellite
 from diepvries.field import Field
 from diepvries.hub import Hub
 from diepvries.link import Link
+from diepvries.replay_connection import RecordedQuery, ReplayConnection
 from diepvries.role_playing_hub import RolePlayingHub
 from diepvries.satellite import Satellite
 
@@ -161,3 +168,107 @@ def snowflake_deserializer(
             driving_keys=driving_keys,
             role_playing_hubs=role_playing_hubs,
         )
+
+
+@pytest.fixture
+def fields_metadata_path() -> Path:
+    """Get path of the mocked Snowflake `SHOW COLUMNS` results."""
+    return Path(__file__).parent / "model_metadata.json"
+
+
+@pytest.fixture
+def file_deserializer(
+    target_schema: str,
+    target_tables: List[str],
+    fields_metadata_path: Path,
+    driving_keys: List[DrivingKeyField],
+    role_playing_hubs: Dict[str, str],
+) -> FileDeserializer:
+    """Instantiate `FileDeserializer` used in unit tests."""
+    return FileDeserializer(
+        target_schema=target_schema,
+        target_tables=target_tables,
+        file_path=fields_metadata_path,
+        driving_keys=driving_keys,
+        role_playing_hubs=role_playing_hubs,
+    )
+
+
+@pytest.fixture
+def model_session(
+    target_schema: str,
+    database_configuration: DatabaseConfiguration,
+    fields_metadata: List[Dict[str, str]],
+    fields_metadata_sql: str,
+) -> ModelSession:
+    """Instantiate `ModelSession` used in unit tests.
+
+    The Snowflake connection is replaced by a `ReplayConnection`, that returns the
+    results stored in `model_metadata.json` for the metadata query.
+    """
+    return ModelSession(
+        target_schema=target_schema,
+        database_configuration=database_configuration,
+        database_connection=ReplayConnection(
+            recordings=[RecordedQuery(sql=fields_metadata_sql, rows=fields_metadata)]
+        ),
+    )
+
+
+@pytest.fixture
+def discovery_metadata(
+    fields_metadata: List[Dict[str, str]],
+    driving_keys_by_table: Dict[str, List[DrivingKeyField]],
+    role_playing_hubs: Dict[str, str],
+) -> List[Dict[str, str]]:
+    """Get expected results for the model discovery query.
+
+    Role playing hubs and effectivity satellites are configured through table
+    comments. A table without a Data Vault prefix is added, which must be ignored.
+    """
+    table_comments = {
+        role_playing_hub: f"Role playing hub. diepvries.parent_hub={parent_table}"
+        for role_playing_hub, parent_table in role_playing_hubs.items()
+    }
+    table_comments.update(
+        {
+            satellite_name: "diepvries.driving_keys="
+            + ",".join(driving_key.name for driving_key in driving_keys)
+            for satellite_name, driving_keys in driving_keys_by_table.items()
+        }
+    )
+    metadata = [
+        {**field, "table_comment": table_comments.get(field["table_name"].lower())}
+        for field in fields_metadata
+    ]
+    metadata.append(
+        {
+            **fields_metadata[0],
+            "table_name": "CUSTOMER_EXPORT",
+            "table_comment": "diepvries.parent_hub=h_customer",
+        }
+    )
+    return metadata
+
+
+@pytest.fixture
+def model_discovery(
+    target_schema: str,
+    database_configuration: DatabaseConfiguration,
+    discovery_metadata: List[Dict[str, str]],
+) -> ModelDiscovery:
+    """Instantiate `ModelDiscovery` used in unit tests.
+
+    The Snowflake connection is replaced by a `ReplayConnection`, that returns the
+    results of the model discovery query.
+    """
+    discovery_sql = DISCOVERY_SQL_FILE_PATH.read_text().format(
+        target_database=database_configuration.database, target_schema=target_schema
+    )
+    return ModelDiscovery(
+        target_schema=target_schema,
+        database_configuration=database_configuration,
+        database_connection=ReplayConnection(
+            recordings=[RecordedQuery(sql=discovery_sql, rows=discovery_metadata)]
+        ),
+    )
@@ -0,0 +1,109 @@
+"""Unit tests for FileDeserializer."""
+
+from pathlib import Path
+from typing import Dict, List
+from unittest import mock
+
+from diepvries.deserializers.file_deserializer import FileDeserializer
+from diepvries.field import Field
+from diepvries.hub import Hub
+from diepvries.role_playing_hub import RolePlayingHub
+
+from .test_snowflake_deserializer import compare_tables
+
+# pylint: disable=protected-access
+
+
+def test_fields(
+    file_deserializer: FileDeserializer,
+    target_tables: List[str],
+    fields: Dict[str, List[Field]],
+):
+    """Test `FileDeserializer._fields` property."""
+    calculated_fields = file_deserializer._fields
+
+    # Check that all tables have fields.
+    assert len(calculated_fields.keys()) == len(target_tables)
+
+    for table_name, table_fields in calculated_fields.items():
+        assert table_fields == fields[table_name]
+
+
+def test_deserialized_target_tables(
+    file_deserializer: FileDeserializer,
+    target_tables: List[str],
+    h_customer: Hub,
+):
+    """Test `FileDeserializer.deserialized_target_tables` property."""
+    deserialized_target_tables = file_deserializer.deserialized_target_tables
+
+    assert [table.name for table in deserialized_target_tables] == target_tables
+    role_playing_hub = next(
+        table
+        for table in deserialized_target_tables
+        if isinstance(table, RolePlayingHub)
+    )
+    compare_tables(role_playing_hub.parent_table, h_customer)
+
+
+def test_compressed_metadata_dump(
+    file_deserializer: FileDeserializer,
+    fields: Dict[str, List[Field]],
+    tmp_path: Path,
+):
+    """Test that a gzip compressed metadata dump deserializes the same model."""
+    compressed_path = tmp_path / "model_metadata.json.gz"
+    file_deserializer.dump_metadata(compressed_path)
+
+    compressed_file_deserializer = FileDeserializer(
+        target_schema=file_deserializer.target_schema,
+        target_tables=file_deserializer.target_tables,
+        file_path=compressed_path,
+        driving_keys=file_deserializer.driving_keys,
+        role_playing_hubs=file_deserializer.role_playing_hubs,
+    )
+
+    assert compressed_file_deserializer._metadata == file_deserializer._metadata
+    for table_name, table_fields in compressed_file_deserializer._fields.items():
+        assert table_fields == fields[table_name]
+
+
+def test_iter_deserialized_target_tables(
+    file_deserializer: FileDeserializer,
+    target_tables: List[str],
+    fields: Dict[str, List[Field]],
+):
+    """Test `FileDeserializer.iter_deserialized_target_tables` method.
+
+    Each table must be yielded as soon as its last column is read, not after reading
+    the whole metadata.
+    """
+    metadata = file_deserializer._metadata
+    read_rows = []
+
+    def fetch_metadata():
+        for row in metadata:
+            read_rows.append(row)
+            yield row
+
+    with mock.patch.object(
+        FileDeserializer, "_fetch_metadata", side_effect=fetch_metadata
+    ):
+        tables = file_deserializer.iter_deserialized_target_tables()
+        first_table = next(tables)
+        assert len(read_rows) < len(metadata)
+        streamed_tables = [first_table, *tables]
+
+    assert sorted(table.name for table in streamed_tables) == sorted(target_tables)
+    for table in streamed_tables:
+        assert table.fields == fields[table.name]
+
+    # The result is memoized, with the same instances that were yielded.
+    tables_by_name = {table.name: table for table in streamed_tables}
+    assert file_deserializer.deserialized_target_tables == [
+        tables_by_name[table] for table in target_tables
+    ]
+    assert (
+        tables_by_name["h_customer_role_playing"].parent_table
+        is tables_by_name["h_customer"]
+    )
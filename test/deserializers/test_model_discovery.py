@@ -0,0 +1,61 @@
+"""Unit tests for ModelDiscovery."""
+
+from typing import Dict, List
+
+from diepvries.deserializers.model_discovery import ModelDiscovery
+from diepvries.driving_key_field import DrivingKeyField
+from diepvries.effectivity_satellite import EffectivitySatellite
+from diepvries.field import Field
+from diepvries.role_playing_hub import RolePlayingHub
+
+
+def test_model(
+    model_discovery: ModelDiscovery,
+    target_tables: List[str],
+    driving_keys_by_table: Dict[str, List[DrivingKeyField]],
+    fields: Dict[str, List[Field]],
+):
+    """Test `ModelDiscovery.model` property.
+
+    All Data Vault tables must be discovered (ignoring other tables), configured by
+    their comments and indexed, with a single metadata query.
+    """
+    model = model_discovery.model
+    tables_by_name = model.tables_by_name
+
+    assert set(tables_by_name) == set(target_tables)
+    for table in tables_by_name.values():
+        assert table.fields == fields[table.name]
+
+    role_playing_hub = tables_by_name["h_customer_role_playing"]
+    assert isinstance(role_playing_hub, RolePlayingHub)
+    assert role_playing_hub.parent_table is tables_by_name["h_customer"]
+    for satellite_name, driving_keys in driving_keys_by_table.items():
+        satellite = tables_by_name[satellite_name]
+        assert isinstance(satellite, EffectivitySatellite)
+        assert satellite.driving_keys == driving_keys
+
+    assert {table.name for table in model.hubs} == {
+        "h_customer",
+        "h_customer_role_playing",
+        "h_order",
+    }
+    assert {table.name for table in model.links} == {
+        "l_order_customer",
+        "l_order_customer_role_playing",
+    }
+    assert tables_by_name["hs_customer"].parent_table is tables_by_name["h_customer"]
+    assert model.satellites_by_parent["l_order_customer"] == [
+        tables_by_name["ls_order_customer_eff"]
+    ]
+    assert model.hubs_by_link["l_order_customer_role_playing"] == [
+        tables_by_name["h_order"],
+        tables_by_name["h_customer_role_playing"],
+    ]
+    assert {link.name for link in model.links_by_hub["h_order"]} == {
+        "l_order_customer",
+        "l_order_customer_role_playing",
+    }
+
+    assert model_discovery.model is model
+    assert len(model_discovery.database_connection.executed_statements) == 1
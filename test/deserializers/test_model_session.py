@@ -0,0 +1,54 @@
+"""Unit tests for ModelSession."""
+
+from typing import Dict, List
+
+from diepvries.deserializers.model_session import ModelSession
+from diepvries.driving_key_field import DrivingKeyField
+from diepvries.effectivity_satellite import EffectivitySatellite
+from diepvries.field import Field
+from diepvries.role_playing_hub import RolePlayingHub
+from diepvries.satellite import Satellite
+
+
+def test_deserialize(
+    model_session: ModelSession,
+    target_tables: List[str],
+    driving_keys: List[DrivingKeyField],
+    role_playing_hubs: Dict[str, str],
+    fields: Dict[str, List[Field]],
+):
+    """Test `ModelSession.deserialize` method.
+
+    Metadata must be fetched only once, and tables must be shared between
+    deserializations with the same configuration.
+    """
+    deserialized_target_tables = model_session.deserialize(
+        target_tables=target_tables,
+        driving_keys=driving_keys,
+        role_playing_hubs=role_playing_hubs,
+    )
+    assert [table.name for table in deserialized_target_tables] == target_tables
+    for table in deserialized_target_tables:
+        assert table.fields == fields[table.name]
+    tables_by_name = {table.name: table for table in deserialized_target_tables}
+    role_playing_hub = tables_by_name["h_customer_role_playing"]
+    assert isinstance(role_playing_hub, RolePlayingHub)
+    assert role_playing_hub.parent_table is tables_by_name["h_customer"]
+
+    other_deserialized_target_tables = model_session.deserialize(
+        target_tables=["h_customer", "hs_customer", "ls_order_customer_eff"]
+    )
+    other_tables_by_name = {
+        table.name: table for table in other_deserialized_target_tables
+    }
+    # Same configuration: shared tables.
+    assert other_tables_by_name["h_customer"] is tables_by_name["h_customer"]
+    assert other_tables_by_name["hs_customer"] is tables_by_name["hs_customer"]
+    # No driving keys: a regular satellite instead of an effectivity satellite.
+    assert isinstance(tables_by_name["ls_order_customer_eff"], EffectivitySatellite)
+    assert not isinstance(
+        other_tables_by_name["ls_order_customer_eff"], EffectivitySatellite
+    )
+    assert isinstance(other_tables_by_name["ls_order_customer_eff"], Satellite)
+
+    assert len(model_session.database_connection.executed_statements) == 1
@@ -0,0 +1,116 @@
+"""Unit tests for binary model snapshots."""
+
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from diepvries.data_vault_load import DataVaultLoad
+from diepvries.deserializers.file_deserializer import FileDeserializer
+from diepvries.deserializers.model_snapshot import (
+    SNAPSHOT_FORMAT_VERSION,
+    SNAPSHOT_MAGIC,
+    dump_model_snapshot,
+    load_model_snapshot,
+)
+from diepvries.driving_key_field import DrivingKeyField
+from diepvries.effectivity_satellite import EffectivitySatellite
+from diepvries.field import Field
+from diepvries.role_playing_hub import RolePlayingHub
+from diepvries.table import DataVaultTable
+
+from .test_snowflake_deserializer import compare_tables
+
+
+def test_model_snapshot(
+    file_deserializer: FileDeserializer,
+    process_configuration: Dict[str, str],
+    extract_start_timestamp: datetime,
+    tmp_path: Path,
+):
+    """Test that a model loaded from a snapshot is equivalent to the dumped one."""
+    snapshot_path = tmp_path / "model.snapshot"
+    deserialized_target_tables = file_deserializer.deserialized_target_tables
+    dump_model_snapshot(deserialized_target_tables, snapshot_path)
+
+    loaded_target_tables = load_model_snapshot(snapshot_path)
+
+    assert len(loaded_target_tables) == len(deserialized_target_tables)
+    for loaded_table, expected_table in zip(
+        loaded_target_tables, deserialized_target_tables
+    ):
+        compare_tables(loaded_table, expected_table)
+        if isinstance(expected_table, EffectivitySatellite):
+            assert loaded_table.driving_keys == expected_table.driving_keys
+        if isinstance(expected_table, RolePlayingHub):
+            # Parent tables are resolved to the instances in target tables.
+            assert loaded_table.parent_table in loaded_target_tables
+            compare_tables(loaded_table.parent_table, expected_table.parent_table)
+
+    # Both models must produce the same SQL.
+    data_vault_load_configuration = {
+        "extract_schema": process_configuration["extract_schema"],
+        "extract_table": process_configuration["extract_table"],
+        "staging_schema": process_configuration["staging_schema"],
+        "staging_table": process_configuration["staging_table"],
+        "extract_start_timestamp": extract_start_timestamp,
+        "source": process_configuration["source"],
+    }
+    expected_load = DataVaultLoad(
+        **data_vault_load_configuration, target_tables=deserialized_target_tables
+    )
+    loaded_load = DataVaultLoad(
+        **data_vault_load_configuration, target_tables=loaded_target_tables
+    )
+    assert list(loaded_load.sql_load_script) == list(expected_load.sql_load_script)
+
+
+def test_model_snapshot_without_validation(
+    file_deserializer: FileDeserializer,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test that loading a snapshot does not instantiate nor validate tables again."""
+    snapshot_path = tmp_path / "model.snapshot"
+    deserialized_target_tables = file_deserializer.deserialized_target_tables
+    dump_model_snapshot(deserialized_target_tables, snapshot_path)
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("Snapshot validated again")
+
+    monkeypatch.setattr(Field, "__init__", fail)
+    monkeypatch.setattr(DrivingKeyField, "__init__", fail)
+    monkeypatch.setattr(DrivingKeyField, "_validate", fail)
+    monkeypatch.setattr(DataVaultTable, "__init__", fail)
+    for table_type in {type(table) for table in deserialized_target_tables}:
+        monkeypatch.setattr(table_type, "_validate", fail)
+
+    loaded_target_tables = load_model_snapshot(snapshot_path)
+
+    assert len(loaded_target_tables) == len(deserialized_target_tables)
+    for loaded_table, expected_table in zip(
+        loaded_target_tables, deserialized_target_tables
+    ):
+        compare_tables(loaded_table, expected_table)
+
+
+def test_model_snapshot_version_mismatch(
+    file_deserializer: FileDeserializer, tmp_path: Path
+):
+    """Test that snapshots written with another format version are rejected."""
+    snapshot_path = tmp_path / "model.snapshot"
+    dump_model_snapshot(file_deserializer.deserialized_target_tables, snapshot_path)
+    snapshot = snapshot_path.read_bytes()
+    header = struct.pack(
+        f">{len(SNAPSHOT_MAGIC)}sH", SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION + 1
+    )
+    snapshot_path.write_bytes(header + snapshot[len(header) :])
+
+    with pytest.raises(ValueError, match="format version"):
+        load_model_snapshot(snapshot_path)
+
+    snapshot_path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError, match="Not a model snapshot"):
+        load_model_snapshot(snapshot_path)
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, PropertyMock
 import pytest
 from snowflake.connector.cursor import SnowflakeCursor
 
+from diepvries.connection_pool import ConnectionPool
 from diepvries.deserializers.snowflake_deserializer import (
     DatabaseConfiguration,
     SnowflakeDeserializer,
@@ -16,6 +17,7 @@ from diepvries.effectivity_satellite import EffectivitySatellite
 from diepvries.field import Field
 from diepvries.hub import Hub
 from diepvries.link import Link
+from diepvries.replay_connection import RecordedQuery, ReplayConnection
 from diepvries.role_playing_hub import RolePlayingHub
 from diepvries.satellite import Satellite
 from diepvries.table import Table
@@ -132,7 +134,11 @@ def test_fields(
     cursor = snowflake_deserializer.database_connection.cursor
     cursor.return_value = MagicMock(SnowflakeCursor)
     cursor.return_value.__enter__().__iter__.return_value = iter(fields_metadata)
-    calculated_fields = snowflake_deserializer._fields
+    with mock.patch.object(
+        SnowflakeDeserializer, "_fetch_last_altered", return_value={}
+    ) as fetch_last_altered:
+        calculated_fields = snowflake_deserializer._fields
+    fetch_last_altered.assert_called_once_with()
 
     # Check if metadata query was called.
     cursor.return_value.__enter__().execute.assert_called_once_with(fields_metadata_sql)
@@ -208,3 +214,185 @@ def test_database_configuration_with_password_invalid_input():
             warehouse="some_warehouse",
             account="some_account",
         )
+
+
+def test_refresh(
+    snowflake_deserializer: SnowflakeDeserializer,
+    fields_metadata: List[Dict[str, str]],
+):
+    """Test `SnowflakeDeserializer.refresh` method.
+
+    The metadata queries are mocked: the state of the model is recorded when its
+    metadata is fetched, and `hs_customer` is altered (with a new column) before the
+    first refresh.
+    """
+    cursor = snowflake_deserializer.database_connection.cursor
+    cursor.return_value = MagicMock(SnowflakeCursor)
+    cursor.return_value.__enter__().__iter__.return_value = iter(fields_metadata)
+
+    last_altered = {
+        table: "2019-08-06 00:00:00" for table in snowflake_deserializer.target_tables
+    }
+    hs_customer_metadata = [
+        field for field in fields_metadata if field["table_name"] == "HS_CUSTOMER"
+    ]
+    new_field_metadata = dict(hs_customer_metadata[-1], column_name="NEW_FIELD")
+    with (
+        mock.patch.object(
+            SnowflakeDeserializer,
+            "_fetch_last_altered",
+            side_effect=[
+                last_altered,
+                dict(last_altered, hs_customer="2019-08-07 00:00:00"),
+                dict(last_altered, hs_customer="2019-08-07 00:00:00"),
+            ],
+        ),
+        mock.patch.object(
+            SnowflakeDeserializer,
+            "_fetch_table_metadata",
+            return_value=hs_customer_metadata + [new_field_metadata],
+        ) as fetch_table_metadata,
+    ):
+        tables_by_name = {
+            table.name: table
+            for table in snowflake_deserializer.deserialized_target_tables
+        }
+        assert snowflake_deserializer.model_version == 0
+
+        assert snowflake_deserializer.refresh() == ["hs_customer"]
+        assert snowflake_deserializer.model_version == 1
+        fetch_table_metadata.assert_called_once_with("hs_customer")
+
+        # No changes since the last refresh.
+        assert snowflake_deserializer.refresh() == []
+        assert snowflake_deserializer.model_version == 1
+
+    for table in snowflake_deserializer.deserialized_target_tables:
+        if table.name == "hs_customer":
+            assert table is not tables_by_name[table.name]
+            assert "new_field" in table.fields_by_name
+        else:
+            assert table is tables_by_name[table.name]
+
+
+def test_refresh_dropped_table(
+    snowflake_deserializer: SnowflakeDeserializer,
+    fields_metadata: List[Dict[str, str]],
+):
+    """Test that `SnowflakeDeserializer.refresh` fails when a table was dropped."""
+    cursor = snowflake_deserializer.database_connection.cursor
+    cursor.return_value = MagicMock(SnowflakeCursor)
+    cursor.return_value.__enter__().__iter__.return_value = iter(fields_metadata)
+
+    last_altered = {
+        table: "2019-08-06 00:00:00" for table in snowflake_deserializer.target_tables
+    }
+    with mock.patch.object(
+        SnowflakeDeserializer,
+        "_fetch_last_altered",
+        side_effect=[
+            last_altered,
+            {
+                table: timestamp
+                for table, timestamp in last_altered.items()
+                if table != "hs_customer"
+            },
+        ],
+    ):
+        deserialized_target_tables = snowflake_deserializer.deserialized_target_tables
+        with pytest.raises(RuntimeError, match="hs_customer"):
+            snowflake_deserializer.refresh()
+
+    assert snowflake_deserializer.deserialized_target_tables is (
+        deserialized_target_tables
+    )
+    assert snowflake_deserializer.model_version == 0
+
+
+def test_deserialized_target_tables_memoized(
+    snowflake_deserializer: SnowflakeDeserializer,
+    target_tables: List[str],
+    fields: List[Field],
+):
+    """Test that `deserialized_target_tables` instantiates each table only once.
+
+    Role playing hubs' parent tables must be the same instances as the target tables.
+    """
+    with (
+        mock.patch.object(
+            SnowflakeDeserializer,
+            "_fields",
+            new_callable=PropertyMock,
+            return_value=fields,
+        ),
+        mock.patch.object(
+            SnowflakeDeserializer,
+            "_deserialize_table",
+            autospec=True,
+            side_effect=SnowflakeDeserializer._deserialize_table,
+        ) as deserialize_table,
+    ):
+        deserialized_target_tables = snowflake_deserializer.deserialized_target_tables
+
+        assert snowflake_deserializer.deserialized_target_tables is (
+            deserialized_target_tables
+        )
+        assert deserialize_table.call_count == len(target_tables)
+
+        tables_by_name = {table.name: table for table in deserialized_target_tables}
+        assert (
+            tables_by_name["h_customer_role_playing"].parent_table
+            is tables_by_name["h_customer"]
+        )
+
+
+def test_deserialized_target_tables_with_replay_connection(
+    target_schema: str,
+    target_tables: List[str],
+    database_configuration: DatabaseConfiguration,
+    driving_keys: List[DrivingKeyField],
+    role_playing_hubs: Dict[str, str],
+    fields_metadata: List[Dict[str, str]],
+    fields_metadata_sql: str,
+    fields: Dict[str, List[Field]],
+):
+    """Test `SnowflakeDeserializer` with a `ReplayConnection` as database connection."""
+    snowflake_deserializer = SnowflakeDeserializer(
+        target_schema=target_schema,
+        target_tables=target_tables,
+        database_configuration=database_configuration,
+        driving_keys=driving_keys,
+        role_playing_hubs=role_playing_hubs,
+        database_connection=ReplayConnection(
+            recordings=[RecordedQuery(sql=fields_metadata_sql, rows=fields_metadata)]
+        ),
+    )
+
+    for table in snowflake_deserializer.deserialized_target_tables:
+        assert table.fields == fields[table.name]
+
+
+def test_deserialized_target_tables_with_connection_pool(
+    target_schema: str,
+    target_tables: List[str],
+    database_configuration: DatabaseConfiguration,
+    fields_metadata: List[Dict[str, str]],
+    fields_metadata_sql: str,
+    fields: Dict[str, List[Field]],
+):
+    """Test `SnowflakeDeserializer` with sessions checked out from a pool."""
+    connection = ReplayConnection(
+        recordings=[RecordedQuery(sql=fields_metadata_sql, rows=fields_metadata)]
+    )
+    with ConnectionPool(lambda: connection, max_size=1) as connection_pool:
+        snowflake_deserializer = SnowflakeDeserializer(
+            target_schema=target_schema,
+            target_tables=target_tables,
+            database_configuration=database_configuration,
+            connection_pool=connection_pool,
+        )
+
+        for table in snowflake_deserializer.deserialized_target_tables:
+            assert table.fields == fields[table.name]
+        assert snowflake_deserializer.database_connection is None
+        assert connection_pool.idle_size == 1
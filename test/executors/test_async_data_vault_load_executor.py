@@ -0,0 +1,386 @@
+"""Unit tests for AsyncDataVaultLoadExecutor."""
+
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pytest
+
+from diepvries.connection_pool import ConnectionPool
+from diepvries.data_vault_load import DataVaultLoad
+from diepvries.executors.async_data_vault_load_executor import (
+    AsyncDataVaultLoadExecutor,
+    PollingConfiguration,
+)
+from diepvries.executors.data_vault_load_executor import (
+    StatementStatus,
+    split_sql_script,
+)
+from diepvries.executors.load_statement import get_query_tag_sql_statement
+from diepvries.replay_connection import (
+    RecordedQuery,
+    ReplayConnection,
+    ReplayCursor,
+    normalize_sql,
+)
+
+
+def test_execute(
+    process_configuration: Dict[str, str],
+    extract_start_timestamp: datetime,
+    data_vault_load: DataVaultLoad,
+):
+    """Assert that concurrent loads are executed with bounded concurrency.
+
+    Args:
+        process_configuration: Process configuration fixture value.
+        extract_start_timestamp: Extraction start timestamp fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    data_vault_loads = [data_vault_load] + [
+        DataVaultLoad(
+            extract_schema=process_configuration["extract_schema"],
+            extract_table=process_configuration["extract_table"],
+            staging_schema=process_configuration["staging_schema"],
+            staging_table=f"orders_{index}",
+            extract_start_timestamp=extract_start_timestamp,
+            target_tables=data_vault_load.target_tables,
+            source=process_configuration["source"],
+        )
+        for index in range(20)
+    ]
+    connections: List[ReplayConnection] = []
+
+    def connection_factory() -> ReplayConnection:
+        connections.append(ReplayConnection(recordings=[], latency=0.01, strict=False))
+        return connections[-1]
+
+    async def execute_loads():
+        async with AsyncDataVaultLoadExecutor(
+            connection_factory,
+            max_concurrency=8,
+            polling_configuration=PollingConfiguration(min_interval=0.001),
+        ) as executor:
+            return await asyncio.gather(
+                *(executor.execute(load) for load in data_vault_loads)
+            )
+
+    load_results = asyncio.run(execute_loads())
+
+    assert all(load_result.succeeded for load_result in load_results)
+    assert [load_result.staging_table for load_result in load_results] == [
+        load.staging_table.name for load in data_vault_loads
+    ]
+    assert len(connections) <= 8
+    assert all(connection.is_closed() for connection in connections)
+    assert sum(
+        len(connection.executed_statements) for connection in connections
+    ) == sum(
+        len(split_sql_script(sql_script))
+        for load in data_vault_loads
+        for sql_script in load.sql_load_script
+    )
+
+
+def test_execute_fail_fast(data_vault_load: DataVaultLoad):
+    """Assert that failed asynchronous queries are reported and stop the load.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    failing_statement = split_sql_script(
+        data_vault_load.target_tables_by_group[0][0].sql_load_statement
+    )[-1]
+    connection = ReplayConnection(
+        recordings=[RecordedQuery(sql=failing_statement, error="Some error")],
+        latency=0.01,
+        strict=False,
+    )
+
+    async def execute_load():
+        async with AsyncDataVaultLoadExecutor(
+            lambda: connection,
+            max_concurrency=1,
+            polling_configuration=PollingConfiguration(min_interval=0.001),
+        ) as executor:
+            return await executor.execute(data_vault_load)
+
+    load_result = asyncio.run(execute_load())
+
+    results_by_table = load_result.results_by_table
+    assert load_result.failed_statements == [results_by_table["h_customer"]]
+    assert results_by_table["h_customer"].error.raw_msg == "Some error"
+    assert all(
+        result.status == StatementStatus.SKIPPED
+        for table_name, result in results_by_table.items()
+        if table_name != "h_customer"
+    )
+
+
+def test_execute_client_error(data_vault_load: DataVaultLoad):
+    """Assert that errors not raised by Snowflake fail statements and skip dependents.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    failing_statement = split_sql_script(
+        data_vault_load.target_tables_by_group[0][0].sql_load_statement
+    )[-1]
+
+    class UnreachableConnection(ReplayConnection):
+        """Stand-in connection where a statement cannot be submitted."""
+
+        def submit(self, command: str) -> str:
+            """Submit a statement, failing if it is the failing statement.
+
+            Args:
+                command: SQL statement.
+
+            Returns:
+                Query ID.
+
+            Raises:
+                OSError: If the statement is the failing statement.
+            """
+            if normalize_sql(command) == normalize_sql(failing_statement):
+                raise OSError("Connection reset by peer")
+            return super().submit(command)
+
+    connection = UnreachableConnection(recordings=[], strict=False)
+
+    async def execute_load():
+        async with AsyncDataVaultLoadExecutor(
+            lambda: connection,
+            fail_fast=False,
+            polling_configuration=PollingConfiguration(min_interval=0.001),
+        ) as executor:
+            return await asyncio.wait_for(executor.execute(data_vault_load), 5)
+
+    load_result = asyncio.run(execute_load())
+
+    results_by_table = load_result.results_by_table
+    assert load_result.failed_statements == [results_by_table["h_customer"]]
+    assert isinstance(results_by_table["h_customer"].error, OSError)
+    assert results_by_table["h_order"].status == StatementStatus.SUCCEEDED
+    assert results_by_table["hs_customer"].status == StatementStatus.SKIPPED
+
+
+def test_execute_query_tags(data_vault_load: DataVaultLoad):
+    """Assert that queries are tagged and that their timings are collected.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = ReplayConnection(recordings=[], latency=0.01, strict=False)
+
+    async def execute_load():
+        async with AsyncDataVaultLoadExecutor(
+            lambda: connection,
+            max_concurrency=1,
+            polling_configuration=PollingConfiguration(min_interval=0.001),
+            tag_queries=True,
+        ) as executor:
+            return await executor.execute(data_vault_load)
+
+    load_result = asyncio.run(execute_load())
+
+    assert load_result.succeeded
+    for result in load_result.statement_results:
+        statements = split_sql_script(result.statement.sql)
+        index = connection.executed_statements.index(statements[0])
+        assert connection.executed_statements[index - 1] == (
+            get_query_tag_sql_statement([result.statement])
+        )
+        assert result.timings.queued_time == 0
+        assert result.timings.execution_time >= 0.01 * len(statements)
+        assert result.timings.total_time <= result.elapsed_time
+
+
+def test_execute_row_counts(data_vault_load: DataVaultLoad):
+    """Assert that the row counts returned by MERGE statements are collected.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    h_customer_merge = split_sql_script(
+        data_vault_load.target_tables_by_group[0][0].sql_load_statement
+    )[-1]
+    connection = ReplayConnection(
+        recordings=[
+            RecordedQuery(sql=h_customer_merge, rows=[{"number of rows inserted": 3}])
+        ],
+        strict=False,
+    )
+
+    async def execute_load():
+        async with AsyncDataVaultLoadExecutor(lambda: connection) as executor:
+            return await executor.execute(data_vault_load)
+
+    load_result = asyncio.run(execute_load())
+
+    assert load_result.row_counts_by_table["h_customer"].rows_inserted == 3
+    assert load_result.changed_tables == ["h_customer"]
+
+
+def test_execute_shared_connection_pool(
+    process_configuration: Dict[str, str],
+    extract_start_timestamp: datetime,
+    data_vault_load: DataVaultLoad,
+):
+    """Assert that concurrency is bounded by the size of a shared connection pool.
+
+    Connector calls must run in the threads of the executor, and no more sessions
+    than the pool holds must be waited for.
+
+    Args:
+        process_configuration: Process configuration fixture value.
+        extract_start_timestamp: Extraction start timestamp fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    data_vault_loads = [
+        DataVaultLoad(
+            extract_schema=process_configuration["extract_schema"],
+            extract_table=process_configuration["extract_table"],
+            staging_schema=process_configuration["staging_schema"],
+            staging_table=f"orders_{index}",
+            extract_start_timestamp=extract_start_timestamp,
+            target_tables=data_vault_load.target_tables,
+            source=process_configuration["source"],
+        )
+        for index in range(4)
+    ]
+    thread_names = set()
+
+    class ThreadRecordingConnection(ReplayConnection):
+        """Stand-in connection that records the threads submitting statements."""
+
+        def submit(self, command: str) -> str:
+            """Submit a statement, recording the current thread.
+
+            Args:
+                command: SQL statement.
+
+            Returns:
+                Query ID.
+            """
+            thread_names.add(threading.current_thread().name)
+            return super().submit(command)
+
+    class CountingConnectionPool(ConnectionPool):
+        """Connection pool that counts the sessions being checked out."""
+
+        waiting = 0
+        max_waiting = 0
+
+        def acquire(
+            self, warehouse: str = None, timeout: Optional[float] = None
+        ) -> ReplayConnection:
+            """Check out a session, counting concurrent checkouts.
+
+            Checkouts time out, so that sessions never returned (e.g. when all
+            threads wait for a session) fail the load instead of blocking it.
+
+            Args:
+                warehouse: Warehouse of the session.
+                timeout: Maximum time (in seconds) to wait for a session.
+
+            Returns:
+                Session.
+            """
+            with lock:
+                self.waiting += 1
+                self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                return super().acquire(warehouse, timeout or 5)
+            finally:
+                with lock:
+                    self.waiting -= 1
+
+    lock = threading.Lock()
+    connection_pool = CountingConnectionPool(
+        lambda: ThreadRecordingConnection(recordings=[], latency=0.01, strict=False),
+        max_size=2,
+    )
+
+    async def execute_loads():
+        async with AsyncDataVaultLoadExecutor(
+            max_concurrency=8,
+            polling_configuration=PollingConfiguration(min_interval=0.001),
+            connection_pool=connection_pool,
+        ) as executor:
+            return await asyncio.gather(
+                *(executor.execute(load) for load in data_vault_loads)
+            )
+
+    load_results = asyncio.run(execute_loads())
+    connection_pool.close()
+
+    assert all(load_result.succeeded for load_result in load_results)
+    assert connection_pool.max_waiting <= 2
+    assert thread_names
+    assert all(
+        thread_name.startswith(AsyncDataVaultLoadExecutor.__name__)
+        for thread_name in thread_names
+    )
+
+
+def test_execute_closes_cursors(data_vault_load: DataVaultLoad):
+    """Assert that the cursor of each statement is closed, even when it fails.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    failing_statement = split_sql_script(
+        data_vault_load.target_tables_by_group[0][0].sql_load_statement
+    )[-1]
+    cursors: List[ReplayCursor] = []
+
+    class ClosingCursor(ReplayCursor):
+        """Stand-in cursor that records whether it was closed."""
+
+        closed = False
+
+        def close(self):
+            """Close the cursor."""
+            self.closed = True
+
+    class CursorRecordingConnection(ReplayConnection):
+        """Stand-in connection that records the cursors it creates."""
+
+        def cursor(self, _cursor_class=None) -> ReplayCursor:
+            """Create a cursor, recording it.
+
+            Args:
+                _cursor_class: Unused, class of the cursor.
+
+            Returns:
+                Cursor.
+            """
+            cursors.append(ClosingCursor(self))
+            return cursors[-1]
+
+    connection = CursorRecordingConnection(
+        recordings=[RecordedQuery(sql=failing_statement, error="Some error")],
+        strict=False,
+    )
+
+    async def execute_load():
+        async with AsyncDataVaultLoadExecutor(
+            lambda: connection,
+            fail_fast=False,
+            polling_configuration=PollingConfiguration(min_interval=0.001),
+        ) as executor:
+            return await executor.execute(data_vault_load)
+
+    load_result = asyncio.run(execute_load())
+
+    assert load_result.failed_statements
+    assert cursors
+    assert all(cursor.closed for cursor in cursors)
+
+
+def test_invalid_polling_configuration():
+    """Assert that invalid polling intervals are rejected."""
+    with pytest.raises(ValueError):
+        PollingConfiguration(min_interval=1.0, max_interval=0.5)
@@ -0,0 +1,168 @@
+"""Unit tests for checkpoint stores and resumable loads."""
+
+from pathlib import Path
+
+from diepvries.data_vault_load import DataVaultLoad
+from diepvries.executors.checkpoint_store import (
+    CHECKPOINTS_DDL_SQL_FILE_PATH,
+    CHECKPOINTS_DELETE_SQL_FILE_PATH,
+    CHECKPOINTS_INSERT_SQL_FILE_PATH,
+    CHECKPOINTS_SELECT_SQL_FILE_PATH,
+    FileCheckpointStore,
+    SnowflakeCheckpointStore,
+    get_checkpoint_key,
+)
+from diepvries.executors.data_vault_load_executor import DataVaultLoadExecutor
+from diepvries.executors.load_statement import (
+    LoadStatement,
+    StatementStatus,
+    get_load_statements,
+)
+from diepvries.replay_connection import RecordedQuery, ReplayConnection
+from diepvries.template_sql.sql_formulas import split_sql_script
+
+
+def test_fingerprint():
+    """Assert that fingerprints only depend on the normalized SQL of a statement."""
+    load_statement = LoadStatement(group=1, sql="SET a = 1;\nMERGE INTO b;")
+    assert (
+        load_statement.fingerprint
+        == LoadStatement(group=2, sql="SET a  =  1;  MERGE INTO b;").fingerprint
+    )
+    assert (
+        load_statement.fingerprint
+        != LoadStatement(group=1, sql="SET a = 2;\nMERGE INTO b;").fingerprint
+    )
+
+
+def test_file_checkpoint_store(tmp_path: Path):
+    """Assert that completed statements are persisted by staging table.
+
+    Args:
+        tmp_path: Temporary directory fixture value.
+    """
+    file_path = tmp_path / "checkpoints.json"
+    checkpoint_store = FileCheckpointStore(file_path)
+    assert checkpoint_store.get_completed("orders_20190806_000000") == set()
+
+    checkpoint_store.mark_completed("orders_20190806_000000", "fingerprint_1")
+    checkpoint_store.mark_completed("orders_20190806_000000", "fingerprint_2")
+    checkpoint_store.mark_completed("orders_20190807_000000", "fingerprint_1")
+
+    other_checkpoint_store = FileCheckpointStore(file_path)
+    assert other_checkpoint_store.get_completed("orders_20190806_000000") == {
+        "fingerprint_1",
+        "fingerprint_2",
+    }
+    other_checkpoint_store.clear("orders_20190806_000000")
+    assert checkpoint_store.get_completed("orders_20190806_000000") == set()
+    assert checkpoint_store.get_completed("orders_20190807_000000") == {"fingerprint_1"}
+
+
+def test_snowflake_checkpoint_store():
+    """Assert that completed statements are recorded in a control table."""
+    connection = ReplayConnection(
+        recordings=[
+            RecordedQuery(
+                sql=CHECKPOINTS_SELECT_SQL_FILE_PATH.read_text().format(
+                    checkpoint_table="dv_stg.dv_load_checkpoints"
+                ),
+                rows=[("fingerprint_1",)],
+            )
+        ],
+        strict=False,
+    )
+    checkpoint_store = SnowflakeCheckpointStore(
+        connection, "dv_stg.dv_load_checkpoints"
+    )
+    assert checkpoint_store.get_completed("orders_20190806_000000") == {"fingerprint_1"}
+    checkpoint_store.mark_completed("orders_20190806_000000", "fingerprint_2")
+    checkpoint_store.clear("orders_20190806_000000")
+
+    assert connection.executed_statements == [
+        sql_file_path.read_text().format(checkpoint_table="dv_stg.dv_load_checkpoints")
+        for sql_file_path in (
+            CHECKPOINTS_DDL_SQL_FILE_PATH,
+            CHECKPOINTS_SELECT_SQL_FILE_PATH,
+            CHECKPOINTS_INSERT_SQL_FILE_PATH,
+            CHECKPOINTS_DELETE_SQL_FILE_PATH,
+        )
+    ]
+
+
+def test_resume_load(tmp_path: Path, data_vault_load: DataVaultLoad):
+    """Assert that a load executed again skips the statements that completed.
+
+    Args:
+        tmp_path: Temporary directory fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    checkpoint_store = FileCheckpointStore(tmp_path / "checkpoints.json")
+    tables_by_name = {table.name: table for table in data_vault_load.target_tables}
+    hs_customer_statements = split_sql_script(
+        tables_by_name["hs_customer"].sql_load_statement
+    )
+    failing_connection = ReplayConnection(
+        recordings=[RecordedQuery(sql=hs_customer_statements[-1], error="Some error")],
+        strict=False,
+    )
+    with DataVaultLoadExecutor(
+        lambda: failing_connection, fail_fast=False, checkpoint_store=checkpoint_store
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+    assert not load_result.succeeded
+
+    connection = ReplayConnection(recordings=[], strict=False)
+    with DataVaultLoadExecutor(
+        lambda: connection, checkpoint_store=checkpoint_store
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    assert [result.resumed for result in load_result.statement_results] == [
+        statement.target_table != "hs_customer"
+        for statements in get_load_statements(data_vault_load)
+        for statement in statements
+    ]
+    # Only the failed statement ran again, reusing the staging table.
+    assert connection.executed_statements == hs_customer_statements
+    assert all(
+        result.status == StatementStatus.SUCCEEDED
+        for result in load_result.statement_results
+    )
+    # Checkpoints are removed once the load succeeded.
+    assert checkpoint_store.get_completed(get_checkpoint_key(data_vault_load)) == set()
+
+
+def test_checkpoints_read_once_per_load(data_vault_load: DataVaultLoad):
+    """Assert that checkpoints are read once per load, keyed by qualified name.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    checkpoint_connection = ReplayConnection(recordings=[], strict=False)
+    checkpoint_store = SnowflakeCheckpointStore(
+        checkpoint_connection, "dv_stg.dv_load_checkpoints"
+    )
+    connection = ReplayConnection(recordings=[], strict=False)
+    with DataVaultLoadExecutor(
+        lambda: connection, checkpoint_store=checkpoint_store
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    select_sql, insert_sql, delete_sql = (
+        sql_file_path.read_text().format(checkpoint_table="dv_stg.dv_load_checkpoints")
+        for sql_file_path in (
+            CHECKPOINTS_SELECT_SQL_FILE_PATH,
+            CHECKPOINTS_INSERT_SQL_FILE_PATH,
+            CHECKPOINTS_DELETE_SQL_FILE_PATH,
+        )
+    )
+    executed_statements = checkpoint_connection.executed_statements
+    assert executed_statements.count(select_sql) == 1
+    assert executed_statements.count(insert_sql) == len(load_result.statement_results)
+    assert executed_statements.count(delete_sql) == 1
+    assert get_checkpoint_key(data_vault_load) == (
+        f"{data_vault_load.staging_table.schema}.{data_vault_load.staging_table.name}"
+    )
@@ -0,0 +1,262 @@
+"""Unit tests for ConcurrencyController."""
+
+import dataclasses
+import threading
+import uuid
+from typing import List
+
+import pytest
+
+from diepvries.data_vault_load import DataVaultLoad
+from diepvries.executors.concurrency_controller import (
+    QUERY_HISTORY_RESULT_LIMIT,
+    QUERY_TIMINGS_SQL_FILE_PATH,
+    ConcurrencyController,
+    QueryTimings,
+    get_query_history_timings,
+)
+from diepvries.executors.data_vault_load_executor import DataVaultLoadExecutor
+from diepvries.replay_connection import RecordedQuery, ReplayConnection
+
+# pylint: disable=protected-access
+
+
+class ConcurrencyTracker:
+    """Stand-in for the query history, where statements queue above a concurrency.
+
+    Queued times are computed from the number of statements running concurrently,
+    as seen by connections created with `connection_factory`.
+    """
+
+    def __init__(self, capacity: int):
+        """Instantiate a ConcurrencyTracker.
+
+        Args:
+            capacity: Number of statements that can run concurrently without queuing.
+        """
+        self.capacity = capacity
+        self.running = 0
+        self.max_running = 0
+        self.queued_query_ids = set()
+        self._lock = threading.Lock()
+
+    def connection_factory(self) -> ReplayConnection:
+        """Create a connection whose statements are tracked.
+
+        Returns:
+            ReplayConnection instance.
+        """
+        tracker = self
+
+        class TrackedConnection(ReplayConnection):
+            """Stand-in connection tracking running statements."""
+
+            def replay(self, command: str) -> RecordedQuery:
+                """Replay a statement, tracking concurrency.
+
+                Args:
+                    command: SQL statement.
+
+                Returns:
+                    Recorded query.
+                """
+                with tracker._lock:
+                    tracker.running += 1
+                    tracker.max_running = max(tracker.max_running, tracker.running)
+                    queued = tracker.running > tracker.capacity
+                try:
+                    recorded_query = dataclasses.replace(
+                        super().replay(command), query_id=str(uuid.uuid4())
+                    )
+                finally:
+                    with tracker._lock:
+                        tracker.running -= 1
+                if queued:
+                    tracker.queued_query_ids.add(recorded_query.query_id)
+                return recorded_query
+
+        return TrackedConnection(recordings=[], latency=0.005, strict=False)
+
+    def get_timings(
+        self, _connection: ReplayConnection, query_ids: List[str]
+    ) -> List[QueryTimings]:
+        """Get the timings of queries.
+
+        Args:
+            _connection: Unused, connection where the queries ran.
+            query_ids: Query IDs.
+
+        Returns:
+            Query timings (queued queries waited as long as they executed).
+        """
+        return [
+            QueryTimings(
+                query_id=query_id,
+                queued_time=float(query_id in self.queued_query_ids),
+                execution_time=1.0,
+            )
+            for query_id in query_ids
+        ]
+
+
+def test_update():
+    """Assert that the limit increases additively and decreases multiplicatively."""
+    controller = ConcurrencyController(max_limit=4)
+    assert controller.limit == 1
+
+    controller.update(queued_time=0.0, execution_time=1.0)
+    assert controller.limit == 2
+    # One increase per window of `limit` statements.
+    controller.update(queued_time=0.0, execution_time=1.0)
+    assert controller.limit == 2
+    controller.update(queued_time=0.0, execution_time=1.0)
+    assert controller.limit == 3
+    for _ in range(10):
+        controller.update(queued_time=0.0, execution_time=1.0)
+    assert controller.limit == 4
+
+    controller.update(queued_time=1.0, execution_time=1.0)
+    assert controller.limit == 2
+    # At most one decrease per window.
+    controller.update(queued_time=1.0, execution_time=1.0)
+    assert controller.limit == 2
+    controller.update(queued_time=1.0, execution_time=1.0)
+    assert controller.limit == 1
+    controller.update(queued_time=1.0, execution_time=1.0)
+    assert controller.limit == 1
+
+
+@pytest.mark.parametrize("capacity", [1, 4])
+def test_execute_with_concurrency_controller(
+    data_vault_load: DataVaultLoad, capacity: int
+):
+    """Assert that the concurrency limit tracks the warehouse capacity.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+        capacity: Number of statements that can run without queuing.
+    """
+    max_limit = 4
+    tracker = ConcurrencyTracker(capacity)
+    controller = ConcurrencyController(
+        max_limit=max_limit, timings_provider=tracker.get_timings
+    )
+    with DataVaultLoadExecutor(
+        tracker.connection_factory,
+        max_concurrency=max_limit,
+        concurrency_controller=controller,
+    ) as executor:
+        for _ in range(3):
+            assert executor.execute(data_vault_load).succeeded
+
+    if capacity == 1:
+        # Queuing keeps the concurrency limit below max_limit.
+        assert tracker.max_running < max_limit
+    else:
+        assert not tracker.queued_query_ids
+        assert controller.limit == max_limit
+
+
+def test_observe_without_slot(data_vault_load: DataVaultLoad):
+    """Assert that timings are observed once the statement released its slot.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    running_while_observed: List[int] = []
+
+    def get_timings(
+        _connection: ReplayConnection, query_ids: List[str]
+    ) -> List[QueryTimings]:
+        """Get the timings of queries, tracking the statements holding a slot.
+
+        Args:
+            _connection: Unused, connection where the queries ran.
+            query_ids: Query IDs.
+
+        Returns:
+            Query timings.
+        """
+        running_while_observed.append(controller._running)
+        return [QueryTimings(query_id, 0.0, 1.0) for query_id in query_ids]
+
+    controller = ConcurrencyController(max_limit=1, timings_provider=get_timings)
+    connection = ReplayConnection(recordings=[], strict=False)
+    with DataVaultLoadExecutor(
+        lambda: connection, max_concurrency=1, concurrency_controller=controller
+    ) as executor:
+        assert executor.execute(data_vault_load).succeeded
+
+    assert running_while_observed
+    assert set(running_while_observed) == {0}
+
+
+def test_observe_failure(data_vault_load: DataVaultLoad):
+    """Assert that failing to get the timings of statements does not fail them.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+
+    def get_timings(
+        _connection: ReplayConnection, _query_ids: List[str]
+    ) -> List[QueryTimings]:
+        """Fail to get the timings of queries, as with an unexpected query history.
+
+        Args:
+            _connection: Unused, connection where the queries ran.
+            _query_ids: Unused, query IDs.
+
+        Raises:
+            KeyError: Always.
+        """
+        raise KeyError("QUEUED_OVERLOAD_TIME")
+
+    controller = ConcurrencyController(max_limit=2, timings_provider=get_timings)
+    connection = ReplayConnection(recordings=[], strict=False)
+    with DataVaultLoadExecutor(
+        lambda: connection, concurrency_controller=controller
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    assert controller.limit == 1
+
+
+def test_get_query_history_timings():
+    """Assert that timings are read from the query history, in seconds."""
+    query_timings_sql = QUERY_TIMINGS_SQL_FILE_PATH.read_text().format(
+        database="dv",
+        result_limit=QUERY_HISTORY_RESULT_LIMIT,
+        query_ids="'query_1', 'query_2'",
+    )
+    connection = ReplayConnection(
+        recordings=[
+            RecordedQuery(
+                sql=query_timings_sql,
+                rows=[
+                    {
+                        "QUERY_ID": "query_1",
+                        "QUEUED_OVERLOAD_TIME": 1500,
+                        "EXECUTION_TIME": 3000,
+                    }
+                ],
+            )
+        ]
+    )
+
+    # Without query IDs, the query history is not queried.
+    assert get_query_history_timings(connection, [], "dv") == []
+    assert get_query_history_timings(connection, ["query_1", "query_2"], "dv") == [
+        QueryTimings(query_id="query_1", queued_time=1.5, execution_time=3.0)
+    ]
+
+
+def test_invalid_limits():
+    """Assert that invalid concurrency limits are rejected."""
+    with pytest.raises(ValueError):
+        ConcurrencyController(max_limit=0)
+    with pytest.raises(ValueError):
+        ConcurrencyController(max_limit=2, min_limit=3)
+    with pytest.raises(ValueError):
+        ConcurrencyController(max_limit=2, decrease_factor=1)
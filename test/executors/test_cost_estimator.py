@@ -0,0 +1,120 @@
+"""Unit tests for CostEstimator."""
+
+import json
+from typing import Any, Dict
+
+from diepvries import StagingTableKind
+from diepvries.data_vault_load import DataVaultLoad
+from diepvries.executors.cost_estimator import EXPLAIN_SQL_TEMPLATE, CostEstimator
+from diepvries.replay_connection import RecordedQuery, ReplayConnection
+from diepvries.table import DataVaultTable
+from diepvries.template_sql.sql_formulas import split_sql_script
+
+
+def get_query_plan(
+    target_table: DataVaultTable, partitions_assigned: int, bytes_assigned: int
+) -> Dict[str, Any]:
+    """Build the query plan of a MERGE statement.
+
+    Args:
+        target_table: Loaded table.
+        partitions_assigned: Number of partitions of the target table (out of 10)
+            assigned to the scan.
+        bytes_assigned: Number of bytes assigned to the statement.
+
+    Returns:
+        Query plan, as returned by `EXPLAIN USING JSON`.
+    """
+    return {
+        "GlobalStats": {
+            "partitionsTotal": 11,
+            "partitionsAssigned": partitions_assigned + 1,
+            "bytesAssigned": bytes_assigned,
+        },
+        "Operations": [
+            [
+                {"id": 0, "operation": "Result"},
+                {
+                    "id": 1,
+                    "operation": "TableScan",
+                    "objects": [
+                        f"DV_DB.{target_table.schema}.{target_table.name}".upper()
+                    ],
+                    "partitionsAssigned": partitions_assigned,
+                    "partitionsTotal": 10,
+                    "bytesAssigned": bytes_assigned - 100,
+                },
+                {
+                    "id": 2,
+                    "operation": "TableScan",
+                    "objects": ["DV_DB.DV_STG.ORDERS_20190806_000000"],
+                    "partitionsAssigned": 1,
+                    "partitionsTotal": 1,
+                    "bytesAssigned": 100,
+                },
+            ]
+        ],
+    }
+
+
+def test_estimate(data_vault_load: DataVaultLoad):
+    """Assert that statements are ranked by cost and that pruning issues are flagged.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    tables_by_name = {table.name: table for table in data_vault_load.target_tables}
+    recordings = [
+        RecordedQuery(
+            sql=EXPLAIN_SQL_TEMPLATE.format(
+                statement=split_sql_script(
+                    tables_by_name[table_name].sql_load_statement
+                )[-1]
+            ),
+            rows=[
+                (
+                    json.dumps(
+                        get_query_plan(
+                            tables_by_name[table_name],
+                            partitions_assigned,
+                            bytes_assigned,
+                        )
+                    ),
+                )
+            ],
+        )
+        for table_name, partitions_assigned, bytes_assigned in [
+            ("h_customer", 2, 1000),
+            ("hs_customer", 10, 5000),
+        ]
+    ]
+    connection = ReplayConnection(recordings=recordings, strict=False)
+
+    cost_estimates = CostEstimator(connection).estimate(data_vault_load)
+
+    assert [cost_estimate.target_table for cost_estimate in cost_estimates[:2]] == [
+        "hs_customer",
+        "h_customer",
+    ]
+    hs_customer_estimate, h_customer_estimate = cost_estimates[:2]
+    assert hs_customer_estimate.bytes_assigned == 5000
+    assert hs_customer_estimate.partitions_assigned == 11
+    assert hs_customer_estimate.pruning_ineffective
+    assert h_customer_estimate.table_scans[0].partitions_assigned == 2
+    assert not h_customer_estimate.pruning_ineffective
+    assert all(
+        cost_estimate.bytes_assigned == 0 and not cost_estimate.pruning_ineffective
+        for cost_estimate in cost_estimates[2:]
+    )
+
+    # The staging table is temporary and no MERGE statement is executed.
+    assert connection.executed_statements[0] == (
+        data_vault_load.staging_create_sql_statement.replace(
+            "CREATE OR REPLACE TABLE", "CREATE OR REPLACE TEMPORARY TABLE", 1
+        )
+    )
+    assert data_vault_load.staging_table.kind == StagingTableKind.PERMANENT
+    assert not any(
+        statement.lstrip().startswith("MERGE")
+        for statement in connection.executed_statements
+    )
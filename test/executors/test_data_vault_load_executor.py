@@ -0,0 +1,727 @@
+"""Unit tests for DataVaultLoadExecutor."""
+
+import json
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from diepvries import StagingTableKind, TableType
+from diepvries.connection_pool import ConnectionPool
+from diepvries.data_vault_load import DataVaultLoad
+from diepvries.executors.checkpoint_store import (
+    FileCheckpointStore,
+    get_checkpoint_key,
+)
+from diepvries.executors.data_vault_load_executor import (
+    Batching,
+    DataVaultLoadExecutor,
+    Scheduling,
+    StatementStatus,
+    get_load_statements,
+    split_sql_script,
+)
+from diepvries.executors.load_statement import (
+    QUERY_TAG_MAX_LENGTH,
+    LoadStatement,
+    RowCounts,
+    get_query_tag,
+    get_query_tag_sql_statement,
+)
+from diepvries.executors.statement_execution import (
+    CHILD_QUERIES_RESULT_LIMIT,
+    CHILD_QUERIES_SQL_FILE_PATH,
+    get_multi_statement_sql,
+)
+from diepvries.replay_connection import (
+    RecordedQuery,
+    ReplayConnection,
+    ReplayCursor,
+    normalize_sql,
+)
+
+
+def failing_connection(sql_script: str) -> ReplayConnection:
+    """Build a stand-in connection where the last statement of a script fails.
+
+    Args:
+        sql_script: SQL script that should fail.
+
+    Returns:
+        ReplayConnection instance (all other statements succeed).
+    """
+    return ReplayConnection(
+        recordings=[
+            RecordedQuery(sql=split_sql_script(sql_script)[-1], error="Some error")
+        ],
+        strict=False,
+    )
+
+
+class BlockingConnection(ReplayConnection):
+    """Stand-in connection where a statement waits until another one is executed."""
+
+    def __init__(self, blocked_sql: str, unblocking_sql: str):
+        """Instantiate a BlockingConnection.
+
+        Args:
+            blocked_sql: Statement that waits.
+            unblocking_sql: Statement that must be executed before the blocked one
+                finishes.
+        """
+        super().__init__(recordings=[], strict=False)
+        self.blocked_sql = normalize_sql(blocked_sql)
+        self.unblocking_sql = normalize_sql(unblocking_sql)
+        self.unblocked = threading.Event()
+
+    def replay(self, command: str) -> RecordedQuery:
+        """Replay a statement, waiting if it is the blocked statement.
+
+        Args:
+            command: SQL statement.
+
+        Returns:
+            Recorded query.
+        """
+        if normalize_sql(command) == self.unblocking_sql:
+            self.unblocked.set()
+        if normalize_sql(command) == self.blocked_sql:
+            assert self.unblocked.wait(timeout=5)
+        return super().replay(command)
+
+
+def test_execute(data_vault_load: DataVaultLoad):
+    """Assert that groups are executed in order, with bounded concurrency.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connections: List[ReplayConnection] = []
+
+    def connection_factory() -> ReplayConnection:
+        connections.append(ReplayConnection(recordings=[], latency=0.01, strict=False))
+        return connections[-1]
+
+    with DataVaultLoadExecutor(connection_factory, max_concurrency=2) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    assert [result.statement for result in load_result.statement_results] == [
+        statement
+        for load_statements in get_load_statements(data_vault_load)
+        for statement in load_statements
+    ]
+    assert 1 <= len(connections) <= 2
+    assert all(connection.is_closed() for connection in connections)
+
+    executed_statements = [
+        statement
+        for connection in connections
+        for statement in connection.executed_statements
+    ]
+    assert len(executed_statements) == sum(
+        len(result.query_ids) for result in load_result.statement_results
+    )
+    assert (
+        executed_statements[0]
+        == split_sql_script(data_vault_load.staging_create_sql_statement)[0]
+    )
+    # Statements for the same table run in order, in the same connection.
+    hs_customer_statements = split_sql_script(
+        load_result.results_by_table["hs_customer"].statement.sql
+    )
+    connection = next(
+        connection
+        for connection in connections
+        if hs_customer_statements[0] in connection.executed_statements
+    )
+    position = connection.executed_statements.index(hs_customer_statements[0])
+    assert (
+        connection.executed_statements[
+            position : position + len(hs_customer_statements)
+        ]
+        == hs_customer_statements
+    )
+
+
+def test_execute_fail_fast(data_vault_load: DataVaultLoad):
+    """Assert that remaining statements are skipped after a failure.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = failing_connection(
+        data_vault_load.target_tables_by_group[0][0].sql_load_statement
+    )
+    with DataVaultLoadExecutor(lambda: connection, max_concurrency=1) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    results_by_table = load_result.results_by_table
+    assert not load_result.succeeded
+    assert load_result.failed_statements == [results_by_table["h_customer"]]
+    assert results_by_table["h_customer"].error.raw_msg == "Some error"
+    # The only thread was busy with the failing statement: the remaining hubs are
+    # skipped as well.
+    for table_name in ("h_customer_role_playing", "h_order", "l_order_customer"):
+        assert results_by_table[table_name].status == StatementStatus.SKIPPED
+    assert all(
+        result.status == StatementStatus.SKIPPED
+        for result in load_result.statement_results
+        if result.statement.group > 1
+    )
+
+
+def test_execute_continue_on_error(data_vault_load: DataVaultLoad):
+    """Assert that remaining statements run after a failure, if configured.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = failing_connection(
+        data_vault_load.target_tables_by_group[0][0].sql_load_statement
+    )
+    with DataVaultLoadExecutor(
+        lambda: connection, fail_fast=False, scheduling=Scheduling.GROUPS
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert [
+        result.statement.target_table for result in load_result.failed_statements
+    ] == ["h_customer"]
+    assert all(
+        result.status == StatementStatus.SUCCEEDED
+        for result in load_result.statement_results
+        if result.statement.target_table != "h_customer"
+    )
+
+
+def test_execute_by_dependencies(data_vault_load: DataVaultLoad):
+    """Assert that statements do not wait for unrelated statements of earlier groups.
+
+    The load of `l_order_customer_role_playing` only finishes after `hs_customer` (a
+    satellite of `h_customer`) is loaded.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    assert data_vault_load.dependencies["hs_customer"] == ["h_customer"]
+    tables_by_name = {table.name: table for table in data_vault_load.target_tables}
+    connection = BlockingConnection(
+        blocked_sql=split_sql_script(
+            tables_by_name["l_order_customer_role_playing"].sql_load_statement
+        )[-1],
+        unblocking_sql=split_sql_script(
+            tables_by_name["hs_customer"].sql_load_statement
+        )[-1],
+    )
+    with DataVaultLoadExecutor(lambda: connection) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+
+
+def test_execute_by_dependencies_continue_on_error(data_vault_load: DataVaultLoad):
+    """Assert that only statements depending on a failed statement are skipped.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = failing_connection(
+        data_vault_load.target_tables_by_group[0][0].sql_load_statement
+    )
+    with DataVaultLoadExecutor(lambda: connection, fail_fast=False) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    statuses = {
+        table_name: result.status
+        for table_name, result in load_result.results_by_table.items()
+    }
+    assert statuses == {
+        "h_customer": StatementStatus.FAILED,
+        "h_customer_role_playing": StatementStatus.SKIPPED,
+        "h_order": StatementStatus.SUCCEEDED,
+        "l_order_customer": StatementStatus.SKIPPED,
+        "l_order_customer_role_playing": StatementStatus.SKIPPED,
+        "hs_customer": StatementStatus.SKIPPED,
+        "ls_order_customer_eff": StatementStatus.SKIPPED,
+        "ls_order_customer_role_playing_eff": StatementStatus.SKIPPED,
+    }
+
+
+class UnreachableConnection(ReplayConnection):
+    """Stand-in connection where a statement fails without reaching Snowflake."""
+
+    def __init__(self, failing_sql: str):
+        """Instantiate an UnreachableConnection.
+
+        Args:
+            failing_sql: Statement that fails with a network error.
+        """
+        super().__init__(recordings=[], strict=False)
+        self.failing_sql = normalize_sql(failing_sql)
+
+    def replay(self, command: str) -> RecordedQuery:
+        """Replay a statement, failing if it is the failing statement.
+
+        Args:
+            command: SQL statement.
+
+        Returns:
+            Recorded query.
+
+        Raises:
+            OSError: If the statement is the failing statement.
+        """
+        if normalize_sql(command) == self.failing_sql:
+            raise OSError("Connection reset by peer")
+        return super().replay(command)
+
+
+def test_execute_by_dependencies_client_error(data_vault_load: DataVaultLoad):
+    """Assert that errors not raised by Snowflake fail statements and skip dependents.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = UnreachableConnection(
+        split_sql_script(
+            data_vault_load.target_tables_by_group[0][0].sql_load_statement
+        )[-1]
+    )
+    with DataVaultLoadExecutor(lambda: connection, fail_fast=False) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    results_by_table = load_result.results_by_table
+    assert load_result.failed_statements == [results_by_table["h_customer"]]
+    assert isinstance(results_by_table["h_customer"].error, OSError)
+    assert results_by_table["h_order"].status == StatementStatus.SUCCEEDED
+    assert results_by_table["hs_customer"].status == StatementStatus.SKIPPED
+
+
+@pytest.mark.parametrize(
+    ("batching", "request_count"), [(Batching.TABLE, 9), (Batching.GROUP, 4)]
+)
+def test_execute_batching(
+    monkeypatch: pytest.MonkeyPatch,
+    data_vault_load: DataVaultLoad,
+    batching: Batching,
+    request_count: int,
+):
+    """Assert that batched statements are submitted in multi-statement requests.
+
+    Args:
+        monkeypatch: Monkeypatch fixture value.
+        data_vault_load: Data vault load fixture value.
+        batching: Batching mode.
+        request_count: Expected number of requests (one per table or per group).
+    """
+    requests: List[str] = []
+    execute = ReplayCursor.execute
+
+    def count_requests(cursor: ReplayCursor, command: str, *args, **kwargs):
+        requests.append(command)
+        return execute(cursor, command, *args, **kwargs)
+
+    monkeypatch.setattr(ReplayCursor, "execute", count_requests)
+    connection = ReplayConnection(recordings=[], strict=False)
+    with DataVaultLoadExecutor(lambda: connection, batching=batching) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    assert len(requests) == request_count
+    for result in load_result.statement_results:
+        assert len(result.query_ids) == len(split_sql_script(result.statement.sql))
+    assert len(connection.executed_statements) == sum(
+        len(result.query_ids) for result in load_result.statement_results
+    )
+
+
+def failing_batch_connection(
+    data_vault_load: DataVaultLoad, failing_table: str, attributed: bool
+) -> ReplayConnection:
+    """Build a stand-in connection where the request of the first group fails.
+
+    As in Snowflake, the request fails as a whole, with its own query ID. The child
+    queries of the request, up to the last statement of the failing table, are
+    found in the query history when attributed.
+
+    Args:
+        data_vault_load: Data vault load.
+        failing_table: Name of the table whose last statement fails.
+        attributed: Whether the child queries are found in the query history.
+
+    Returns:
+        ReplayConnection instance (all other statements succeed).
+    """
+    child_queries = []
+    for load_statement in get_load_statements(data_vault_load)[1]:
+        for statement in split_sql_script(load_statement.sql):
+            child_queries.append(
+                {
+                    "QUERY_ID": f"query_{len(child_queries)}",
+                    "EXECUTION_STATUS": "SUCCESS",
+                }
+            )
+        if load_statement.target_table == failing_table:
+            child_queries[-1]["EXECUTION_STATUS"] = "FAILED_WITH_ERROR"
+            break
+    recordings = [
+        RecordedQuery(
+            sql=get_multi_statement_sql(
+                [
+                    statement
+                    for load_statement in get_load_statements(data_vault_load)[1]
+                    for statement in split_sql_script(load_statement.sql)
+                ]
+            ),
+            query_id="request_query_id",
+            error="Some error",
+        )
+    ]
+    if attributed:
+        recordings.append(
+            RecordedQuery(
+                sql=CHILD_QUERIES_SQL_FILE_PATH.read_text().format(
+                    database="dv",
+                    result_limit=CHILD_QUERIES_RESULT_LIMIT,
+                    query_id="request_query_id",
+                ),
+                rows=child_queries,
+            )
+        )
+    return ReplayConnection(recordings=recordings, strict=False, database="dv")
+
+
+def test_execute_batching_failure(data_vault_load: DataVaultLoad, tmp_path: Path):
+    """Assert that a failure in a batch is mapped back to the failed table.
+
+    The failed statement is found in the query history, from the query ID of the
+    request. Tables loaded before the failed one, in the same request, are
+    checkpointed.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+        tmp_path: Temporary directory fixture value.
+    """
+    connection = failing_batch_connection(data_vault_load, "h_order", True)
+    checkpoint_store = FileCheckpointStore(tmp_path / "checkpoints.json")
+    with DataVaultLoadExecutor(
+        lambda: connection,
+        batching=Batching.GROUP,
+        checkpoint_store=checkpoint_store,
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    results_by_table = load_result.results_by_table
+    assert results_by_table["h_customer"].status == StatementStatus.SUCCEEDED
+    assert results_by_table["h_customer_role_playing"].status == (
+        StatementStatus.SUCCEEDED
+    )
+    assert load_result.failed_statements == [results_by_table["h_order"]]
+    assert results_by_table["h_order"].error.sfqid == "request_query_id"
+    assert checkpoint_store.get_completed(get_checkpoint_key(data_vault_load)) >= {
+        results_by_table[table_name].statement.fingerprint
+        for table_name in ("h_customer", "h_customer_role_playing")
+    }
+
+
+def test_execute_batching_unattributed_failure(data_vault_load: DataVaultLoad):
+    """Assert that all tables of a batch fail when the failed one cannot be found.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = failing_batch_connection(data_vault_load, "h_order", False)
+    with DataVaultLoadExecutor(lambda: connection, batching=Batching.GROUP) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert [result.statement for result in load_result.failed_statements] == (
+        get_load_statements(data_vault_load)[1]
+    )
+    assert all(
+        not result.query_ids and result.error.sfqid == "request_query_id"
+        for result in load_result.failed_statements
+    )
+
+
+def test_execute_staging_table_failure(data_vault_load: DataVaultLoad):
+    """Assert that all statements are skipped when the staging table is not created.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = failing_connection(data_vault_load.staging_create_sql_statement)
+    with DataVaultLoadExecutor(lambda: connection, fail_fast=False) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.statement_results[0].status == StatementStatus.FAILED
+    assert all(
+        result.status == StatementStatus.SKIPPED
+        for result in load_result.statement_results[1:]
+    )
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_execute_drop_staging_table(data_vault_load: DataVaultLoad, fail: bool):
+    """Assert that the staging table is dropped only after its load succeeded.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+        fail: Whether a statement of the load fails.
+    """
+    tables_by_name = {table.name: table for table in data_vault_load.target_tables}
+    connection = (
+        failing_connection(tables_by_name["hs_customer"].sql_load_statement)
+        if fail
+        else ReplayConnection(recordings=[], strict=False)
+    )
+    with DataVaultLoadExecutor(lambda: connection, drop_staging_table=True) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded != fail
+    assert (
+        data_vault_load.staging_drop_sql_statement in connection.executed_statements
+    ) != fail
+
+
+def test_execute_temporary_staging_table(data_vault_load: DataVaultLoad):
+    """Assert that loads with a temporary staging table are rejected.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    data_vault_load.staging_table.kind = StagingTableKind.TEMPORARY
+    with pytest.raises(ValueError):
+        get_load_statements(data_vault_load)
+
+
+@pytest.mark.parametrize("batching", [Batching.NONE, Batching.GROUP])
+def test_execute_query_tags(data_vault_load: DataVaultLoad, batching: Batching):
+    """Assert that queries are tagged and that their timings are collected.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+        batching: Batching fixture value.
+    """
+    connection = ReplayConnection(recordings=[], latency=0.01, strict=False)
+    with DataVaultLoadExecutor(
+        lambda: connection, max_concurrency=1, batching=batching, tag_queries=True
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    for group, statements in enumerate(get_load_statements(data_vault_load)):
+        query_tag_statement = get_query_tag_sql_statement(
+            statements if batching == Batching.GROUP else statements[:1]
+        )
+        assert query_tag_statement in connection.executed_statements
+        query_tag = json.loads(query_tag_statement.split("'")[1])
+        assert query_tag["load_id"] == data_vault_load.staging_table.name
+        assert query_tag["group"] == group
+    for result in load_result.statement_results:
+        assert result.timings.execution_time >= 0.01
+        assert result.timings.total_time <= result.elapsed_time
+
+
+@pytest.mark.parametrize("batching", [Batching.NONE, Batching.TABLE])
+def test_execute_row_counts(data_vault_load: DataVaultLoad, batching: Batching):
+    """Assert that the row counts returned by MERGE statements are collected.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+        batching: Batching fixture value.
+    """
+    tables_by_name = {table.name: table for table in data_vault_load.target_tables}
+    connection = ReplayConnection(
+        recordings=[
+            RecordedQuery(
+                sql=split_sql_script(tables_by_name["h_customer"].sql_load_statement)[
+                    -1
+                ],
+                rows=[{"number of rows inserted": 3}],
+            ),
+            RecordedQuery(
+                sql=split_sql_script(
+                    tables_by_name["ls_order_customer_eff"].sql_load_statement
+                )[-1],
+                rows=[{"number of rows inserted": 2, "number of rows updated": 1}],
+            ),
+        ],
+        strict=False,
+    )
+    with DataVaultLoadExecutor(lambda: connection, batching=batching) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    row_counts_by_table = load_result.row_counts_by_table
+    assert row_counts_by_table["h_customer"] == RowCounts(rows_inserted=3)
+    assert row_counts_by_table["ls_order_customer_eff"] == RowCounts(
+        rows_inserted=2, rows_updated=1
+    )
+    assert row_counts_by_table["h_order"] == RowCounts()
+    assert load_result.changed_tables == ["h_customer", "ls_order_customer_eff"]
+
+
+def test_get_query_tag():
+    """Assert that query tags describe the statements submitted together."""
+    statements = [
+        LoadStatement(group=0, sql="", staging_table="orders_20190806_000000"),
+        LoadStatement(
+            group=1,
+            sql="",
+            target_table="h_customer",
+            table_type=TableType.HUB,
+            staging_table="orders_20190806_000000",
+        ),
+        LoadStatement(
+            group=1,
+            sql="",
+            target_table="l_order_customer",
+            table_type=TableType.LINK,
+            staging_table="orders_20190806_000000",
+        ),
+    ]
+    assert json.loads(get_query_tag(statements[:1])) == {
+        "application": "diepvries",
+        "load_id": "orders_20190806_000000",
+        "group": 0,
+        "target_table": None,
+        "statement_kind": "staging",
+    }
+    assert json.loads(get_query_tag(statements[1:])) == {
+        "application": "diepvries",
+        "load_id": "orders_20190806_000000",
+        "group": 1,
+        "target_table": ["h_customer", "l_order_customer"],
+        "statement_kind": ["hub", "link"],
+    }
+    many_statements = [
+        LoadStatement(group=1, sql="", target_table=f"h_table_{index}")
+        for index in range(200)
+    ]
+    query_tag = get_query_tag(many_statements)
+    assert len(query_tag) <= QUERY_TAG_MAX_LENGTH
+    assert json.loads(query_tag)["target_table"] is None
+
+
+def test_invalid_max_concurrency():
+    """Assert that a concurrency limit lower than 1 is rejected."""
+    with pytest.raises(ValueError):
+        DataVaultLoadExecutor(lambda: None, max_concurrency=0)
+
+
+def test_execute_with_connection_pool(data_vault_load: DataVaultLoad):
+    """Assert that executors sharing a pool reuse its sessions and leave it open.
+
+    Sessions are returned without the query tags of the first executor.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connections: List[ReplayConnection] = []
+
+    def connection_factory() -> ReplayConnection:
+        connections.append(ReplayConnection(recordings=[], strict=False))
+        return connections[-1]
+
+    with ConnectionPool(connection_factory, max_size=2, min_size=2) as pool:
+        for tag_queries in (True, False):
+            with DataVaultLoadExecutor(
+                connection_pool=pool, max_concurrency=4, tag_queries=tag_queries
+            ) as executor:
+                assert executor.execute(data_vault_load).succeeded
+            if tag_queries:
+                # Sessions are not returned with the query tag of the load.
+                assert all(
+                    connection.executed_statements[-1]
+                    == "ALTER SESSION UNSET QUERY_TAG;"
+                    for connection in connections
+                    if connection.executed_statements
+                )
+        assert pool.idle_size == 2
+
+    assert len(connections) == 2
+    assert all(connection.is_closed() for connection in connections)
+
+
+def test_invalid_connection_source():
+    """Assert that exactly one of a connection factory and a pool is required."""
+    with pytest.raises(ValueError):
+        DataVaultLoadExecutor()
+    with ConnectionPool(lambda: None) as pool, pytest.raises(ValueError):
+        DataVaultLoadExecutor(lambda: None, connection_pool=pool)
+
+
+def test_execute_loads(
+    monkeypatch: pytest.MonkeyPatch,
+    data_vault_load: DataVaultLoad,
+    other_data_vault_load: DataVaultLoad,
+):
+    """Assert that loads sharing target tables never write to a table concurrently.
+
+    Args:
+        monkeypatch: Monkeypatch fixture value.
+        data_vault_load: Data vault load fixture value.
+        other_data_vault_load: Data vault load sharing target tables with
+            data_vault_load.
+    """
+    lock = threading.Lock()
+    written_tables: List[str] = []
+    overlapping_tables: List[str] = []
+    max_running = 0
+    execute_statement = DataVaultLoadExecutor._execute_statement
+
+    def track_written_tables(executor, load_statement, *args, **kwargs):
+        nonlocal max_running
+        with lock:
+            if load_statement.written_table in written_tables:
+                overlapping_tables.append(load_statement.written_table)
+            written_tables.append(load_statement.written_table)
+            max_running = max(max_running, len(written_tables))
+        try:
+            return execute_statement(executor, load_statement, *args, **kwargs)
+        finally:
+            with lock:
+                written_tables.remove(load_statement.written_table)
+
+    monkeypatch.setattr(
+        DataVaultLoadExecutor, "_execute_statement", track_written_tables
+    )
+    connection = ReplayConnection(recordings=[], latency=0.01, strict=False)
+    with DataVaultLoadExecutor(lambda: connection, max_concurrency=4) as executor:
+        load_results = executor.execute_loads([data_vault_load, other_data_vault_load])
+
+    assert [load_result.staging_table for load_result in load_results] == [
+        data_vault_load.staging_table.name,
+        other_data_vault_load.staging_table.name,
+    ]
+    assert all(load_result.succeeded for load_result in load_results)
+    # Role playing hubs are loaded into their parent hub.
+    assert (
+        load_results[0].results_by_table["h_customer_role_playing"].statement
+    ).written_table == "dv.h_customer"
+    assert not overlapping_tables
+    assert 1 < max_running <= 4
+
+
+def test_execute_loads_failure(
+    data_vault_load: DataVaultLoad, other_data_vault_load: DataVaultLoad
+):
+    """Assert that a failure only affects the load where it happens.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+        other_data_vault_load: Data vault load sharing target tables with
+            data_vault_load.
+    """
+    connection = failing_connection(
+        data_vault_load.target_tables_by_group[0][0].sql_load_statement
+    )
+    with DataVaultLoadExecutor(lambda: connection) as executor:
+        load_results = executor.execute_loads([data_vault_load, other_data_vault_load])
+
+    assert not load_results[0].succeeded
+    assert load_results[0].results_by_table["h_customer"].status == (
+        StatementStatus.FAILED
+    )
+    assert load_results[1].succeeded
@@ -0,0 +1,175 @@
+"""Unit tests for statement and load deadlines."""
+
+import pytest
+
+from diepvries.data_vault_load import DataVaultLoad
+from diepvries.executors.data_vault_load_executor import (
+    Batching,
+    DataVaultLoadExecutor,
+    Scheduling,
+)
+from diepvries.executors.deadlines import Deadlines, StragglerPolicy
+from diepvries.executors.load_statement import StatementStatus
+from diepvries.replay_connection import RecordedQuery, ReplayConnection
+from diepvries.template_sql.sql_formulas import (
+    CANCEL_QUERY_SQL_TEMPLATE,
+    split_sql_script,
+)
+
+
+def slow_connection(
+    data_vault_load: DataVaultLoad, table_name: str, reruns_fast: bool = False
+) -> ReplayConnection:
+    """Build a stand-in connection where the MERGE statement of a table is slow.
+
+    Args:
+        data_vault_load: Data vault load.
+        table_name: Name of the slow table.
+        reruns_fast: Whether the statement is fast when it runs again.
+
+    Returns:
+        ReplayConnection instance (all other statements are fast).
+    """
+    tables_by_name = {table.name: table for table in data_vault_load.target_tables}
+    *_, merge_statement = split_sql_script(
+        tables_by_name[table_name].sql_load_statement
+    )
+    recordings = [
+        RecordedQuery(sql=merge_statement, query_id="slow_query", elapsed_time=5.0)
+    ]
+    if reruns_fast:
+        recordings.append(RecordedQuery(sql=merge_statement, query_id="fast_query"))
+
+    return ReplayConnection(recordings=recordings, elapsed_time_scale=1.0, strict=False)
+
+
+@pytest.mark.parametrize("scheduling", [Scheduling.GROUPS, Scheduling.DEPENDENCIES])
+def test_execute_statement_timeout(data_vault_load: DataVaultLoad, scheduling):
+    """Assert that stragglers are cancelled and only their dependents are skipped.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+        scheduling: Scheduling strategy.
+    """
+    connection = slow_connection(data_vault_load, "h_customer")
+    deadlines = Deadlines(statement_timeout=0.1, poll_interval=0.01)
+    with DataVaultLoadExecutor(
+        lambda: connection, scheduling=scheduling, deadlines=deadlines
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert [result.statement.target_table for result in load_result.stragglers] == [
+        "h_customer"
+    ]
+    assert CANCEL_QUERY_SQL_TEMPLATE.format(query_id="slow_query") in (
+        connection.executed_statements
+    )
+    statuses = {
+        table_name: result.status
+        for table_name, result in load_result.results_by_table.items()
+    }
+    expected_statuses = {
+        "h_customer": StatementStatus.TIMED_OUT,
+        "h_customer_role_playing": StatementStatus.SKIPPED,
+        "h_order": StatementStatus.SUCCEEDED,
+        "l_order_customer": StatementStatus.SKIPPED,
+        "l_order_customer_role_playing": StatementStatus.SKIPPED,
+        "hs_customer": StatementStatus.SKIPPED,
+        "ls_order_customer_eff": StatementStatus.SKIPPED,
+        "ls_order_customer_role_playing_eff": StatementStatus.SKIPPED,
+    }
+    if scheduling == Scheduling.GROUPS:
+        # Hubs are all in the first group, so the role playing hub already ran.
+        expected_statuses["h_customer_role_playing"] = StatementStatus.SUCCEEDED
+        expected_statuses["l_order_customer_role_playing"] = StatementStatus.SUCCEEDED
+        expected_statuses["ls_order_customer_role_playing_eff"] = (
+            StatementStatus.SUCCEEDED
+        )
+    assert statuses == expected_statuses
+
+
+def test_execute_by_groups_straggler(data_vault_load: DataVaultLoad):
+    """Assert that a straggler does not block unrelated statements of later groups.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = slow_connection(data_vault_load, "h_customer_role_playing")
+    deadlines = Deadlines(statement_timeout=0.1, poll_interval=0.01)
+    with DataVaultLoadExecutor(
+        lambda: connection, scheduling=Scheduling.GROUPS, deadlines=deadlines
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    statuses = {
+        table_name: result.status
+        for table_name, result in load_result.results_by_table.items()
+    }
+    assert statuses == {
+        "h_customer": StatementStatus.SUCCEEDED,
+        "h_customer_role_playing": StatementStatus.TIMED_OUT,
+        "h_order": StatementStatus.SUCCEEDED,
+        "l_order_customer": StatementStatus.SUCCEEDED,
+        "l_order_customer_role_playing": StatementStatus.SKIPPED,
+        "hs_customer": StatementStatus.SUCCEEDED,
+        "ls_order_customer_eff": StatementStatus.SUCCEEDED,
+        "ls_order_customer_role_playing_eff": StatementStatus.SKIPPED,
+    }
+
+
+@pytest.mark.parametrize("scheduling", [Scheduling.GROUPS, Scheduling.DEPENDENCIES])
+def test_execute_reschedule_stragglers(data_vault_load: DataVaultLoad, scheduling):
+    """Assert that rescheduled stragglers run again before their dependents.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+        scheduling: Scheduling strategy.
+    """
+    connection = slow_connection(data_vault_load, "h_customer", reruns_fast=True)
+    deadlines = Deadlines(
+        statement_timeout=0.1,
+        straggler_policy=StragglerPolicy.RESCHEDULE,
+        poll_interval=0.01,
+    )
+    with DataVaultLoadExecutor(
+        lambda: connection, scheduling=scheduling, deadlines=deadlines
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    assert load_result.results_by_table["h_customer"].query_ids[-1] == "fast_query"
+    assert CANCEL_QUERY_SQL_TEMPLATE.format(query_id="slow_query") in (
+        connection.executed_statements
+    )
+
+
+def test_execute_load_timeout(data_vault_load: DataVaultLoad):
+    """Assert that statements are skipped once the deadline of their load passed.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = ReplayConnection(recordings=[], latency=0.05, strict=False)
+    deadlines = Deadlines(load_timeout=0.02, poll_interval=0.01)
+    with DataVaultLoadExecutor(lambda: connection, deadlines=deadlines) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    staging_result, *target_results = load_result.statement_results
+    assert staging_result.status == StatementStatus.TIMED_OUT
+    assert all(result.status == StatementStatus.SKIPPED for result in target_results)
+
+
+def test_invalid_deadlines():
+    """Assert that invalid deadlines are rejected."""
+    with pytest.raises(ValueError):
+        Deadlines(statement_timeout=0)
+    with pytest.raises(ValueError):
+        Deadlines(load_timeout=-1)
+    with pytest.raises(ValueError):
+        Deadlines(poll_interval=0)
+    with pytest.raises(ValueError):
+        DataVaultLoadExecutor(
+            lambda: ReplayConnection(recordings=[]),
+            batching=Batching.TABLE,
+            deadlines=Deadlines(statement_timeout=1),
+        )
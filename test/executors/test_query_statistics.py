@@ -0,0 +1,189 @@
+"""Unit tests for QueryStatisticsCollector."""
+
+from typing import ContextManager, List
+
+import pytest
+
+from diepvries.data_vault_load import DataVaultLoad
+from diepvries.executors.data_vault_load_executor import DataVaultLoadExecutor
+from diepvries.executors.query_statistics import (
+    QUERY_STATISTICS_RESULT_LIMIT,
+    QUERY_STATISTICS_SQL_FILE_PATH,
+    FakeQueryStatisticsProvider,
+    QueryStatistics,
+    QueryStatisticsCollector,
+    get_query_history_statistics,
+)
+from diepvries.replay_connection import RecordedQuery, ReplayConnection
+from diepvries.template_sql.sql_formulas import split_sql_script
+
+# pylint: disable=protected-access
+
+
+def test_execute_with_statistics_collector(data_vault_load: DataVaultLoad):
+    """Assert that the statistics of each query are attached to its statement.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    tables_by_name = {table.name: table for table in data_vault_load.target_tables}
+    hs_customer_merge = split_sql_script(
+        tables_by_name["hs_customer"].sql_load_statement
+    )[-1]
+    connection = ReplayConnection(
+        recordings=[RecordedQuery(sql=hs_customer_merge, query_id="hs_customer_merge")],
+        strict=False,
+    )
+    hs_customer_statistics = QueryStatistics(
+        query_id="hs_customer_merge",
+        bytes_scanned=1024,
+        partitions_scanned=9,
+        partitions_total=10,
+        rows_inserted=5,
+    )
+    collector = QueryStatisticsCollector(
+        FakeQueryStatisticsProvider([hs_customer_statistics])
+    )
+    with DataVaultLoadExecutor(
+        lambda: connection, statistics_collector=collector
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    for result in load_result.statement_results:
+        assert [statistics.query_id for statistics in result.statistics] == (
+            result.query_ids
+        )
+    hs_customer_result = load_result.results_by_table["hs_customer"]
+    assert hs_customer_result.statistics[-1] == hs_customer_statistics
+    assert hs_customer_result.statistics[-1].scanned_partitions_ratio == 0.9
+    assert hs_customer_result.statistics[0].scanned_partitions_ratio == 0.0
+
+
+def test_get_query_history_statistics():
+    """Assert that statistics are read from the query history."""
+    query_statistics_sql = QUERY_STATISTICS_SQL_FILE_PATH.read_text().format(
+        database="dv",
+        result_limit=QUERY_STATISTICS_RESULT_LIMIT,
+        query_ids="'query_1', 'query_2'",
+    )
+    connection = ReplayConnection(
+        recordings=[
+            RecordedQuery(
+                sql=query_statistics_sql,
+                rows=[
+                    {
+                        "QUERY_ID": "query_1",
+                        "BYTES_SCANNED": 2048,
+                        "PARTITIONS_SCANNED": 2,
+                        "PARTITIONS_TOTAL": 8,
+                        "ROWS_INSERTED": 3,
+                        "ROWS_UPDATED": 1,
+                        "BYTES_SPILLED_TO_LOCAL_STORAGE": None,
+                        "BYTES_SPILLED_TO_REMOTE_STORAGE": 0,
+                    }
+                ],
+            )
+        ]
+    )
+
+    assert get_query_history_statistics(connection, [], "dv") == []
+    assert get_query_history_statistics(connection, ["query_1", "query_2"], "dv") == [
+        QueryStatistics(
+            query_id="query_1",
+            bytes_scanned=2048,
+            partitions_scanned=2,
+            partitions_total=8,
+            rows_inserted=3,
+            rows_updated=1,
+        )
+    ]
+
+
+def test_collect_failure(data_vault_load: DataVaultLoad):
+    """Assert that a failure to fetch statistics does not affect the load result.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = ReplayConnection(recordings=[], strict=False)
+    with DataVaultLoadExecutor(lambda: connection) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    failing_connection = ReplayConnection(recordings=[], strict=True)
+    QueryStatisticsCollector(database="dv").collect(failing_connection, load_result)
+
+    assert load_result.succeeded
+    assert all(not result.statistics for result in load_result.statement_results)
+
+
+def test_collect_unexpected_failure(data_vault_load: DataVaultLoad):
+    """Assert that any failure of the statistics provider keeps the load result.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+
+    def get_statistics(
+        _connection: ReplayConnection, _query_ids: List[str]
+    ) -> List[QueryStatistics]:
+        """Fail to get the statistics of queries, as with a NULL column.
+
+        Args:
+            _connection: Unused, Snowflake connection.
+            _query_ids: Unused, query IDs.
+
+        Raises:
+            TypeError: Always.
+        """
+        raise TypeError("unsupported operand type(s)")
+
+    connection = ReplayConnection(recordings=[], strict=False)
+    with DataVaultLoadExecutor(
+        lambda: connection,
+        statistics_collector=QueryStatisticsCollector(get_statistics),
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    assert all(not result.statistics for result in load_result.statement_results)
+
+
+def test_collect_checkout_failure(
+    monkeypatch: pytest.MonkeyPatch, data_vault_load: DataVaultLoad
+):
+    """Assert that a failure to check out a session for statistics keeps the result.
+
+    Args:
+        monkeypatch: Monkeypatch fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    connection = ReplayConnection(recordings=[], strict=False)
+    executor = DataVaultLoadExecutor(
+        lambda: connection,
+        statistics_collector=QueryStatisticsCollector(FakeQueryStatisticsProvider()),
+    )
+    get_connection = executor._connection
+
+    def get_statement_connection(*args, **kwargs) -> ContextManager[ReplayConnection]:
+        """Check out a session, failing for statistics (checked out without arguments).
+
+        Args:
+            args: Positional arguments of `DataVaultLoadExecutor._connection`.
+            kwargs: Keyword arguments of `DataVaultLoadExecutor._connection`.
+
+        Returns:
+            Context manager yielding a connection.
+
+        Raises:
+            TimeoutError: When checking out a session for statistics.
+        """
+        if not args and not kwargs:
+            raise TimeoutError("No session available")
+        return get_connection(*args, **kwargs)
+
+    monkeypatch.setattr(executor, "_connection", get_statement_connection)
+    with executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    assert all(not result.statistics for result in load_result.statement_results)
@@ -0,0 +1,95 @@
+"""Unit tests for StagingTableSweeper."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from diepvries.executors.staging_table_sweeper import (
+    STAGING_TABLES_SQL_FILE_PATH,
+    StagingTableSweeper,
+)
+from diepvries.replay_connection import RecordedQuery, ReplayConnection
+
+
+@pytest.fixture
+def connection() -> ReplayConnection:
+    """Define a stand-in connection listing the tables of a staging schema.
+
+    Returns:
+        ReplayConnection instance.
+    """
+    return ReplayConnection(
+        recordings=[
+            RecordedQuery(
+                sql=STAGING_TABLES_SQL_FILE_PATH.read_text().format(
+                    staging_schema="dv_stg"
+                ),
+                rows=[
+                    {"name": "ORDERS_20190805_000000"},
+                    {"name": "ORDERS_20190806_120000"},
+                    {"name": "CUSTOMERS_20190801_000000"},
+                    {"name": "DV_LOAD_CHECKPOINTS"},
+                    {"name": "ORDERS_20191399_000000"},
+                ],
+            )
+        ],
+        strict=False,
+    )
+
+
+def test_orphaned_staging_tables(connection: ReplayConnection):
+    """Assert that only staging tables older than the retention are listed.
+
+    Args:
+        connection: Stand-in connection fixture value.
+    """
+    now = datetime(2019, 8, 7, tzinfo=timezone.utc)
+    sweeper = StagingTableSweeper(
+        connection, "dv_stg", retention=timedelta(days=1), dedicated_schema=True
+    )
+    assert sweeper.orphaned_staging_tables(now) == [
+        "customers_20190801_000000",
+        "orders_20190805_000000",
+    ]
+
+    sweeper = StagingTableSweeper(
+        connection, "dv_stg", retention=timedelta(days=1), staging_tables=["orders"]
+    )
+    assert sweeper.orphaned_staging_tables(now) == ["orders_20190805_000000"]
+
+
+def test_sweep(connection: ReplayConnection):
+    """Assert that orphaned staging tables are dropped.
+
+    Args:
+        connection: Stand-in connection fixture value.
+    """
+    sweeper = StagingTableSweeper(
+        connection, "dv_stg", retention=timedelta(hours=6), dedicated_schema=True
+    )
+    assert sweeper.sweep(datetime(2019, 8, 7, tzinfo=timezone.utc)) == [
+        "customers_20190801_000000",
+        "orders_20190805_000000",
+        "orders_20190806_120000",
+    ]
+    assert connection.executed_statements[1:] == [
+        "DROP TABLE IF EXISTS dv_stg.customers_20190801_000000;",
+        "DROP TABLE IF EXISTS dv_stg.orders_20190805_000000;",
+        "DROP TABLE IF EXISTS dv_stg.orders_20190806_120000;",
+    ]
+
+
+def test_invalid_sweeper(connection: ReplayConnection):
+    """Assert that a negative retention or a missing allow-list are rejected.
+
+    Args:
+        connection: Stand-in connection fixture value.
+    """
+    with pytest.raises(ValueError):
+        StagingTableSweeper(
+            connection, "dv_stg", retention=timedelta(days=-1), dedicated_schema=True
+        )
+    # Without allow-list, permanent tables could be dropped.
+    with pytest.raises(ValueError):
+        StagingTableSweeper(connection, "dv_stg", retention=timedelta(days=1))
+    assert not connection.executed_statements
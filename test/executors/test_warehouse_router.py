@@ -0,0 +1,153 @@
+"""Unit tests for WarehouseRouter."""
+
+from typing import Dict, List
+
+import pytest
+
+from diepvries.data_vault_load import DataVaultLoad
+from diepvries.executors.data_vault_load_executor import (
+    DataVaultLoadExecutor,
+    LoadResult,
+    LoadStatement,
+    StatementResult,
+    StatementStatus,
+    get_load_statements,
+    split_sql_script,
+)
+from diepvries.executors.warehouse_router import WarehouseRoute, WarehouseRouter
+from diepvries.replay_connection import ReplayConnection
+
+
+@pytest.fixture
+def warehouse_router() -> WarehouseRouter:
+    """Define a router over three warehouses.
+
+    Returns:
+        WarehouseRouter instance.
+    """
+    return WarehouseRouter(
+        [
+            WarehouseRoute("load_xs"),
+            WarehouseRoute("load_m", min_weight=20, min_runtime=30),
+            WarehouseRoute("load_l", min_weight=80, min_runtime=60),
+        ]
+    )
+
+
+def get_warehouses_by_table(
+    warehouse_router: WarehouseRouter, data_vault_load: DataVaultLoad
+) -> Dict[str, str]:
+    """Route all statements of a load.
+
+    Args:
+        warehouse_router: Warehouse router.
+        data_vault_load: Data Vault load.
+
+    Returns:
+        Warehouses, indexed by target table name (None for the staging table).
+    """
+    return {
+        statement.target_table: warehouse_router.get_warehouse(statement)
+        for statements in get_load_statements(data_vault_load)
+        for statement in statements
+    }
+
+
+def test_get_warehouse(
+    warehouse_router: WarehouseRouter, data_vault_load: DataVaultLoad
+):
+    """Assert that statements are routed according to their estimated weight.
+
+    Args:
+        warehouse_router: Warehouse router fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    assert get_warehouses_by_table(warehouse_router, data_vault_load) == {
+        None: "load_m",
+        "h_customer": "load_xs",
+        "h_customer_role_playing": "load_xs",
+        "h_order": "load_xs",
+        "l_order_customer": "load_xs",
+        "l_order_customer_role_playing": "load_xs",
+        "hs_customer": "load_l",
+        "ls_order_customer_eff": "load_m",
+        "ls_order_customer_role_playing_eff": "load_m",
+    }
+
+
+def test_get_warehouse_runtimes(
+    warehouse_router: WarehouseRouter, data_vault_load: DataVaultLoad
+):
+    """Assert that historical runtimes take precedence over estimated weights.
+
+    Args:
+        warehouse_router: Warehouse router fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    load_result = LoadResult(
+        staging_table=data_vault_load.staging_table.name,
+        statement_results=[
+            StatementResult(
+                statement=LoadStatement(group=1, sql="", target_table="h_order"),
+                status=StatementStatus.SUCCEEDED,
+                elapsed_time=120.0,
+            ),
+            StatementResult(
+                statement=LoadStatement(group=3, sql="", target_table="hs_customer"),
+                status=StatementStatus.SUCCEEDED,
+                elapsed_time=10.0,
+            ),
+            StatementResult(
+                statement=LoadStatement(group=1, sql="", target_table="h_customer"),
+                status=StatementStatus.FAILED,
+                elapsed_time=500.0,
+            ),
+        ],
+    )
+    warehouse_router.update_runtimes(load_result)
+
+    warehouses_by_table = get_warehouses_by_table(warehouse_router, data_vault_load)
+    assert warehouses_by_table["h_order"] == "load_l"
+    assert warehouses_by_table["hs_customer"] == "load_xs"
+    assert warehouses_by_table["h_customer"] == "load_xs"
+
+
+def test_execute_with_warehouse_router(
+    warehouse_router: WarehouseRouter, data_vault_load: DataVaultLoad
+):
+    """Assert that each warehouse has its own connections.
+
+    Args:
+        warehouse_router: Warehouse router fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    connections: List[ReplayConnection] = []
+
+    def connection_factory() -> ReplayConnection:
+        connections.append(ReplayConnection(recordings=[], strict=False))
+        return connections[-1]
+
+    with DataVaultLoadExecutor(
+        connection_factory, warehouse_router=warehouse_router
+    ) as executor:
+        load_result = executor.execute(data_vault_load)
+
+    assert load_result.succeeded
+    assert {connection.executed_statements[0] for connection in connections} == {
+        "USE WAREHOUSE load_xs;",
+        "USE WAREHOUSE load_m;",
+        "USE WAREHOUSE load_l;",
+    }
+    hs_customer_sql = load_result.results_by_table["hs_customer"].statement.sql
+    hs_customer_connection = next(
+        connection
+        for connection in connections
+        if split_sql_script(hs_customer_sql)[-1] in connection.executed_statements
+    )
+    assert hs_customer_connection.executed_statements[0] == "USE WAREHOUSE load_l;"
+
+
+def test_invalid_routes():
+    """Assert that a router without routes is rejected."""
+    with pytest.raises(ValueError):
+        WarehouseRouter([])
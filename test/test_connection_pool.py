@@ -0,0 +1,172 @@
+"""Unit tests for ConnectionPool."""
+
+import threading
+import time
+from typing import List
+
+import pytest
+
+from diepvries.connection_pool import ConnectionPool
+from diepvries.replay_connection import RecordedQuery, ReplayConnection
+from diepvries.template_sql.sql_formulas import HEALTH_CHECK_SQL
+
+# pylint: disable=protected-access
+
+
+class ConnectionFactory:
+    """Stand-in connection factory, keeping track of the created connections."""
+
+    def __init__(self, recordings: List[RecordedQuery] = None):
+        """Instantiate a ConnectionFactory.
+
+        Args:
+            recordings: Recorded queries of each created connection.
+        """
+        self.recordings = recordings or []
+        self.connections: List[ReplayConnection] = []
+
+    def __call__(self) -> ReplayConnection:
+        """Create a connection.
+
+        Returns:
+            ReplayConnection instance.
+        """
+        self.connections.append(ReplayConnection(self.recordings, strict=False))
+        return self.connections[-1]
+
+
+def test_warm_sessions():
+    """Assert that warm sessions are opened, set up and reused."""
+    connection_factory = ConnectionFactory()
+    with ConnectionPool(
+        connection_factory,
+        min_size=2,
+        warehouse="load_xs",
+        session_parameters={"TIMEZONE": "UTC", "QUERY_TAG": "dv_loads"},
+    ) as pool:
+        assert pool.size == pool.idle_size == 2
+        for connection in connection_factory.connections:
+            assert connection.executed_statements == [
+                "USE WAREHOUSE load_xs;",
+                "ALTER SESSION SET TIMEZONE = 'UTC' QUERY_TAG = 'dv_loads';",
+            ]
+
+        with pool.connection() as first, pool.connection() as second:
+            assert {first, second} == set(connection_factory.connections)
+            assert pool.idle_size == 0
+        assert len(connection_factory.connections) == 2
+
+    assert pool.size == 0
+    assert all(connection.is_closed() for connection in connection_factory.connections)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_fair_checkout():
+    """Assert that callers of a full pool are served in order of arrival."""
+    connection_factory = ConnectionFactory()
+    pool = ConnectionPool(connection_factory, max_size=1)
+    served: List[int] = []
+
+    def check_out(caller: int):
+        """Check out a session, recording when the caller is served.
+
+        Args:
+            caller: Number of the caller.
+        """
+        with pool.connection():
+            served.append(caller)
+
+    connection = pool.acquire()
+    threads = []
+    for caller in range(3):
+        threads.append(threading.Thread(target=check_out, args=(caller,)))
+        threads[-1].start()
+        while len(pool._waiters) <= caller:
+            time.sleep(0.001)
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+    pool.release(connection)
+    for thread in threads:
+        thread.join()
+
+    assert served == [0, 1, 2]
+    assert len(connection_factory.connections) == 1
+
+
+def test_health_check():
+    """Assert that idle sessions failing their health check are replaced."""
+    connection_factory = ConnectionFactory(
+        recordings=[RecordedQuery(sql=HEALTH_CHECK_SQL, error="Session expired")]
+    )
+    pool = ConnectionPool(connection_factory, min_size=1, health_check_interval=0)
+    with pool.connection() as connection:
+        assert connection is connection_factory.connections[1]
+
+    expired_connection = connection_factory.connections[0]
+    assert expired_connection.executed_statements == [HEALTH_CHECK_SQL]
+    assert expired_connection.is_closed()
+    assert pool.size == 1
+
+    # Closed connections are discarded when returned.
+    with pool.connection() as connection:
+        connection.close()
+    assert pool.size == pool.idle_size == 0
+
+
+def test_warehouses():
+    """Assert that sessions are only switched to another warehouse when full."""
+    connection_factory = ConnectionFactory()
+    pool = ConnectionPool(connection_factory, max_size=2, min_size=1)
+    with pool.connection("load_l") as connection:
+        assert connection.executed_statements == ["USE WAREHOUSE load_l;"]
+    with pool.connection("load_xs") as connection, pool.connection() as other:
+        # The pool is full: the session of load_l is switched.
+        assert connection.executed_statements == [
+            "USE WAREHOUSE load_l;",
+            "USE WAREHOUSE load_xs;",
+        ]
+        assert other is connection_factory.connections[0]
+    assert len(connection_factory.connections) == 2
+
+
+@pytest.mark.parametrize(
+    ("session_parameters", "reset_statement"),
+    [
+        ({}, "ALTER SESSION UNSET QUERY_TAG;"),
+        ({"QUERY_TAG": "dv_loads"}, "ALTER SESSION SET QUERY_TAG = 'dv_loads';"),
+    ],
+)
+def test_reset_session_parameters(session_parameters, reset_statement):
+    """Assert that parameters changed by a caller are reset for the next caller.
+
+    Args:
+        session_parameters: Session parameters of the pool.
+        reset_statement: Expected statement resetting the query tag.
+    """
+    connection_factory = ConnectionFactory()
+    pool = ConnectionPool(
+        connection_factory, max_size=1, session_parameters=session_parameters
+    )
+    tag_statement = "ALTER SESSION SET QUERY_TAG = 'some_load';"
+    with pool.connection(changed_parameters=["QUERY_TAG"]) as connection:
+        connection.cursor().execute(tag_statement)
+    with pool.connection() as other:
+        assert other is connection
+        other.cursor().execute(HEALTH_CHECK_SQL)
+
+    assert connection.executed_statements[-3:] == [
+        tag_statement,
+        reset_statement,
+        HEALTH_CHECK_SQL,
+    ]
+
+
+def test_invalid_sizes():
+    """Assert that invalid pool sizes are rejected."""
+    with pytest.raises(ValueError):
+        ConnectionPool(ConnectionFactory(), max_size=0)
+    with pytest.raises(ValueError):
+        ConnectionPool(ConnectionFactory(), max_size=1, min_size=2)
+    with pytest.raises(ValueError):
+        ConnectionPool(ConnectionFactory(), health_check_interval=-1)
@@ -1,13 +1,17 @@
 """Unit tests for Data Vault load."""
 
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Dict
 
+from diepvries import StagingTableKind
 from diepvries.data_vault_load import DataVaultLoad
 from diepvries.effectivity_satellite import EffectivitySatellite
 from diepvries.hub import Hub
 from diepvries.link import Link
 from diepvries.role_playing_hub import RolePlayingHub
 from diepvries.satellite import Satellite
+from diepvries.template_sql.sql_formulas import rename_session_variables
 
 
 def test_staging_table_sql(test_path: Path, data_vault_load: DataVaultLoad):
@@ -21,6 +25,66 @@ def test_staging_table_sql(test_path: Path, data_vault_load: DataVaultLoad):
     assert data_vault_load.staging_create_sql_statement == expected_result
 
 
+def test_staging_table_kind(
+    process_configuration: Dict[str, str],
+    extract_start_timestamp: datetime,
+    data_vault_load: DataVaultLoad,
+):
+    """Assert that staging tables can be created as transient or temporary tables.
+
+    Args:
+        process_configuration: Process configuration fixture value.
+        extract_start_timestamp: Extraction start timestamp fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    for kind in StagingTableKind:
+        load = DataVaultLoad(
+            extract_schema=process_configuration["extract_schema"],
+            extract_table=process_configuration["extract_table"],
+            staging_schema=process_configuration["staging_schema"],
+            staging_table=process_configuration["staging_table"],
+            extract_start_timestamp=extract_start_timestamp,
+            target_tables=data_vault_load.target_tables,
+            source=process_configuration["source"],
+            staging_table_kind=kind,
+        )
+        assert load.staging_create_sql_statement == (
+            data_vault_load.staging_create_sql_statement.replace(
+                "CREATE OR REPLACE TABLE", f"CREATE OR REPLACE {kind.value}", 1
+            )
+        )
+    assert data_vault_load.staging_drop_sql_statement == (
+        f"DROP TABLE IF EXISTS {data_vault_load.staging_table.schema}."
+        f"{data_vault_load.staging_table.name};"
+    )
+
+
+def test_staging_table_name_utc(
+    process_configuration: Dict[str, str], data_vault_load: DataVaultLoad
+):
+    """Assert that staging table names are suffixed with the UTC extraction timestamp.
+
+    The staging table sweeper reads the suffix as a UTC timestamp.
+
+    Args:
+        process_configuration: Process configuration fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    load = DataVaultLoad(
+        extract_schema=process_configuration["extract_schema"],
+        extract_table=process_configuration["extract_table"],
+        staging_schema=process_configuration["staging_schema"],
+        staging_table=process_configuration["staging_table"],
+        extract_start_timestamp=datetime(
+            2019, 8, 6, 2, 0, tzinfo=timezone(timedelta(hours=2))
+        ),
+        target_tables=data_vault_load.target_tables,
+    )
+    assert load.staging_table.name == (
+        f"{process_configuration['staging_table']}_20190806_000000"
+    )
+
+
 def test_data_vault_load_sql(test_path: Path, data_vault_load: DataVaultLoad):
     """Assert correctness of a full DataVault load script.
 
@@ -34,6 +98,37 @@ def test_data_vault_load_sql(test_path: Path, data_vault_load: DataVaultLoad):
     assert "\n".join(data_vault_load.sql_load_script) == expected_result
 
 
+def test_data_vault_load_sql_block(test_path: Path, data_vault_load: DataVaultLoad):
+    """Assert correctness of a full DataVault load as a Snowflake Scripting block.
+
+    Args:
+        test_path: Test path fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    expected_result = (
+        test_path / "sql" / "expected_result_data_vault_load_block.sql"
+    ).read_text()
+    assert data_vault_load.sql_load_block == expected_result
+
+
+def test_rename_session_variables():
+    """Assert that only session variables are renamed, not columns or aliases."""
+    sql = (
+        "SET min_timestamp_link = (SELECT MAX(min_timestamp_column) "
+        "AS min_timestamp FROM t);\n"
+        "MERGE INTO t USING s ON t.min_timestamp_column >= $min_timestamp_link\n"
+        "WHEN MATCHED THEN UPDATE SET min_timestamp_column = $min_timestamp_link;"
+    )
+    assert rename_session_variables(sql, "l_order") == (
+        "SET min_timestamp_link_l_order = (SELECT MAX(min_timestamp_column) "
+        "AS min_timestamp FROM t);\n"
+        "MERGE INTO t USING s "
+        "ON t.min_timestamp_column >= $min_timestamp_link_l_order\n"
+        "WHEN MATCHED THEN UPDATE SET min_timestamp_column = "
+        "$min_timestamp_link_l_order;"
+    )
+
+
 def test_data_vault_load_sql_by_group(
     test_path: Path,
     data_vault_load: DataVaultLoad,
@@ -70,3 +165,103 @@ def test_data_vault_load_sql_by_group(
     assert groups[3][0] == hs_customer.sql_load_statement
     assert groups[3][1] == ls_order_customer_eff.sql_load_statement
     assert groups[3][2] == ls_order_customer_role_playing_eff.sql_load_statement
+
+
+def test_shared_target_tables(
+    process_configuration: Dict[str, str],
+    extract_start_timestamp: datetime,
+    data_vault_load: DataVaultLoad,
+):
+    """Assert that sharing target tables between loads does not affect earlier loads.
+
+    Args:
+        process_configuration: Process configuration fixture value.
+        extract_start_timestamp: Extraction start timestamp fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    expected_result = list(data_vault_load.sql_load_script)
+
+    other_data_vault_load = DataVaultLoad(
+        extract_schema=process_configuration["extract_schema"],
+        extract_table=process_configuration["extract_table"],
+        staging_schema=process_configuration["staging_schema"],
+        staging_table="other_orders",
+        extract_start_timestamp=extract_start_timestamp,
+        target_tables=data_vault_load.target_tables,
+        source=process_configuration["source"],
+    )
+
+    assert list(data_vault_load.sql_load_script) == expected_result
+    for table in other_data_vault_load.target_tables:
+        assert table.staging_table is other_data_vault_load.staging_table
+
+
+def test_dependencies(data_vault_load: DataVaultLoad):
+    """Assert correctness of the dependencies between target tables.
+
+    Args:
+        data_vault_load: Data vault load fixture value.
+    """
+    assert data_vault_load.dependencies == {
+        "h_customer": [],
+        "h_customer_role_playing": ["h_customer"],
+        "h_order": [],
+        "l_order_customer": ["h_order", "h_customer"],
+        "l_order_customer_role_playing": ["h_order", "h_customer_role_playing"],
+        "hs_customer": ["h_customer"],
+        "ls_order_customer_eff": ["l_order_customer"],
+        "ls_order_customer_role_playing_eff": ["l_order_customer_role_playing"],
+    }
+
+
+def test_data_vault_load_procedure(test_path: Path, data_vault_load: DataVaultLoad):
+    """Assert correctness of the stored procedure of a DataVault load.
+
+    Args:
+        test_path: Test path fixture value.
+        data_vault_load: Data vault load fixture value.
+    """
+    expected_result = (
+        test_path / "sql" / "expected_result_load_procedure.sql"
+    ).read_text()
+    assert data_vault_load.sql_create_procedure_statement == expected_result
+    assert data_vault_load.sql_call_procedure_statement == (
+        f"CALL dv_stg.{data_vault_load.procedure_name}"
+        "('2019-08-06T00:00:00.000000Z', 'dv_stg.orders_20190806_000000', 'test');"
+    )
+
+
+def test_data_vault_load_procedure_shape(
+    process_configuration: Dict[str, str],
+    data_vault_load: DataVaultLoad,
+    h_order: Hub,
+):
+    """Assert that loads with the same shape share their stored procedure.
+
+    Args:
+        process_configuration: Process configuration fixture value.
+        data_vault_load: Data vault load fixture value.
+        h_order: Deserialized hub h_order.
+    """
+    expected_result = data_vault_load.sql_create_procedure_statement
+    load_configuration = {
+        "extract_schema": process_configuration["extract_schema"],
+        "extract_table": process_configuration["extract_table"],
+        "staging_schema": process_configuration["staging_schema"],
+        "staging_table": process_configuration["staging_table"],
+        "extract_start_timestamp": datetime(2020, 1, 1, tzinfo=timezone.utc),
+        "source": "other_source",
+    }
+
+    other_data_vault_load = DataVaultLoad(
+        target_tables=data_vault_load.target_tables, **load_configuration
+    )
+    assert other_data_vault_load.procedure_name == data_vault_load.procedure_name
+    assert other_data_vault_load.sql_create_procedure_statement == expected_result
+    assert (
+        other_data_vault_load.sql_call_procedure_statement
+        != data_vault_load.sql_call_procedure_statement
+    )
+
+    hub_data_vault_load = DataVaultLoad(target_tables=[h_order], **load_configuration)
+    assert hub_data_vault_load.procedure_name != data_vault_load.procedure_name
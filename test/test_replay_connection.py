@@ -0,0 +1,215 @@
+"""Unit tests for record/replay connections."""
+
+import time
+from pathlib import Path
+from typing import Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+from snowflake.connector import SnowflakeConnection
+from snowflake.connector.constants import QueryStatus
+from snowflake.connector.cursor import SnowflakeCursor
+from snowflake.connector.errors import OperationalError, ProgrammingError
+
+from diepvries.replay_connection import (
+    RecordedQuery,
+    RecordingConnection,
+    ReplayConnection,
+)
+
+
+def test_record_and_replay(tmp_path: Path):
+    """Assert that recorded results are replayed as they were recorded.
+
+    Args:
+        tmp_path: Temporary directory fixture value.
+    """
+    rows = [{"table_name": "H_CUSTOMER"}, {"table_name": "H_ORDER"}]
+    connection = MagicMock(SnowflakeConnection)
+    cursor = connection.cursor.return_value = MagicMock(SnowflakeCursor)
+    cursor.__iter__.return_value = iter(rows)
+    cursor.sfqid = "some_query_id"
+    cursor.rowcount = len(rows)
+
+    recording_connection = RecordingConnection(connection)
+    with recording_connection.cursor() as recording_cursor:
+        recording_cursor.execute("SHOW   TABLES;")
+        assert recording_cursor.fetchall() == rows
+
+    recordings_path = tmp_path / "recordings.json"
+    recording_connection.save(recordings_path)
+
+    replay_connection = ReplayConnection.from_file(recordings_path)
+    with replay_connection.cursor() as replay_cursor:
+        replay_cursor.execute("SHOW TABLES;")
+        assert list(replay_cursor) == rows
+        assert replay_cursor.sfqid == "some_query_id"
+        assert replay_cursor.rowcount == len(rows)
+
+        with pytest.raises(ProgrammingError):
+            replay_cursor.execute("SHOW VIEWS;")
+
+
+def test_replay_errors_and_latency():
+    """Assert that recorded errors and latency are replayed."""
+    replay_connection = ReplayConnection(
+        recordings=[
+            RecordedQuery(sql="SELECT 1;", rows=[[1]], elapsed_time=1.0),
+            RecordedQuery(sql="SELECT 2;", error="Some error"),
+        ],
+        latency=0.01,
+        elapsed_time_scale=0.02,
+        strict=False,
+    )
+    cursor = replay_connection.cursor()
+
+    start = time.perf_counter()
+    assert cursor.execute("SELECT 1;").fetchone() == (1,)
+    assert time.perf_counter() - start >= 0.03
+
+    with pytest.raises(ProgrammingError, match="Some error"):
+        cursor.execute("SELECT 2;")
+
+    # Statements without recordings return no rows when not in strict mode.
+    assert cursor.execute("SELECT 3;").fetchall() == []
+    assert replay_connection.executed_statements == [
+        "SELECT 1;",
+        "SELECT 2;",
+        "SELECT 3;",
+    ]
+
+
+def test_replay_async():
+    """Assert that asynchronous queries run until their latency elapsed."""
+    replay_connection = ReplayConnection(
+        recordings=[
+            RecordedQuery(sql="SELECT 1;", rows=[[1]], query_id="some_query_id"),
+            RecordedQuery(sql="SELECT 2;", error="Some error"),
+        ],
+        latency=0.05,
+    )
+    with replay_connection.cursor() as cursor:
+        assert cursor.execute_async("SELECT 1;") == {"queryId": "some_query_id"}
+        status = replay_connection.get_query_status("some_query_id")
+        assert replay_connection.is_still_running(status)
+        cursor.get_results_from_sfqid("some_query_id")
+        assert cursor.fetchall() == [(1,)]
+        assert replay_connection.get_query_status("some_query_id") == (
+            QueryStatus.SUCCESS
+        )
+
+        cursor.execute_async("SELECT 2;")
+        time.sleep(0.05)
+        with pytest.raises(ProgrammingError):
+            replay_connection.get_query_status_throw_if_error(cursor.sfqid)
+
+
+def test_record_and_replay_multi_statement():
+    """Assert that each statement of a multi-statement request is recorded.
+
+    As in Snowflake, a failed request raises its error right away, with the query
+    ID of the request, and is recorded as a whole.
+    """
+    result_sets = iter([("first_query_id", [{"a": 1}]), ("second_query_id", [])])
+    connection = MagicMock(SnowflakeConnection)
+    cursor = connection.cursor.return_value = MagicMock(SnowflakeCursor)
+
+    def load_next_result_set(*_args, **_kwargs) -> SnowflakeCursor:
+        cursor.sfqid, rows = next(result_sets)
+        cursor.__iter__.return_value = iter(rows)
+        cursor.rowcount = len(rows)
+        return cursor
+
+    def execute(command: str, *args, **kwargs) -> SnowflakeCursor:
+        if "MERGE INTO d" in command:
+            raise OperationalError(msg="Some error", sfqid="request_query_id")
+        return load_next_result_set(*args, **kwargs)
+
+    cursor.execute.side_effect = execute
+    cursor.nextset.side_effect = load_next_result_set
+    command = "SELECT a FROM b;\nMERGE INTO c;"
+    failing_command = "SELECT a FROM b;\nMERGE INTO d;"
+
+    recording_connection = RecordingConnection(connection)
+    with recording_connection.cursor() as recording_cursor:
+        recording_cursor.execute(command, num_statements=2)
+        assert recording_cursor.fetchall() == [{"a": 1}]
+        assert recording_cursor.nextset()
+        assert recording_cursor.sfqid == "second_query_id"
+        assert not recording_cursor.nextset()
+        with pytest.raises(OperationalError):
+            recording_cursor.execute(failing_command, num_statements=2)
+    assert [
+        (recorded_query.sql, recorded_query.query_id, recorded_query.error)
+        for recorded_query in recording_connection.recordings
+    ] == [
+        ("SELECT a FROM b;", "first_query_id", None),
+        ("MERGE INTO c;", "second_query_id", None),
+        ("SELECT a FROM b; MERGE INTO d;", "request_query_id", "Some error"),
+    ]
+
+    replay_connection = ReplayConnection(recording_connection.recordings)
+    with replay_connection.cursor() as replay_cursor:
+        replay_cursor.execute(command, num_statements=2)
+        assert replay_cursor.fetchall() == [{"a": 1}]
+        assert replay_cursor.nextset()
+        with pytest.raises(ProgrammingError, match="Some error") as exc_info:
+            replay_cursor.execute(failing_command, num_statements=2)
+        assert exc_info.value.sfqid == "request_query_id"
+
+
+def test_replay_multi_statement_failure():
+    """Assert that a multi-statement request fails as a whole, as in Snowflake."""
+    replay_connection = ReplayConnection(
+        recordings=[RecordedQuery(sql="MERGE INTO d;", error="Some error")],
+        strict=False,
+    )
+    with replay_connection.cursor() as replay_cursor:
+        with pytest.raises(ProgrammingError, match="Some error") as exc_info:
+            replay_cursor.execute(
+                "SELECT 1;\nMERGE INTO d;\nSELECT 2;", num_statements=3
+            )
+        assert exc_info.value.sfqid == replay_cursor.sfqid
+        assert replay_cursor.nextset() is None
+    assert replay_connection.executed_statements == ["SELECT 1;", "MERGE INTO d;"]
+
+
+def test_record_and_replay_async():
+    """Assert that asynchronous queries are recorded, including failures."""
+    connection = MagicMock(SnowflakeConnection)
+    cursor = connection.cursor.return_value = MagicMock(SnowflakeCursor)
+    cursor.__iter__.return_value = iter([(1,)])
+    cursor.rowcount = 1
+
+    def submit(command: str):
+        cursor.sfqid = f"query_id_{command[-2]}"
+
+    def get_status(query_id: str) -> QueryStatus:
+        if query_id == "query_id_2":
+            raise OperationalError(msg="Some error", sfqid=query_id)
+        return QueryStatus.SUCCESS
+
+    cursor.execute_async.side_effect = submit
+    connection.get_query_status_throw_if_error.side_effect = get_status
+
+    recording_connection = RecordingConnection(connection)
+    with recording_connection.cursor() as recording_cursor:
+        recording_cursor.execute_async("SELECT 1;")
+        status = recording_connection.get_query_status_throw_if_error("query_id_1")
+        assert not recording_connection.is_still_running(status)
+        recording_cursor.get_results_from_sfqid("query_id_1")
+        assert recording_cursor.fetchall() == [(1,)]
+
+        recording_cursor.execute_async("SELECT 2;")
+        with pytest.raises(OperationalError):
+            recording_connection.get_query_status_throw_if_error("query_id_2")
+
+    replay_connection = ReplayConnection(recording_connection.recordings)
+    with replay_connection.cursor() as replay_cursor:
+        replay_cursor.execute_async("SELECT 1;")
+        replay_cursor.get_results_from_sfqid("query_id_1")
+        assert replay_cursor.fetchall() == [(1,)]
+
+        replay_cursor.execute_async("SELECT 2;")
+        with pytest.raises(ProgrammingError, match="Some error"):
+            replay_connection.get_query_status_throw_if_error("query_id_2")